@@ -0,0 +1,69 @@
+"""Time and peak memory of array heavy scripts on the bytecode interpreter
+
+run from the repository root with `python -m benchmarks.array_benchmark`"""
+import time
+import tracemalloc
+
+from benchmarks.dispatch_benchmark import compile_source
+from src.pychart._interpreter.helpers.array import PychartArray
+from src.pychart.runner import make_bytecode_interpreter
+
+SCRIPTS = {
+    "push/pop": """
+        let a = [];
+        let i = 0;
+        while (i < 100000) { push(a, i); i = i + 1; }
+        while (i > 0) { pop(a); i = i - 1; }
+    """,
+    "index": """
+        let a = [];
+        let i = 0;
+        while (i < 100000) { push(a, i); i = i + 1; }
+        let total = 0;
+        i = 0;
+        while (i < len(a)) { total = total + a[i]; a[i] = total; i = i + 1; }
+    """,
+    "literals": """
+        let i = 0;
+        while (i < 50000) { let a = [i, i, i, i]; a[2] = a[1]; i = i + 1; }
+    """,
+}
+
+def time_execution(bytecodes, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        interp = make_bytecode_interpreter()
+        start = time.perf_counter()
+        interp.execute(bytecodes)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def peak_memory(bytecodes) -> int:
+    interp = make_bytecode_interpreter()
+    tracemalloc.start()
+    interp.execute(bytecodes)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def element_memory(count: int = 1000000):
+    """bytes held by a numeric array once its elements are packed, and as a list of floats"""
+    tracemalloc.start()
+    packed = PychartArray([float(i) for i in range(count)])
+    packed_size = tracemalloc.get_traced_memory()[0]
+    boxed = packed.elems.tolist()
+    boxed_size = tracemalloc.get_traced_memory()[0] - packed_size
+    tracemalloc.stop()
+    return (packed_size, boxed_size)
+
+def main():
+    for (name, source) in SCRIPTS.items():
+        bytecodes = compile_source(source, True)
+        print(f"{name:<10} {time_execution(bytecodes):7.3f}s "
+              f"{peak_memory(bytecodes) / 1024:9.0f} KiB peak")
+
+    (packed, boxed) = element_memory()
+    print(f"1M floats  {packed / 2**20:6.1f} MiB packed, {boxed / 2**20:6.1f} MiB as a list")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Bulk array natives against the same transforms written as pychart loops, each run ten
+times over a 50000 element array
+
+run from the repository root with `python -m benchmarks.bulk_benchmark`"""
+from benchmarks.array_benchmark import time_execution
+from benchmarks.dispatch_benchmark import compile_source
+
+SETUP = """
+    func square(x) { return x * x; }
+    let a = [];
+    let i = 0;
+    while (i < 50000) { push(a, i); i = i + 1; }
+"""
+
+TRANSFORMS = {
+    "sum": ("""
+        let total = 0;
+        let j = 0;
+        while (j < len(a)) { total = total + a[j]; j = j + 1; }
+    """, """
+        let total = sum(a);
+    """),
+    "dot": ("""
+        let total = 0;
+        let j = 0;
+        while (j < len(a)) { total = total + a[j] * a[j]; j = j + 1; }
+    """, """
+        let total = dot(a, a);
+    """),
+    "map": ("""
+        let b = [];
+        let j = 0;
+        while (j < len(a)) { push(b, square(a[j])); j = j + 1; }
+    """, """
+        let b = map(a, square);
+    """),
+    "range": ("""
+        let b = [];
+        let j = 0;
+        while (j < 50000) { push(b, j); j = j + 1; }
+    """, """
+        let b = range(50000);
+    """),
+}
+
+def repeated(transform: str, times: int = 10) -> str:
+    return f"let k = 0; while (k < {times}) {{ {transform} k = k + 1; }}"
+
+def main():
+    print(f"setup  {time_execution(compile_source(SETUP, True)):7.3f}s, "
+          "both columns include it")
+    for (name, (loop, native)) in TRANSFORMS.items():
+        looped = time_execution(compile_source(SETUP + repeated(loop), True))
+        bulk   = time_execution(compile_source(SETUP + repeated(native), True))
+        print(f"{name:<6} {looped:7.3f}s looped {bulk:7.3f}s native ({looped / bulk:5.1f}x)")
+
+if __name__ == "__main__":
+    main()
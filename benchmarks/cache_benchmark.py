@@ -0,0 +1,55 @@
+"""Running a large script on the VM again and again, compiling it every time and with
+its compiled bytecode cached next to it
+
+run from the repository root with `python -m benchmarks.cache_benchmark`"""
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from src.pychart.runner import run_file_as_bytecode
+
+FUNCTION = """func f{n}(a, b) {{
+    let total = 0;
+    let i = 0;
+    while (i < a) {{
+        total = total + b * i;
+        i = i + 1;
+    }}
+    return total;
+}}
+"""
+FUNCTIONS = 2000
+RUNS = 5
+
+def time_runs(filename: str, cached: bool) -> float:
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_file_as_bytecode(filename, False, cached=cached)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    source = "".join(FUNCTION.format(n=n) for n in range(FUNCTIONS))
+    source += 'print("done", f0(10, 2));\n'
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "script.pych")
+        with open(filename, "w", encoding="utf-8") as script:
+            script.write(source)
+
+        compiled = time_runs(filename, False)
+        # the first run writes the cache, the timed ones read it
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_file_as_bytecode(filename, False)
+        cached = time_runs(filename, True)
+
+    print(f"{source.count(chr(10))} lines, best of {RUNS} runs")
+    print(f"compiled every run  {compiled * 1000:9.1f}ms")
+    print(f"cached bytecode     {cached * 1000:9.1f}ms ({compiled / cached:.0f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Cost of a pychart function call in the bytecode interpreter
+
+the nested workload makes the same calls as the flat one from inside blocks several frames
+deep, a call should cost the same no matter how deep the caller's scopes are
+
+run from the repository root with `python -m benchmarks.call_benchmark`"""
+import time
+
+from benchmarks.dispatch_benchmark import compile_source
+from src.pychart.runner import make_bytecode_interpreter
+
+CALLS = 50000
+
+WORKLOADS = {
+    "fibonacci": """
+        func fib(n) {
+            if (n < 2) return n;
+            return fib(n - 1) + fib(n - 2);
+        }
+        fib(22);
+    """,
+    "flat": f"""
+        func add(a, b) {{ return a + b; }}
+        let i = 0;
+        while (i < {CALLS}) {{ i = add(i, 1); }}
+    """,
+    "nested": f"""
+        func add(a, b) {{ return a + b; }}
+        let i = 0;
+        {{ {{ {{ {{ {{ {{ {{ {{
+            while (i < {CALLS}) {{ {{ {{ i = add(i, 1); }} }} }}
+        }} }} }} }} }} }} }} }}
+    """,
+}
+
+def time_execution(source: str, repeats: int = 3) -> float:
+    bytecodes = compile_source(source)
+    best = None
+    for _ in range(repeats):
+        interp = make_bytecode_interpreter()
+        start = time.perf_counter()
+        interp.execute(bytecodes)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    for (name, source) in WORKLOADS.items():
+        print(f"{name:<10} {time_execution(source):>8.3f}s")
+
+if __name__ == "__main__":
+    main()
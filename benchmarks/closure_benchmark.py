@@ -0,0 +1,25 @@
+"""The tree walking interpreter against the same programs compiled to closures
+
+run from the repository root with `python -m benchmarks.closure_benchmark`"""
+from benchmarks import control_flow_benchmark, environment_benchmark
+from benchmarks.copy_benchmark import time_run
+
+PROGRAMS = {
+    **control_flow_benchmark.LOOPS,
+    **environment_benchmark.LOOPS,
+    "arrays": """
+        let a = range(20000);
+        let i = 0;
+        while (i < len(a)) { a[i] = a[i] * 2 + 1; i = i + 1; }
+    """,
+}
+
+def main():
+    for (name, source) in PROGRAMS.items():
+        walked   = time_run(source)
+        compiled = time_run(source, compiled=True)
+        print(f"{name:<15} {walked:7.3f}s walked {compiled:7.3f}s compiled "
+              f"({walked / compiled:4.1f}x)")
+
+if __name__ == "__main__":
+    main()
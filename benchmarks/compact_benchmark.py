@@ -0,0 +1,60 @@
+"""Memory and load time of linked bytecode as objects versus the compact encoding
+
+run from the repository root with `python -m benchmarks.compact_benchmark`"""
+import sys
+import time
+from typing import Any, Set
+
+from src.pychart._interpreter.pyparser import Parser
+from src.pychart._interpreter.scanner import Scanner
+from src.pychart._interpreter.visitors.bytecode_generator import BytecodeGenerator
+from src.pychart.bytecode.bytecode_function import solve_block
+from src.pychart.runner import make_bytecode_interpreter, native_functions
+
+def generated_script(functions: int) -> str:
+    lines = []
+    for i in range(functions):
+        lines.append(f"""
+        func step{i}(a, b) {{
+            let c = a * {i} + b;
+            if (c > {i * 3}) {{ c = c - a / 2; }}
+            return c + "{i}";
+        }}
+        let value{i} = step{i}({i}, {i + 1});""")
+    return "".join(lines)
+
+def deep_size(obj: Any, seen: Set[int]) -> int:
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (list, tuple)):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif isinstance(obj, dict):
+        size += sum(deep_size(key, seen) + deep_size(value, seen) for (key, value) in obj.items())
+    elif hasattr(obj, "__dict__"):
+        size += deep_size(vars(obj), seen)
+    return size
+
+def main():
+    source = generated_script(5000)
+    statements = Parser(Scanner(source).get_tokens()).parse()
+    bytecodes = BytecodeGenerator(statements, list(native_functions.keys())).generate()
+
+    start = time.perf_counter()
+    compact = solve_block(bytecodes, compact=True)
+    encode_time = time.perf_counter() - start
+
+    object_size  = deep_size(bytecodes, set())
+    compact_size = deep_size(compact, set())
+    print(f"{len(bytecodes)} instructions, encoded in {encode_time:.3f}s")
+    print(f"objects: {object_size / 1e6:8.2f} MB")
+    print(f"compact: {compact_size / 1e6:8.2f} MB ({object_size / compact_size:.1f}x smaller)")
+
+    for (name, program) in (("objects", bytecodes), ("compact", compact)):
+        start = time.perf_counter()
+        make_bytecode_interpreter().load(program)
+        print(f"load {name}: {time.perf_counter() - start:.3f}s")
+
+if __name__ == "__main__":
+    main()
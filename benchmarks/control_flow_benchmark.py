@@ -0,0 +1,36 @@
+"""Call heavy and break heavy loops on the tree walking interpreter, where return and
+break used to unwind by raising exceptions
+
+run from the repository root with `python -m benchmarks.control_flow_benchmark`"""
+from benchmarks.copy_benchmark import time_run
+
+LOOPS = {
+    "calls": """
+        func add(a, b) { return a + b; }
+        let i = 0;
+        while (i < 30000) { i = add(i, 1); }
+    """,
+    "nested returns": """
+        func find(n) { while (true) { if (n > 0) { { return n; } } } }
+        let i = 0;
+        while (i < 20000) { i = i + find(1); }
+    """,
+    "breaks": """
+        let i = 0;
+        while (i < 20000) {
+            while (true) { { break; } }
+            i = i + 1;
+        }
+    """,
+    "recursion": """
+        func fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+        fib(18);
+    """,
+}
+
+def main():
+    for (name, source) in LOOPS.items():
+        print(f"{name:<15} {time_run(source):7.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Calls passing a large array to a helper on the tree walking interpreter, where
+arguments are passed by value
+
+run from the repository root with `python -m benchmarks.copy_benchmark`"""
+import time
+
+from src.pychart.runner import run
+
+SETUP = """
+    let a = range(100000);
+    let b = [];
+    let i = 0;
+    while (i < 1000) { push(b, [i, "x"]); i = i + 1; }
+"""
+
+CALLS = {
+    "read only": """
+        func first(x) { return x[0]; }
+        let j = 0;
+        while (j < 100) { first(a); first(b); j = j + 1; }
+    """,
+    "writing": """
+        func clear(x) { x[0] = 0; return x; }
+        let j = 0;
+        while (j < 100) { clear(a); clear(b); j = j + 1; }
+    """,
+}
+
+def time_run(
+    source: str,
+    repeat: int = 3,
+    compiled: bool = False,
+    transpiled: bool = False,
+    tiered: bool = False,
+) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(source, compiled, transpiled, tiered)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    setup = time_run(SETUP)
+    for (name, calls) in CALLS.items():
+        print(f"{name:<10} {time_run(SETUP + calls) - setup:7.3f}s for 200 calls")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Instructions per second of the bytecode interpreter's dispatch loop
+
+run from the repository root with `python -m benchmarks.dispatch_benchmark`"""
+import time
+from typing import List
+
+from src.pychart._interpreter.pyparser import Parser
+from src.pychart._interpreter.scanner import Scanner
+from src.pychart._interpreter.visitors.bytecode_generator import BytecodeGenerator
+from src.pychart.bytecode.bytecode import Bytecode
+from src.pychart.bytecode.bytecode_function import solve_block
+from src.pychart.bytecode.optimizer import optimize
+from src.pychart.runner import make_bytecode_interpreter, native_functions
+
+WORKLOADS = {
+    "arithmetic": """
+        let i = 0;
+        let total = 0;
+        while (i < 100000) {
+            total = total + i * 2 - 1;
+            i = i + 1;
+        }
+    """,
+    "fibonacci": """
+        func fib(n) {
+            if (n < 2) return n;
+            return fib(n - 1) + fib(n - 2);
+        }
+        fib(18);
+    """,
+}
+
+def compile_source(source: str, optimized: bool = False,
+        superinstructions: bool = True, specialise: bool = True) -> List[Bytecode]:
+    statements = Parser(Scanner(source).get_tokens()).parse()
+    generator = BytecodeGenerator(statements, list(native_functions.keys()))
+    if not optimized:
+        return generator.generate()
+    return solve_block(optimize(generator.generate(keep_labels=True), superinstructions,
+            specialise))
+
+def count_instructions(bytecodes: List[Bytecode]) -> int:
+    """runs the program once counting every handler the dispatch loop calls"""
+    interp = make_bytecode_interpreter()
+    interp.load(bytecodes)
+    executed = 0
+
+    # the same loop as BytecodeInterpreter.run, handlers can replace themselves while it runs
+    handlers = interp.handlers
+    pc = 0
+    while pc >= 0:
+        pc = handlers[pc](pc)
+        executed += 1
+    # the halt handler isn't an instruction
+    return executed - 1
+
+def time_execution(source: str, repeat: int = 3, optimized: bool = False) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        bytecodes = compile_source(source, optimized)
+        interp = make_bytecode_interpreter()
+        start = time.perf_counter()
+        interp.execute(bytecodes)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    for (name, source) in WORKLOADS.items():
+        executed = count_instructions(compile_source(source))
+        seconds  = time_execution(source)
+        print(f"{name:<12} {executed:>10} instructions {seconds:8.3f}s "
+              f"{executed / seconds:>14,.0f} instructions/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Variable reads and writes at different scope depths on the tree walking interpreter
+
+run from the repository root with `python -m benchmarks.environment_benchmark`"""
+from benchmarks.copy_benchmark import time_run
+
+LOOPS = {
+    "local": """
+        { let i = 0; let total = 0; while (i < 50000) { total = total + i; i = i + 1; } }
+    """,
+    "enclosing": """
+        let i = 0;
+        let total = 0;
+        { { { while (i < 50000) { total = total + i; i = i + 1; } } } }
+    """,
+    "closure": """
+        func counter() { let count = 0; func next() { count = count + 1; return count; } return next; }
+        let next = counter();
+        let i = 0;
+        while (i < 20000) { i = next(); }
+    """,
+}
+
+def main():
+    for (name, source) in LOOPS.items():
+        print(f"{name:<10} {time_run(source):7.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Scanning, parsing and resolving a large program again after a small edit, from
+scratch and incrementally
+
+run from the repository root with `python -m benchmarks.incremental_benchmark`"""
+import time
+
+from src.pychart._interpreter.incremental import IncrementalFrontEnd
+from src.pychart._interpreter.pyparser import Parser
+from src.pychart._interpreter.scanner import Scanner
+from src.pychart._interpreter.visitors.resolver import Resolver
+from src.pychart.runner import native_functions
+
+FUNCTION = """func f{n}(a, b) {{
+    let total = 0;
+    let i = 0;
+    while (i < a) {{
+        total = total + b * i;
+        i = i + 1;
+    }}
+    print("f{n}", total);
+    return total;
+}}
+"""
+FUNCTIONS = 5000
+
+def main():
+    natives = list(native_functions.keys())
+    source = "".join(FUNCTION.format(n=n) for n in range(FUNCTIONS))
+    # the literal in the middle function's first let
+    position = source.index("let total = 0;", len(source) // 2) + len("let total = ")
+
+    start = time.perf_counter()
+    front_end = IncrementalFrontEnd(source, natives)
+    loaded = time.perf_counter() - start
+
+    edited = source[:position] + "10" + source[position + 1 :]
+    start = time.perf_counter()
+    statements = Parser(Scanner(edited).get_tokens()).parse()
+    Resolver.resolve_slots(statements, natives)
+    scratch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    front_end.edit(position, position + 1, "10")
+    incremental = time.perf_counter() - start
+
+    print(f"{source.count(chr(10))} lines, loaded in {loaded:6.3f}s")
+    print(f"from scratch  {scratch * 1000:9.1f}ms")
+    print(f"incremental   {incremental * 1000:9.1f}ms ({scratch / incremental:.0f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Instructions executed by typical loops before and after superinstructions are selected
+
+both columns have every other optimization applied, so the difference is only the fused
+compare-and-jump, increment and loop rotation
+
+run from the repository root with `python -m benchmarks.loop_benchmark`"""
+import time
+
+from benchmarks.dispatch_benchmark import compile_source, count_instructions
+from src.pychart.runner import make_bytecode_interpreter
+
+LOOPS = {
+    "counting": """
+        let i = 0;
+        while (i < 200000) { i = i + 1; }
+    """,
+    "summing": """
+        let i = 0;
+        let total = 0;
+        while (i < 100000) { total = total + i; i = i + 1; }
+    """,
+    "countdown": """
+        let i = 100000;
+        let evens = 0;
+        while (i > 0) { if (i == 2 * 500) { evens = evens + 1; } i = i - 1; }
+    """,
+    "nested": """
+        let i = 0;
+        let cells = 0;
+        while (i < 300) {
+            let j = 0;
+            while (j < 300) { cells = cells + 1; j = j + 1; }
+            i = i + 1;
+        }
+    """,
+}
+
+def time_execution(source: str, superinstructions: bool, repeat: int = 3) -> float:
+    bytecodes = compile_source(source, True, superinstructions)
+    best = float("inf")
+    for _ in range(repeat):
+        interp = make_bytecode_interpreter()
+        start = time.perf_counter()
+        interp.execute(bytecodes)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    for (name, source) in LOOPS.items():
+        before = count_instructions(compile_source(source, True, False))
+        after  = count_instructions(compile_source(source, True, True))
+        print(f"{name:<10} {before:>9} -> {after:>9} instructions ({after / before:4.0%}) "
+              f"{time_execution(source, False):7.3f}s -> {time_execution(source, True):7.3f}s")
+
+if __name__ == "__main__":
+    main()
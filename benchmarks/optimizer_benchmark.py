@@ -0,0 +1,18 @@
+"""Instructions executed and time taken with and without the peephole optimizer
+
+run from the repository root with `python -m benchmarks.optimizer_benchmark`"""
+from benchmarks.dispatch_benchmark import (WORKLOADS, compile_source, count_instructions,
+                                           time_execution)
+
+def main():
+    for (name, source) in WORKLOADS.items():
+        for optimized in (False, True):
+            bytecodes = compile_source(source, optimized)
+            executed  = count_instructions(bytecodes)
+            seconds   = time_execution(source, optimized=optimized)
+            label = "optimized" if optimized else "unoptimized"
+            print(f"{name:<12} {label:<12} {len(bytecodes):>5} instructions "
+                  f"{executed:>10} executed {seconds:8.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Memory held by the tokens and tree of a large generated program once it is parsed
+
+run from the repository root with `python -m benchmarks.parse_memory_benchmark`"""
+import tracemalloc
+
+from benchmarks.scanner_benchmark import CHUNK
+from src.pychart._interpreter.pyparser import Parser
+from src.pychart._interpreter.scanner import Scanner
+
+CHUNKS = 2000
+
+def main():
+    source = "".join(CHUNK.format(n=n) for n in range(CHUNKS))
+
+    tracemalloc.start()
+    tokens = Scanner(source).get_tokens()
+    scanned = tracemalloc.get_traced_memory()[0]
+    statements = Parser(tokens).parse()
+    parsed = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"{len(source) / 2**20:5.1f} MiB source, {len(tokens)} tokens, "
+          f"{len(statements)} statements")
+    print(f"tokens {scanned / 2**20:6.1f} MiB")
+    print(f"tree   {(parsed - scanned) / 2**20:6.1f} MiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""Tokens per second of the parser on large generated expression heavy programs
+
+run from the repository root with `python -m benchmarks.parser_benchmark`"""
+import time
+
+from src.pychart._interpreter.pyparser import Parser
+from src.pychart._interpreter.scanner import Scanner
+
+STATEMENT = "let v{n} = (a + {n}) * b[{n}] - f(c, {n} / 2) >= -d == !(e < {n}.5);\n"
+STATEMENTS = 20000
+
+def main():
+    source = "".join(STATEMENT.format(n=n) for n in range(STATEMENTS))
+    tokens = Scanner(source).get_tokens()
+
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        Parser(tokens).parse()
+        best = min(best, time.perf_counter() - start)
+    print(f"{len(tokens)} tokens {best:6.3f}s {len(tokens) / best / 1e6:5.2f}M tokens/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Time taken by arithmetic heavy programs with and without quickening
+
+run from the repository root with `python -m benchmarks.quickening_benchmark`"""
+import time
+
+from benchmarks.dispatch_benchmark import compile_source
+from src.pychart.bytecode.interpreter import BytecodeInterpreter
+from src.pychart.runner import make_bytecode_interpreter
+
+WORKLOADS = {
+    "floats": """
+        let i = 0;
+        let x = 0.5;
+        let y = 0;
+        while (i < 100000) {
+            x = x * 0.999 + 0.25;
+            y = y + x / 3 - i * 2;
+            i = i + 1;
+        }
+    """,
+    "strings": """
+        let i = 0;
+        let s = "";
+        let matches = 0;
+        while (i < 50000) {
+            s = "ab" + "c";
+            if (s == "abc") { matches = matches + 1; }
+            i = i + 1;
+        }
+    """,
+    "mixed": """
+        let i = 0;
+        let s = "";
+        while (i < 50000) {
+            s = "n" + i;
+            i = i + 1;
+        }
+    """,
+}
+
+def compile_unspecialised(source: str):
+    """optimized, but without type inference, which would already take the type checks
+    out of every site these workloads have and leave nothing to quicken"""
+    return compile_source(source, True, specialise=False)
+
+def time_execution(source: str, quicken: bool, repeat: int = 5) -> float:
+    bytecodes = compile_unspecialised(source)
+    best = float("inf")
+    for _ in range(repeat):
+        interp = make_bytecode_interpreter()
+        interp.quicken = quicken
+        start = time.perf_counter()
+        interp.execute(bytecodes)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def quickening_counts(source: str) -> BytecodeInterpreter:
+    interp = make_bytecode_interpreter()
+    interp.execute(compile_unspecialised(source))
+    return interp
+
+def main():
+    for (name, source) in WORKLOADS.items():
+        generic   = time_execution(source, False)
+        quickened = time_execution(source, True)
+        interp    = quickening_counts(source)
+        print(f"{name:<8} generic {generic:7.3f}s  quickened {quickened:7.3f}s  "
+              f"({interp.quickened} quickened, {interp.deoptimized} deoptimized)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Tokens per second of the scanner on large generated sources
+
+run from the repository root with `python -m benchmarks.scanner_benchmark`"""
+import time
+
+from src.pychart._interpreter.scanner import Scanner
+
+CHUNK = """
+// chunk {n}
+func step_{n}(values, scale) {{
+    let total_{n} = 0;
+    let i = 0;
+    while (i < len(values)) {{
+        if (values[i] >= {n}.5) {{ total_{n} = total_{n} + values[i] * scale; }}
+        elif (values[i] != 0) {{ total_{n} = total_{n} - 1; }}
+        i = i + 1;
+    }}
+    print("step {n}: " + total_{n});
+    return total_{n};
+}}
+"""
+
+SIZES = [1000, 10000]
+
+def main():
+    for size in SIZES:
+        source = "".join(CHUNK.format(n=n) for n in range(size))
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            tokens = Scanner(source).get_tokens()
+            best = min(best, time.perf_counter() - start)
+        print(f"{len(source) / 2**20:6.1f} MiB {len(tokens):9} tokens {best:7.3f}s "
+              f"{len(tokens) / best / 1e6:5.2f}M tokens/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Peak memory and time running a large generated file read whole and streamed
+
+run from the repository root with `python -m benchmarks.stream_benchmark`"""
+import contextlib
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+from src.pychart.runner import run_file
+
+# a generated script, lots of small top level statements
+STATEMENT = "let v{n} = [{n}, {n} + 1, \"item {n}\"]; v{n} = v{n}[0] * 2;\n"
+STATEMENTS = 10000
+
+def measure(filename: str, streamed: bool):
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_file(filename, streamed=streamed)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return (elapsed, peak)
+
+def main():
+    with tempfile.NamedTemporaryFile("w", suffix=".pych", delete=False) as source:
+        for n in range(STATEMENTS):
+            source.write(STATEMENT.format(n=n))
+
+    try:
+        size = os.path.getsize(source.name) / 2**20
+        for streamed in (False, True):
+            (elapsed, peak) = measure(source.name, streamed)
+            print(f"{size:5.1f} MiB {'streamed' if streamed else 'whole':<9} "
+                  f"{elapsed:6.2f}s {peak / 2**20:7.1f} MiB peak")
+    finally:
+        os.remove(source.name)
+
+if __name__ == "__main__":
+    main()
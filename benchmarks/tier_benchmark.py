@@ -0,0 +1,15 @@
+"""The tree walking interpreter with and without hot functions and loops compiled
+
+run from the repository root with `python -m benchmarks.tier_benchmark`"""
+from benchmarks.closure_benchmark import PROGRAMS
+from benchmarks.copy_benchmark import time_run
+
+def main():
+    for (name, source) in PROGRAMS.items():
+        walked = time_run(source)
+        tiered = time_run(source, tiered=True)
+        print(f"{name:<15} {walked:7.3f}s walked {tiered:7.3f}s tiered "
+              f"({walked / tiered:4.1f}x)")
+
+if __name__ == "__main__":
+    main()
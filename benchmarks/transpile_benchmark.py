@@ -0,0 +1,15 @@
+"""Programs compiled to closures against the same programs transpiled to python
+
+run from the repository root with `python -m benchmarks.transpile_benchmark`"""
+from benchmarks.closure_benchmark import PROGRAMS
+from benchmarks.copy_benchmark import time_run
+
+def main():
+    for (name, source) in PROGRAMS.items():
+        compiled   = time_run(source, compiled=True)
+        transpiled = time_run(source, transpiled=True)
+        print(f"{name:<15} {compiled:7.3f}s compiled {transpiled:7.3f}s transpiled "
+              f"({compiled / transpiled:4.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Time taken by arithmetic heavy programs with and without static type inference
+
+the interpreter runs with and without quickening, instructions type inference proves
+don't need to warm up before they skip the coercion checks
+
+run from the repository root with `python -m benchmarks.type_inference_benchmark`"""
+import time
+
+from src.pychart._interpreter.pyparser import Parser
+from src.pychart._interpreter.scanner import Scanner
+from src.pychart._interpreter.visitors.bytecode_generator import BytecodeGenerator
+from src.pychart.bytecode.bytecode_function import solve_block
+from src.pychart.bytecode.optimizer import optimize
+from src.pychart.bytecode.type_inference import TypeInference
+from src.pychart.runner import make_bytecode_interpreter, native_functions
+
+WORKLOADS = {
+    "polynomial": """
+        let i = 0;
+        let total = 0;
+        while (i < 100000) {
+            total = total + (i * 3 + 1) * (i - 2) / 4 - (i * i) / 7;
+            i = i + 1;
+        }
+    """,
+    "short calls": """
+        func f(x) { return (x * 2 + 1) * (x * 2 - 1) / 3 + 1; }
+        let i = 0;
+        while (i < 20000) { f(i); i = i + 1; }
+    """,
+}
+
+def compile_source(source: str, specialise: bool):
+    statements = Parser(Scanner(source).get_tokens()).parse()
+    generator = BytecodeGenerator(statements, list(native_functions.keys()))
+    return solve_block(optimize(generator.generate(keep_labels=True), specialise=specialise))
+
+def time_execution(source: str, specialise: bool, quicken: bool, repeat: int = 5) -> float:
+    bytecodes = compile_source(source, specialise)
+    best = float("inf")
+    for _ in range(repeat):
+        interp = make_bytecode_interpreter()
+        interp.quicken = quicken
+        start = time.perf_counter()
+        interp.execute(bytecodes)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    for (name, source) in WORKLOADS.items():
+        statements = Parser(Scanner(source).get_tokens()).parse()
+        generator = BytecodeGenerator(statements, list(native_functions.keys()))
+        inference = TypeInference(optimize(generator.generate(keep_labels=True),
+                specialise=False))
+        inference.infer()
+        print(f"{name:<12} {inference.specialised} instructions specialised")
+        for quicken in (False, True):
+            generic = time_execution(source, False, quicken)
+            typed   = time_execution(source, True, quicken)
+            print(f"    quickening {'on ' if quicken else 'off'}  "
+                  f"generic {generic:7.3f}s  inferred {typed:7.3f}s")
+
+if __name__ == "__main__":
+    main()
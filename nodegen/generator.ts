@@ -1,3 +1,12 @@
+interface stateType {
+  // the comment above the members, a line each
+  comment: string[];
+  // each member's type and what it starts as
+  members: {
+    [member: string]: [string, string];
+  };
+}
+
 interface variableType {
   [className: string]: {
     filename: string;
@@ -7,6 +16,10 @@ interface variableType {
         [member: string]: string;
       };
     };
+    // members that are set once the node is parsed, by the resolver or interpreter
+    state: {
+      [subClassName: string]: stateType[];
+    };
   };
 }
 
@@ -21,7 +34,7 @@ const variables: variableType = {
   Expr: {
     filename: "expression.py",
     imports: [
-      "from typing import Any, List",
+      "from typing import Any, List, Optional",
       "",
       "from src.pychart._interpreter.token_type import Token",
     ],
@@ -64,6 +77,20 @@ const variables: variableType = {
         value: "Expr",
       },
     },
+    state: {
+      Variable: [
+        {
+          comment: ["where the variable lives, set by the resolver"],
+          members: { depth: ["Optional[int]", "None"], slot: ["Optional[int]", "None"] },
+        },
+      ],
+      Assignment: [
+        {
+          comment: ["where the variable lives, set by the resolver"],
+          members: { depth: ["Optional[int]", "None"], slot: ["Optional[int]", "None"] },
+        },
+      ],
+    },
   },
   Stmt: {
     filename: "statement.py",
@@ -103,6 +130,39 @@ const variables: variableType = {
       },
       Break: {},
     },
+    state: {
+      Let: [
+        {
+          comment: ["the variable's slot in its scope, set by the resolver"],
+          members: { slot: ["Optional[int]", "None"] },
+        },
+      ],
+      Block: [
+        {
+          comment: ["how many variables the block declares, set by the resolver"],
+          members: { size: ["int", "0"] },
+        },
+      ],
+      Function: [
+        {
+          comment: [
+            "set by the resolver: the function's slot in the scope declaring it, and the number",
+            "of variables a call declares, the parameters take the first slots",
+          ],
+          members: { slot: ["Optional[int]", "None"], size: ["int", "0"] },
+        },
+        {
+          comment: ["set by the interpreter: how often it was called, and its body compiled once hot"],
+          members: { calls: ["int", "0"], compiled: ["Optional[List[Any]]", "None"] },
+        },
+      ],
+      While: [
+        {
+          comment: ["set by the interpreter: how often the body ran, and the loop compiled once hot"],
+          members: { iterations: ["int", "0"], compiled: ["Optional[Any]", "None"] },
+        },
+      ],
+    },
   },
 };
 
@@ -111,6 +171,8 @@ function makeBaseClass(className: string, definition: variableType[""]) {
 
 
 class ${className}:
+    __slots__ = ()
+
     def __call__(self, visitor: "${className}Visitor") -> Any:
         raise RuntimeError("Expected ${className}")
 
@@ -142,16 +204,29 @@ ${Object.entries(definition.classes)
 `;
 }
 
+// nodes have no __dict__, a program's tree holds a lot of them
+function makeSlots(fields: string[]) {
+  if (fields.length === 0) {
+    return "    __slots__ = ()";
+  }
+
+  const names = fields.map((field) => `"${field}"`);
+  return `    __slots__ = (${names.join(", ")}${names.length === 1 ? "," : ""})`;
+}
+
 function makeSubClass(
   baseClassName: string,
   className: string,
-  args: [string, string][]
+  args: [string, string][],
+  state: stateType[]
 ) {
   let name = className.toLowerCase();
 
   if (args.length === 0) {
     return `
 class ${className}(${baseClassName}):
+${makeSlots([])}
+
     def __init__(self):
         pass
 
@@ -161,15 +236,26 @@ class ${className}(${baseClassName}):
 `;
   }
 
+  const members = state.flatMap((group) => Object.entries(group.members));
+
   return `
 class ${className}(${baseClassName}):
+${makeSlots([...args, ...members].map(([field]) => field))}
 ${args.map(([field, type]) => `    ${field}: ${type}`).join("\n")}
-
+${state
+  .map(
+    (group) =>
+      group.comment.map((line) => `    # ${line}\n`).join("") +
+      Object.entries(group.members)
+        .map(([field, [type]]) => `    ${field}: ${type}\n`)
+        .join("")
+  )
+  .join("")}
     def __init__(self, ${args
       .map(([field, type]) => `${field}: ${type}`)
       .join(", ")}):
 ${args.map(([field]) => `        self.${field} = ${field}`).join("\n")}
-
+${members.map(([field, [, value]]) => `        self.${field} = ${value}\n`).join("")}
     def __call__(self, visitor: ${baseClassName}Visitor) -> Any:
         return visitor.${methodNameMap[name] ?? name}(self)
 
@@ -192,7 +278,12 @@ Object.entries(variables).forEach(([className, definition]) => {
   output += makeVisitor(className, definition);
 
   for (let [subClassName, body] of Object.entries(definition.classes)) {
-    output += makeSubClass(className, subClassName, Object.entries(body));
+    output += makeSubClass(
+      className,
+      subClassName,
+      Object.entries(body),
+      definition.state[subClassName] ?? []
+    );
   }
 
   console.log(`/--------   ${definition.filename}   --------\\`);
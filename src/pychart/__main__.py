@@ -1,16 +1,10 @@
 from . import __version__
 
-import argparse
-from src.pychart.runner import run_prompt, run_file, run_file_as_bytecode, run_as_bytecode, run
+from src.pychart.runner import (argument_parser, run_prompt, run_file, run_file_as_bytecode,
+                               run_as_bytecode, run)
 
 def main():
-    parser = argparse.ArgumentParser(prog='pychart')
-    parser.add_argument('file', nargs='?', help='run a pychart file')
-    parser.add_argument('--version', '-V', action='store_true')
-    parser.add_argument('--bytecode', '-b', action='store_true')
-    parser.add_argument('--print_bytecode', '-print', action='store_true')
-    parser.add_argument('-run', nargs='?', help='run pychart source')
-
+    parser = argument_parser()
 
     kwargs = vars(parser.parse_args())
     if kwargs.pop('version'):
@@ -18,19 +12,23 @@ def main():
     elif kwargs.get('run'):
         if kwargs.get('bytecode'):
             should_print = kwargs.get('print_bytecode')
+            should_optimize = not kwargs.get('no_optimize')
             print("running as bytecode!");
-            run_as_bytecode(kwargs.pop('run'), should_print)
+            run_as_bytecode(kwargs.pop('run'), should_print, should_optimize)
         else:
             print("running as interpreter!");
-            run(kwargs.pop('run'))
+            run(kwargs.pop('run'), kwargs.get('compile'), kwargs.get('transpile'))
     elif kwargs.get('file'):
         if kwargs.get('bytecode'):
             should_print = kwargs.get('print_bytecode')
-            run_file_as_bytecode(kwargs.pop('file'), should_print)
+            should_optimize = not kwargs.get('no_optimize')
+            run_file_as_bytecode(kwargs.pop('file'), should_print, should_optimize,
+                                 not kwargs.get('no_cache'))
         else:
-            run_file(kwargs.pop('file'))
+            run_file(kwargs.pop('file'), kwargs.get('compile'), kwargs.get('transpile'),
+                     kwargs.get('stream'))
     else:
-        run_prompt()
+        run_prompt(kwargs.get('compile'), kwargs.get('transpile'))
 
 
 if __name__ == '__main__':
@@ -1,9 +1,11 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
 from src.pychart._interpreter.token_type import Token
 
 
 class Expr:
+    __slots__ = ()
+
     def __call__(self, visitor: "ExprVisitor") -> Any:
         raise RuntimeError("Expected Expr")
 
@@ -48,6 +50,7 @@ class ExprVisitor:
 
 
 class Binary(Expr):
+    __slots__ = ("left", "operator", "right")
     left: Expr
     operator: Token
     right: Expr
@@ -62,6 +65,7 @@ class Binary(Expr):
 
 
 class Unary(Expr):
+    __slots__ = ("operator", "right")
     operator: Token
     right: Expr
 
@@ -74,6 +78,7 @@ class Unary(Expr):
 
 
 class Literal(Expr):
+    __slots__ = ("value",)
     value: Any
 
     def __init__(self, value: Any):
@@ -84,6 +89,7 @@ class Literal(Expr):
 
 
 class Grouping(Expr):
+    __slots__ = ("expr",)
     expr: Expr
 
     def __init__(self, expr: Expr):
@@ -94,28 +100,41 @@ class Grouping(Expr):
 
 
 class Variable(Expr):
+    __slots__ = ("name", "depth", "slot")
     name: Token
+    # where the variable lives, set by the resolver
+    depth: Optional[int]
+    slot: Optional[int]
 
     def __init__(self, name: Token):
         self.name = name
+        self.depth = None
+        self.slot = None
 
     def __call__(self, visitor: ExprVisitor) -> Any:
         return visitor.variable(self)
 
 
 class Assignment(Expr):
+    __slots__ = ("name", "initializer", "depth", "slot")
     name: Token
     initializer: Expr
+    # where the variable lives, set by the resolver
+    depth: Optional[int]
+    slot: Optional[int]
 
     def __init__(self, name: Token, initializer: Expr):
         self.name = name
         self.initializer = initializer
+        self.depth = None
+        self.slot = None
 
     def __call__(self, visitor: ExprVisitor) -> Any:
         return visitor.assignment(self)
 
 
 class Call(Expr):
+    __slots__ = ("callee", "arguments")
     callee: Expr
     arguments: List[Expr]
 
@@ -128,6 +147,7 @@ class Call(Expr):
 
 
 class Array(Expr):
+    __slots__ = ("elems",)
     elems: List[Expr]
 
     def __init__(self, elems: List[Expr]):
@@ -138,6 +158,7 @@ class Array(Expr):
 
 
 class Index(Expr):
+    __slots__ = ("indexee", "index")
     indexee: Expr
     index: Expr
 
@@ -150,6 +171,7 @@ class Index(Expr):
 
 
 class IndexSet(Expr):
+    __slots__ = ("index", "value")
     index: Index
     value: Expr
 
@@ -5,6 +5,8 @@ from src.pychart._interpreter.token_type.token import Token
 
 
 class Stmt:
+    __slots__ = ()
+
     def __call__(self, visitor: "StmtVisitor") -> Any:
         raise RuntimeError("Expected Stmt")
 
@@ -43,6 +45,7 @@ class StmtVisitor:
 
 
 class Expression(Stmt):
+    __slots__ = ("expr",)
     expr: Expr
 
     def __init__(self, expr: Expr):
@@ -53,6 +56,7 @@ class Expression(Stmt):
 
 
 class Return(Stmt):
+    __slots__ = ("expr",)
     expr: Expr
 
     def __init__(self, expr: Expr):
@@ -63,42 +67,63 @@ class Return(Stmt):
 
 
 class Let(Stmt):
+    __slots__ = ("name", "initializer", "slot")
     name: Token
     initializer: Optional[Expr]
+    # the variable's slot in its scope, set by the resolver
+    slot: Optional[int]
 
     def __init__(self, name: Token, initializer: Optional[Expr]):
         self.name = name
         self.initializer = initializer
+        self.slot = None
 
     def __call__(self, visitor: StmtVisitor) -> Any:
         return visitor.let(self)
 
 
 class Block(Stmt):
+    __slots__ = ("statements", "size")
     statements: List[Stmt]
+    # how many variables the block declares, set by the resolver
+    size: int
 
     def __init__(self, statements: List[Stmt]):
         self.statements = statements
+        self.size = 0
 
     def __call__(self, visitor: StmtVisitor) -> Any:
         return visitor.block(self)
 
 
 class Function(Stmt):
+    __slots__ = ("name", "params", "body", "slot", "size", "calls", "compiled")
     name: Token
     params: List[Token]
     body: List[Stmt]
+    # set by the resolver: the function's slot in the scope declaring it, and the number
+    # of variables a call declares, the parameters take the first slots
+    slot: Optional[int]
+    size: int
+    # set by the interpreter: how often it was called, and its body compiled once hot
+    calls: int
+    compiled: Optional[List[Any]]
 
     def __init__(self, name: Token, params: List[Token], body: List[Stmt]):
         self.name = name
         self.params = params
         self.body = body
+        self.slot = None
+        self.size = 0
+        self.calls = 0
+        self.compiled = None
 
     def __call__(self, visitor: StmtVisitor) -> Any:
         return visitor.function(self)
 
 
 class If(Stmt):
+    __slots__ = ("if_test", "if_body", "else_body")
     if_test: Expr
     if_body: Stmt
     else_body: Optional[Stmt]
@@ -113,18 +138,26 @@ class If(Stmt):
 
 
 class While(Stmt):
+    __slots__ = ("while_test", "while_body", "iterations", "compiled")
     while_test: Expr
     while_body: Stmt
+    # set by the interpreter: how often the body ran, and the loop compiled once hot
+    iterations: int
+    compiled: Optional[Any]
 
     def __init__(self, while_test: Expr, while_body: Stmt):
         self.while_test = while_test
         self.while_body = while_body
+        self.iterations = 0
+        self.compiled = None
 
     def __call__(self, visitor: StmtVisitor) -> Any:
         return visitor.while_stmt(self)
 
 
 class Break(Stmt):
+    __slots__ = ()
+
     def __init__(self):
         pass
 
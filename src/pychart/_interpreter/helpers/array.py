@@ -0,0 +1,167 @@
+from array import array
+from typing import Any, List, Optional, Union
+from src.pychart._interpreter.helpers.indexable import PychartIndexable
+
+# element types an array can be packed for and the typecode of the buffer holding them,
+# the bytecode interpreter's numbers are floats and the tree walker's whole numbers ints
+TYPECODES = {float: "d", int: "q"}
+ELEMENT_TYPES = {typecode: element_type for (element_type, typecode) in TYPECODES.items()}
+
+# smaller arrays aren't worth the cost of packing
+PACK_AT = 16
+
+Elements = Union[List[Any], array]
+
+
+def pack(elems: Elements) -> Elements:
+    """a packed buffer of the elements when they are all numbers of the same type,
+    otherwise the list itself"""
+    if not isinstance(elems, list) or len(elems) < PACK_AT:
+        return elems
+
+    element_types = set(map(type, elems))
+    if len(element_types) != 1:
+        return elems
+
+    typecode = TYPECODES.get(element_types.pop())
+    if typecode is None:
+        return elems
+
+    try:
+        return array(typecode, elems)
+    except OverflowError:
+        return elems
+
+
+class PychartArray(PychartIndexable):
+    """the array both interpreters use, so natives get the array itself and not a copy
+
+    homogeneous numeric arrays of at least PACK_AT elements keep them in a packed
+    array('d') (or array('q') for ints), anything else is a python list. storing
+    anything else into a packed array unpacks it
+
+    copies made by copy() share their elements until one of the arrays writes to them,
+    shared is set on all of them and whichever writes first takes a copy of its own"""
+
+    __slots__ = ("elems", "shared")
+    elems: Elements
+    shared: bool
+
+    def __init__(self, elems: Elements) -> None:
+        self.elems = pack(elems)
+        self.shared = False
+
+    def copy(self) -> "PychartArray":
+        """a copy by value, nothing is copied until either array is written to"""
+        duplicate = PychartArray.__new__(PychartArray)
+        duplicate.elems = self.elems
+        duplicate.shared = True
+        self.shared = True
+        return duplicate
+
+    def own(self) -> Elements:
+        """the elements, copied first if another array may still be using them
+        nested arrays are copied the same way, lazily"""
+        if self.shared:
+            elems = self.elems
+            if isinstance(elems, list):
+                self.elems = [
+                    elem.copy() if isinstance(elem, PychartArray) else elem
+                    for elem in elems
+                ]
+            else:
+                self.elems = elems[:]
+            self.shared = False
+        return self.elems
+
+    @property
+    def packed(self) -> bool:
+        return not isinstance(self.elems, list)
+
+    def unpack(self) -> List[Any]:
+        if self.packed:
+            self.elems = self.elems.tolist()
+        return self.elems
+
+    def fits(self, value: Any) -> bool:
+        """if value can go in the elements without changing their representation"""
+        elems = self.elems
+        if isinstance(elems, list):
+            return True
+        return type(value) is ELEMENT_TYPES[elems.typecode]
+
+    def store(self, position: int, value: Any) -> None:
+        """stores at a position already known to be in bounds"""
+        elems = self.elems
+        if self.shared:
+            elems = self.own()
+        if isinstance(elems, list):
+            elems[position] = value
+            return
+
+        if type(value) is not ELEMENT_TYPES[elems.typecode]:
+            elems = self.unpack()
+        try:
+            elems[position] = value
+        except OverflowError:
+            self.unpack()[position] = value
+
+    def set(self, index: Any, value: Any) -> Any:
+        if not isinstance(index, int):
+            raise RuntimeError(f'Array index "{index}" is not an integer')
+
+        if index >= len(self.elems) or index < 0:
+            raise RuntimeError(f'Array index "{index}" is out of bounds')
+
+        self.store(index, value)
+
+        return value
+
+    def get(self, index: Any):
+        if not isinstance(index, int):
+            raise RuntimeError(f'Array index "{index}" is not an integer')
+
+        if index >= len(self.elems) or index < 0:
+            raise RuntimeError(f'Array index "{index}" is out of bounds')
+
+        elem = self.elems[index]
+        if self.shared and isinstance(elem, PychartArray):
+            # whoever reads a nested array could write to it, so it has to be our own
+            elem = self.own()[index]
+        return elem
+
+    def push(self, value: Any) -> None:
+        elems = self.own()
+        if isinstance(elems, list):
+            elems.append(value)
+            if len(elems) == PACK_AT:
+                # an array built by pushing is packed once it is big enough
+                self.elems = pack(elems)
+            return
+
+        if not self.fits(value):
+            elems = self.unpack()
+        try:
+            elems.append(value)
+        except OverflowError:
+            self.unpack().append(value)
+
+    def fill(self, value: Any) -> None:
+        self.elems = pack([value] * len(self.elems))
+        self.shared = False
+
+    def pop(self) -> Optional[Any]:
+        if len(self.elems) == 0:
+            return None
+        return self.own().pop()
+
+    def __len__(self) -> int:
+        return len(self.elems)
+
+    def __str__(self) -> str:
+        string = "["
+
+        for elem in self.elems:
+            string += str(elem) + ", "
+
+        return string + "]"
@@ -15,13 +15,7 @@ class PychartCallable:
         raise RuntimeError("Cannot call base callable.")
     
     def bytecode_execute(self, interpreter: Any, params: List[Any]):
-        result = []
-        for param in params:
-            val = interpreter.get(param)
-            if isinstance(val, dict):
-                val = list(val)
-            result.append(val)
-        return self(result)
+        return self([interpreter.get(param) for param in params])
 
 
 class InputFunc(PychartCallable):
@@ -1,14 +1,31 @@
-from typing import Any, Dict, Optional
+from typing import Any, List, Optional
+
+
+class Undefined:
+    """what a slot holds before its variable is declared"""
+
+    def __repr__(self) -> str:
+        return "<undefined>"
+
+
+UNDEFINED = Undefined()
 
 
 class Environment:
-    values: Dict[str, Any]
+    """a scope at runtime, the resolver gave every variable declared in it a slot"""
+
+    __slots__ = ("values", "enclosing")
+    values: List[Any]
     enclosing: Optional["Environment"]
 
-    def __init__(self, enclosing: Optional["Environment"] = None):
-        self.values = {}
+    def __init__(self, size: int, enclosing: Optional["Environment"] = None):
+        self.values = [UNDEFINED] * size
         self.enclosing = enclosing
 
+    def grow(self, size: int):
+        """makes room for the slots declared since it was made"""
+        self.values.extend([UNDEFINED] * (size - len(self.values)))
+
     # Probably should merge this into earlier definitions mutate and reserve
     def ancestor(self, depth: int):
         environment = self
@@ -19,36 +36,28 @@ class Environment:
 
         return environment
 
-    def get_at(self, depth: int, key: str) -> Any:
-        return self.ancestor(depth).get(key)
-
-    def set_at(self, depth: int, key: str, value: Any):
-        self.ancestor(depth).set(key, value)
-
-    def get(self, key: str) -> Any:
-        if key in self.values:
-            return self.values[key]
+    def get_at(self, depth: int, slot: int, key: str) -> Any:
+        environment = self if depth == 0 else self.ancestor(depth)
+        value = environment.values[slot]
 
-        if self.enclosing is not None:
-            return self.enclosing.get(key)
+        if value is UNDEFINED:
+            raise RuntimeError(f"Variable {key} is not defined")
 
-        raise RuntimeError(f"Variable {key} is not defined")
+        return value
 
-    def set(self, key: str, value: Any) -> Any:
-        if key in self.values:
-            self.values[key] = value
-            return value
+    def set_at(self, depth: int, slot: int, key: str, value: Any):
+        environment = self if depth == 0 else self.ancestor(depth)
 
-        if self.enclosing is not None:
-            return self.enclosing.set(key, value)
+        if environment.values[slot] is UNDEFINED:
+            raise RuntimeError(f"Variable {key} not initialized")
 
-        raise RuntimeError(f"Variable {key} not initialized")
+        environment.values[slot] = value
 
-    def reverve(self, key: str, value: Any):
-        if key in self.values:
+    def reverve(self, slot: int, key: str, value: Any):
+        if self.values[slot] is not UNDEFINED:
             raise RuntimeError(f"Variable {key} is already defined")
 
-        self.values[key] = value
+        self.values[slot] = value
 
     @staticmethod
     def print(env: "Environment", layer: int = 0):
@@ -2,6 +2,8 @@ from typing import Any
 
 
 class PychartIndexable:
+    __slots__ = ()
+
     @staticmethod
     def from_expr(expr: Any):
         if isinstance(expr, PychartIndexable):
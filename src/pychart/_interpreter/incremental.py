@@ -0,0 +1,158 @@
+import sys
+from typing import Dict, List, Optional
+from src.pychart._interpreter.ast_nodes.statement import Stmt
+from src.pychart._interpreter.pyparser import Parser
+from src.pychart._interpreter.scanner import scan, token_ends
+from src.pychart._interpreter.token_type import Token, TokenType
+from src.pychart._interpreter.visitors.resolver import Resolver
+
+
+class Chunk:
+    """a top level statement and the whitespace and comments before it, the last chunk
+    of a source has no statement and is whatever comes after the last one"""
+
+    __slots__ = ("length", "newlines", "statement", "declared")
+    length: int
+    newlines: int
+    statement: Optional[Stmt]
+    # the globals the statement declares, set once it is resolved
+    declared: List[str]
+
+    def __init__(self, length: int, newlines: int, statement: Optional[Stmt]):
+        self.length = length
+        self.newlines = newlines
+        self.statement = statement
+        self.declared = []
+
+
+class IncrementalFrontEnd:
+    """scans, parses and resolves a source and keeps the result, an edit re-scans and
+    re-parses only the top level statements it touches and resolves them again. the
+    statements after them are only resolved again when the globals declared change
+
+    when the edited statements don't parse by themselves, like when a string or block
+    is left open, the statements after them are taken in too, twice as many each time.
+    the tokens of statements after an edit keep the line they were scanned on"""
+
+    source: str
+    natives: List[str]
+    chunks: List[Chunk]
+    # the slot of every global that is not a native, the natives take the first slots.
+    # a global keeps its slot once it is no longer declared
+    slots: Dict[str, int]
+    # set when the source did not parse or resolve, the next edit starts over
+    broken: bool
+
+    def __init__(self, source: str, natives: List[str]):
+        self.source = ""
+        self.natives = natives
+        self.chunks = [Chunk(0, 0, None)]
+        self.slots = {}
+        self.broken = False
+
+        self.edit(0, 0, source)
+
+    def statements(self) -> Optional[List[Stmt]]:
+        if self.broken:
+            return None
+        return [chunk.statement for chunk in self.chunks if chunk.statement is not None]
+
+    def globals_size(self) -> int:
+        return len(self.natives) + len(self.slots)
+
+    def edit(self, start: int, end: int, text: str) -> Optional[List[Stmt]]:
+        """replaces the source from start to end with the text, gives back the statements
+        like Parser.parse does"""
+        self.source = self.source[:start] + text + self.source[end:]
+
+        # the chunks the edit touches, a chunk ending where it starts could go on
+        (first, last) = (0, len(self.chunks) - 1)
+        (region_start, region_end) = (0, len(self.source))
+        if not self.broken:
+            (first, last) = (-1, -1)
+            offset = 0
+            for (i, chunk) in enumerate(self.chunks):
+                if offset > end:
+                    break
+                if offset + chunk.length >= start:
+                    if first < 0:
+                        (first, region_start) = (i, offset)
+                    (last, region_end) = (i, offset + chunk.length)
+                offset += chunk.length
+            region_end += len(text) - (end - start)
+
+        line = 1 + sum(chunk.newlines for chunk in self.chunks[:first])
+        while True:
+            complete = last == len(self.chunks) - 1
+            try:
+                chunks = self.parse(self.source[region_start:region_end], line, complete)
+                break
+            except RuntimeError as err:
+                if complete:
+                    print("Error occurred: " + str(err), file=sys.stderr)
+                    self.broken = True
+                    return None
+
+            taken = min(last - first + 1, len(self.chunks) - 1 - last)
+            following = self.chunks[last + 1 : last + 1 + taken]
+            region_end += sum(chunk.length for chunk in following)
+            last += taken
+
+        # what is after the last statement goes before the next one
+        if not complete:
+            rest = chunks.pop()
+            self.chunks[last + 1].length += rest.length
+            self.chunks[last + 1].newlines += rest.newlines
+
+        replaced = self.chunks[first : last + 1]
+        self.chunks[first : last + 1] = chunks
+        self.broken = False
+
+        try:
+            self.resolve(first, len(chunks), replaced)
+        except Exception:
+            self.broken = True
+            raise
+
+        return self.statements()
+
+    def parse(self, text: str, line: int, complete: bool) -> List[Chunk]:
+        """the chunks of the text, which starts on line and on a statement. raises when
+        it does not parse, or when it is not the whole source and its last token could
+        go on past it"""
+        (tokens, end_line, taken) = scan(text, line, None if complete else len(text))
+        if taken < len(text):
+            raise RuntimeError(f"Line {end_line}: Expected the token to end")
+        tokens.append(Token(TokenType.EOF, "", None, end_line))
+
+        ends = token_ends(text)
+        parser = Parser(tokens)
+        chunks: List[Chunk] = []
+        position = 0
+        while not parser.is_at_end():
+            statement = parser.declaration()
+            stop = ends[parser.current - 1]
+            newlines = text.count("\n", position, stop)
+            chunks.append(Chunk(stop - position, newlines, statement))
+            position = stop
+
+        chunks.append(Chunk(len(text) - position, text.count("\n", position), None))
+        return chunks
+
+    def resolve(self, first: int, count: int, replaced: List[Chunk]):
+        """resolves the count chunks from first that replaced the others, and the chunks
+        after them when they don't declare the same globals"""
+        visible = [name for chunk in self.chunks[:first] for name in chunk.declared]
+        resolver = Resolver.with_globals(self.natives, self.slots, visible)
+
+        before = {name for chunk in replaced for name in chunk.declared}
+        declared = set()
+        for (i, chunk) in enumerate(self.chunks[first:], first):
+            if i == first + count and declared == before:
+                break
+
+            known = len(resolver.declared_globals)
+            if chunk.statement is not None:
+                resolver.resolve(chunk.statement)
+            chunk.declared = resolver.declared_globals[known:]
+            declared.update(chunk.declared)
@@ -1,6 +1,29 @@
-from typing import Any, List, Tuple
+import operator
+from typing import Any, Callable, List, Tuple
+from src.pychart._interpreter.helpers.array import Elements, PychartArray
 from src.pychart._interpreter.helpers.callable import PychartCallable
-from src.pychart._interpreter.visitors.interpreter import PychartArray
+from src.pychart._interpreter.helpers.number_helpers import is_number
+
+
+# the bulk operations each run as one loop in python (mostly inside builtins) instead of
+# one interpreted loop iteration per element, both interpreters share them
+
+
+def elements_of(array: Any, name: str, position: str = "first") -> Elements:
+    if not isinstance(array, PychartArray):
+        raise RuntimeError(f"{name}'s {position} argument must be an array")
+    return array.elems
+
+
+def map_elements(array: Any, call: Callable[[Any], Any]) -> PychartArray:
+    # a snapshot, so the callback changing the array doesn't change what is visited
+    elems = elements_of(array, "map")[:]
+    return PychartArray([call(elem) for elem in elems])
+
+
+def filter_elements(array: Any, call: Callable[[Any], Any]) -> PychartArray:
+    elems = elements_of(array, "filter")[:]
+    return PychartArray([elem for elem in elems if call(elem)])
 
 
 class ArrayMethods:
@@ -12,7 +35,7 @@ class ArrayMethods:
             if not isinstance(array, PychartArray):
                 raise RuntimeError("push's first argument must be an array")
 
-            array.elems.append(item)
+            array.push(item)
             return array
 
         def arity(self, args: List[Any]) -> Tuple[bool, str]:
@@ -31,7 +54,7 @@ class ArrayMethods:
             if len(array.elems) == 0:
                 raise RuntimeError("Cannot pop array of length 0")
 
-            return array.elems.pop()
+            return array.pop()
 
         def arity(self, args: List[Any]) -> Tuple[bool, str]:
             return (
@@ -53,3 +76,154 @@ class ArrayMethods:
                 len(args) != 1,
                 "push can only have one argument",
             )
+
+    class Sum(PychartCallable):
+        def __call__(self, args: List[Any]) -> Any:
+            elems = elements_of(args[0], "sum")
+            if len(elems) == 0:
+                # not the int python gives, every other number the VM makes is a float
+                return 0.0
+
+            try:
+                return sum(elems)
+            except TypeError as err:
+                raise RuntimeError("sum's array can only contain numbers") from err
+
+        def arity(self, args: List[Any]) -> Tuple[bool, str]:
+            return (
+                len(args) != 1,
+                "sum can only have one argument",
+            )
+
+    class Extreme(PychartCallable):
+        name: str
+        pick: Callable[[Elements], Any]
+
+        def __init__(self, name: str, pick: Callable[[Elements], Any]) -> None:
+            self.name = name
+            self.pick = pick
+
+        def __call__(self, args: List[Any]) -> Any:
+            elems = elements_of(args[0], self.name)
+
+            if len(elems) == 0:
+                raise RuntimeError(f"Cannot take {self.name} of array of length 0")
+
+            try:
+                return self.pick(elems)
+            except TypeError as err:
+                raise RuntimeError(
+                    f"{self.name}'s array elements cannot be compared"
+                ) from err
+
+        def arity(self, args: List[Any]) -> Tuple[bool, str]:
+            return (
+                len(args) != 1,
+                f"{self.name} can only have one argument",
+            )
+
+    class Dot(PychartCallable):
+        def __call__(self, args: List[Any]) -> Any:
+            left = elements_of(args[0], "dot")
+            right = elements_of(args[1], "dot", "second")
+
+            if len(left) != len(right):
+                raise RuntimeError("dot's arrays must have the same length")
+            if len(left) == 0:
+                return 0.0
+
+            try:
+                return sum(map(operator.mul, left, right))
+            except TypeError as err:
+                raise RuntimeError("dot's arrays can only contain numbers") from err
+
+        def arity(self, args: List[Any]) -> Tuple[bool, str]:
+            return (
+                len(args) != 2,
+                "dot's first and second args must be arrays",
+            )
+
+    class Fill(PychartCallable):
+        def __call__(self, args: List[Any]) -> Any:
+            array = args[0]
+            elements_of(array, "fill")
+
+            array.fill(args[1])
+            return array
+
+        def arity(self, args: List[Any]) -> Tuple[bool, str]:
+            return (
+                len(args) != 2,
+                "fill's first arg must be array, second must be element",
+            )
+
+    class Range(PychartCallable):
+        def __call__(self, args: List[Any]) -> Any:
+            for arg in args:
+                if not is_number(arg) or int(arg) != arg:
+                    raise RuntimeError("range's arguments must be whole numbers")
+
+            try:
+                values = range(*[int(arg) for arg in args])
+            except ValueError as err:
+                raise RuntimeError("range's step cannot be 0") from err
+
+            # the elements are the same kind of number range was given
+            if any(isinstance(arg, float) for arg in args):
+                return PychartArray(list(map(float, values)))
+            return PychartArray(list(values))
+
+        def arity(self, args: List[Any]) -> Tuple[bool, str]:
+            return (
+                not 1 <= len(args) <= 3,
+                "range takes an end, a start and an end, or a start, end and step",
+            )
+
+    class Concat(PychartCallable):
+        def __call__(self, args: List[Any]) -> Any:
+            left = elements_of(args[0], "concat")
+            right = elements_of(args[1], "concat", "second")
+
+            try:
+                return PychartArray(left + right)
+            except TypeError:
+                # a list and a packed array, or arrays packed for different numbers
+                return PychartArray(list(left) + list(right))
+
+        def arity(self, args: List[Any]) -> Tuple[bool, str]:
+            return (
+                len(args) != 2,
+                "concat's first and second args must be arrays",
+            )
+
+    class Map(PychartCallable):
+        def __call__(self, args: List[Any]) -> Any:
+            function = PychartCallable.from_expr(args[1])
+
+            error, message = function.arity([None])
+            if error:
+                raise RuntimeError(message)
+
+            return map_elements(args[0], lambda elem: function([elem]))
+
+        def arity(self, args: List[Any]) -> Tuple[bool, str]:
+            return (
+                len(args) != 2,
+                "map's first arg must be array, second must be function",
+            )
+
+    class Filter(PychartCallable):
+        def __call__(self, args: List[Any]) -> Any:
+            function = PychartCallable.from_expr(args[1])
+
+            error, message = function.arity([None])
+            if error:
+                raise RuntimeError(message)
+
+            return filter_elements(args[0], lambda elem: function([elem]))
+
+        def arity(self, args: List[Any]) -> Tuple[bool, str]:
+            return (
+                len(args) != 2,
+                "filter's first arg must be array, second must be function",
+            )
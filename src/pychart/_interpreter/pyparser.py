@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 import sys
 from src.pychart._interpreter.token_type import Token, TokenType
 from src.pychart._interpreter.ast_nodes.statement import (
@@ -26,13 +26,45 @@ from src.pychart._interpreter.ast_nodes.expression import (
     Variable,
 )
 
+# how tightly each binary operator binds its operands, they all group to the left
+BINDING_POWERS: Dict[TokenType, int] = {
+    TokenType.BANG_EQUAL: 1,
+    TokenType.EQUAL_EQUAL: 1,
+    TokenType.GREATER: 2,
+    TokenType.GREATER_EQUAL: 2,
+    TokenType.LESSER: 2,
+    TokenType.LESSER_EQUAL: 2,
+    TokenType.MINUS: 3,
+    TokenType.PLUS: 3,
+    TokenType.STAR: 4,
+    TokenType.SLASH: 4,
+}
+
+# operators before their operand, they bind tighter than any binary operator
+PREFIX_OPERATORS = {TokenType.BANG, TokenType.MINUS}
+
+# keywords that are literals
+CONSTANTS: Dict[TokenType, Any] = {
+    TokenType.FALSE: False,
+    TokenType.TRUE: True,
+    TokenType.NULL: None,
+}
+
 
 class Parser:
-    tokens: List[Token] = []
+    """pulls the tokens it needs one at a time, only the current and previous token are
+    kept so the tokens can be streamed from the scanner"""
+
+    tokens: Iterator[Token]
+    # how many tokens have been taken
     current: int = 0
+    last: Token
+    token: Token
 
-    def __init__(self, tokens: List[Token]):
-        self.tokens = tokens
+    def __init__(self, tokens: Iterable[Token]):
+        self.tokens = iter(tokens)
+        self.token = next(self.tokens)
+        self.last = self.token
 
     def parse(self):
         statements: List[Stmt] = []
@@ -46,6 +78,15 @@ class Parser:
 
         return statements
 
+    def statements(self) -> Iterator[Stmt]:
+        """the top level statements, each one parsed once the one before it was taken,
+        a parse error ends them"""
+        try:
+            while not self.is_at_end():
+                yield self.declaration()
+        except RuntimeError as err:
+            print("Error occurred: " + str(err), file=sys.stderr)
+
     def declaration(self) -> Stmt:
         if self.match(TokenType.LET):
             return self.var_declaration()
@@ -170,23 +211,25 @@ class Parser:
         return statements
 
     def previous(self) -> Token:
-        return self.tokens[self.current - 1]
+        return self.last
 
     def peek(self) -> Token:
-        return self.tokens[self.current]
+        return self.token
 
     def is_at_end(self):
-        return self.peek().token_type == TokenType.EOF
+        return self.token.token_type == TokenType.EOF
 
     def advance(self):
         if not self.is_at_end():
             self.current += 1
-        return self.previous()
+            self.last = self.token
+            self.token = next(self.tokens)
+        return self.last
 
     def check(self, token: TokenType) -> bool:
         if self.is_at_end():
             return False
-        return self.tokens[self.current].token_type == token
+        return self.token.token_type == token
 
     def match(self, *tokens_to_match: TokenType) -> bool:
         for token in tokens_to_match:
@@ -213,7 +256,7 @@ class Parser:
         return self.assignment()
 
     def assignment(self) -> Expr:
-        expr = self.equality()
+        expr = self.binary(0)
 
         if self.match(TokenType.EQUAL):
             equals = self.previous()
@@ -229,58 +272,23 @@ class Parser:
 
         return expr
 
-    def equality(self) -> Expr:
-        expr = self.comparison()
-
-        while self.match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = self.previous()
-            right = self.comparison()
-
-            expr = Binary(expr, operator, right)
-
-        return expr
-
-    def comparison(self) -> Expr:
-        expr = self.term()
-
-        while self.match(
-            TokenType.GREATER,
-            TokenType.GREATER_EQUAL,
-            TokenType.LESSER,
-            TokenType.LESSER_EQUAL,
-        ):
-            operator = self.previous()
-            right = self.term()
-
-            expr = Binary(expr, operator, right)
-
-        return expr
-
-    def term(self) -> Expr:
-        expr = self.factor()
-
-        while self.match(TokenType.MINUS, TokenType.PLUS):
-            operator = self.previous()
-            right = self.factor()
-
-            expr = Binary(expr, operator, right)
-
-        return expr
-
-    def factor(self) -> Expr:
+    def binary(self, power: int) -> Expr:
+        """the operands and operators binding tighter than power, an operator takes the
+        operand on its right with its own binding power so equal ones group to the left"""
         expr = self.unary()
 
-        while self.match(TokenType.STAR, TokenType.SLASH):
-            operator = self.previous()
-            right = self.unary()
-
-            expr = Binary(expr, operator, right)
+        while True:
+            operator = self.token
+            binding = BINDING_POWERS.get(operator.token_type)
+            if binding is None or binding <= power:
+                return expr
 
-        return expr
+            self.advance()
+            expr = Binary(expr, operator, self.binary(binding))
 
     def unary(self) -> Expr:
-        if self.match(TokenType.BANG, TokenType.MINUS):
-            operator = self.previous()
+        if self.token.token_type in PREFIX_OPERATORS:
+            operator = self.advance()
             right = self.unary()
 
             return Unary(operator, right)
@@ -290,26 +298,22 @@ class Parser:
     def index(self) -> Expr:
         expr = self.call()
 
-        while True:
-            if self.match(TokenType.LEFT_BRACK):
-                index = self.expression()
+        while self.token.token_type == TokenType.LEFT_BRACK:
+            self.advance()
+            index = self.expression()
 
-                self.consume(TokenType.RIGHT_BRACK, "Expected ']' following expression")
+            self.consume(TokenType.RIGHT_BRACK, "Expected ']' following expression")
 
-                expr = Index(expr, index)
-            else:
-                break
+            expr = Index(expr, index)
 
         return expr
 
     def call(self) -> Expr:
         expr = self.primary()
 
-        while True:
-            if self.match(TokenType.LEFT_PEREN):
-                expr = self.finish_call(expr)
-            else:
-                break
+        while self.token.token_type == TokenType.LEFT_PEREN:
+            self.advance()
+            expr = self.finish_call(expr)
 
         return expr
 
@@ -329,15 +333,17 @@ class Parser:
         return Call(callee, args)
 
     def primary(self) -> Expr:
-        if self.match(TokenType.FALSE):
-            return Literal(False)
-        if self.match(TokenType.TRUE):
-            return Literal(True)
-        if self.match(TokenType.NULL):
-            return Literal(None)
+        token_type = self.token.token_type
 
-        if self.match(TokenType.NUMBER, TokenType.STRING):
-            return Literal(self.previous().literal)
+        if token_type == TokenType.IDENTIFIER:
+            return Variable(self.advance())
+
+        if token_type == TokenType.NUMBER or token_type == TokenType.STRING:
+            return Literal(self.advance().literal)
+
+        if token_type in CONSTANTS:
+            self.advance()
+            return Literal(CONSTANTS[token_type])
 
         if self.match(TokenType.LEFT_PEREN):
             expr = self.expression()
@@ -355,7 +361,4 @@ class Parser:
             self.consume(TokenType.RIGHT_BRACK, "Expected ']' following '['")
             return Array(elems)
 
-        if self.match(TokenType.IDENTIFIER):
-            return Variable(self.previous())
-
         self.error(self.peek(), "Could not match to an expression")
@@ -1,6 +1,102 @@
-from typing import Any, Dict, List
+import re
+from sys import intern
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
 from .token_type import Token, TokenType
 
+# operators and punctuation by their lexeme
+OPERATORS: Dict[str, TokenType] = {
+    "!=": TokenType.BANG_EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    ">=": TokenType.GREATER_EQUAL,
+    "<=": TokenType.LESSER_EQUAL,
+    "+": TokenType.PLUS,
+    "-": TokenType.MINUS,
+    "*": TokenType.STAR,
+    "/": TokenType.SLASH,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    "(": TokenType.LEFT_PEREN,
+    ")": TokenType.RIGHT_PEREN,
+    "[": TokenType.LEFT_BRACK,
+    "]": TokenType.RIGHT_BRACK,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    ";": TokenType.SEMICOLON,
+    "!": TokenType.BANG,
+    "=": TokenType.EQUAL,
+    ">": TokenType.GREATER,
+    "<": TokenType.LESSER,
+}
+
+# every kind of lexeme as a named group, tried in order at each position after the
+# spaces before it. newlines are matched to count them, and any other character the
+# scanner does not recognise is skipped like comments are
+TOKEN_PATTERN = re.compile(
+    r"[ \r\t]*(?:"
+    + "|".join(
+        [
+            r"(?P<newline>\n)",
+            r"(?P<comment>//[^\n]*)",
+            # a string that is never closed runs to the end of the source
+            r'(?P<string>"[^"]*"?)',
+            r"(?P<number>\d+(?:\.\d+)?)",
+            r"(?P<identifier>[^\W\d_]\w*)",
+            "(?P<operator>" + "|".join(map(re.escape, OPERATORS)) + ")",
+            r"(?P<unknown>.)",
+        ]
+    )
+    + ")",
+    re.DOTALL,
+)
+
+
+def scan(source: str, line: int, end: Optional[int] = None) -> Tuple[List[Token], int, int]:
+    """the tokens in the source up to end, which is the end of the source if it is None,
+    the line the last one is on and how much of the source they took. when the source
+    goes on after end a token that reaches it may go on too, so it is left for later"""
+    tokens: List[Token] = []
+    keywords = Scanner.keywords
+
+    # do the tokenising, one match of the pattern for each token
+    for match in TOKEN_PATTERN.finditer(source, 0, len(source) if end is None else end):
+        kind = match.lastgroup
+        text = match.group(kind)
+
+        # names and operators repeat, the tokens share one string for each
+        if kind == "identifier":
+            token_type = keywords.get(text, TokenType.IDENTIFIER)
+            tokens.append(Token(token_type, intern(text), None, line))
+        elif kind == "operator":
+            tokens.append(Token(OPERATORS[text], intern(text), None, line))
+        elif kind == "newline":
+            line += 1
+        elif match.end() == end:
+            return (tokens, line, match.start())
+        elif kind == "number":
+            tokens.append(Token(TokenType.NUMBER, text, float(text), line))
+        elif kind == "string":
+            # a string's token is on the line it ends on
+            line += text.count("\n")
+            value = text[1:-1] if len(text) > 1 and text[-1] == '"' else text[1:]
+            # replacing the escaped newlines in it with newlines
+            value = value.replace("\\n", "\n")
+            tokens.append(Token(TokenType.STRING, text, value, line))
+
+    return (tokens, line, len(source) if end is None else end)
+
+
+# the groups of the pattern that make a token
+TOKEN_KINDS = {"identifier", "operator", "number", "string"}
+
+
+def token_ends(source: str) -> List[int]:
+    """where each token scan makes of the source ends"""
+    return [
+        match.end()
+        for match in TOKEN_PATTERN.finditer(source)
+        if match.lastgroup in TOKEN_KINDS
+    ]
+
 
 class Scanner:
     """Scanner class handles turning source text into a list of tokens
@@ -14,11 +110,9 @@ class Scanner:
 
     # Source variables
     source: str = ""
-    tokens: List[Token] = []
+    tokens: List[Token]
 
-    # Variables to track scanner
-    start: int = 0
-    current: int = 0
+    # the line the scanner has reached
     line: int = 1
 
     keywords: Dict[str, TokenType] = {
@@ -38,162 +132,37 @@ class Scanner:
 
     def __init__(self, program_text: str):
         self.source = program_text
-
-    def __is_at_end(self) -> bool:
-        return self.current >= len(self.source)
-
-    def __advance(self) -> str:
-        char = self.source[self.current]
-        self.current += 1
-        return char
-
-    def __add_token(self, token_type: TokenType, literal: Any = None):
-        text = self.source[self.start : self.current]
-        self.tokens.append(Token(token_type, text, literal, self.line))
-
-    def __match(self, char: str) -> bool:
-        if self.__is_at_end():
-            return False
-
-        if char != self.source[self.current]:
-            return False
-
-        self.current += 1
-        return True
-
-    def __peek(self) -> str:
-        if self.__is_at_end():
-            return "\0"
-        return self.source[self.current]
-
-    def __peek_next(self) -> str:
-        if self.current + 1 >= len(self.source):
-            return "\0"
-
-        return self.source[self.current + 1]
-
-    def __string(self):
-        while self.__peek() != '"' and not self.__is_at_end():
-            if self.__peek() == "\n":
-                self.line += 1
-            self.__advance()
-
-        if self.__is_at_end():
-            pass  # Throw error -> string not ended
-
-        self.__advance()
-
-        value = self.source[self.start + 1 : self.current - 1]
-        self.__add_token(TokenType.STRING, value)
-
-    def __number(self):
-        while self.__peek().isdigit():
-            self.__advance()
-
-        if self.__peek() == "." and self.__peek_next().isdigit():
-            self.__advance()
-            while self.__peek().isdigit():
-                self.__advance()
-
-        self.__add_token(
-            TokenType.NUMBER, float(self.source[self.start : self.current])
-        )
-
-    def __identifier(self):
-        char = self.__peek()
-        while char.isalnum() or char == '_':
-            self.__advance()
-            char = self.__peek()
-
-        text = self.source[self.start : self.current]
-
-        type_of = self.keywords.get(text)
-        if type_of is None:
-            type_of = TokenType.IDENTIFIER
-
-        self.__add_token(type_of)
-
-    def __scan_token(self):
-        char = self.__advance()
-
-        # Single char tokens
-        if char == "+":
-            self.__add_token(TokenType.PLUS)
-        elif char == "-":
-            self.__add_token(TokenType.MINUS)
-        elif char == "*":
-            self.__add_token(TokenType.STAR)
-        elif char == "{":
-            self.__add_token(TokenType.LEFT_BRACE)
-        elif char == "}":
-            self.__add_token(TokenType.RIGHT_BRACE)
-        elif char == "(":
-            self.__add_token(TokenType.LEFT_PEREN)
-        elif char == ")":
-            self.__add_token(TokenType.RIGHT_PEREN)
-        elif char == ",":
-            self.__add_token(TokenType.COMMA)
-        elif char == ".":
-            self.__add_token(TokenType.DOT)
-        elif char == ";":
-            self.__add_token(TokenType.SEMICOLON)
-        elif char == "[":
-            self.__add_token(TokenType.LEFT_BRACK)
-        elif char == "]":
-            self.__add_token(TokenType.RIGHT_BRACK)
-
-        # 1 or 2 char tokens
-        elif char == "!":
-            self.__add_token(
-                TokenType.BANG_EQUAL if self.__match("=") else TokenType.BANG
-            )
-        elif char == "=":
-            self.__add_token(
-                TokenType.EQUAL_EQUAL if self.__match("=") else TokenType.EQUAL
-            )
-        elif char == ">":
-            self.__add_token(
-                TokenType.GREATER_EQUAL if self.__match("=") else TokenType.GREATER
-            )
-        elif char == "<":
-            self.__add_token(
-                TokenType.LESSER_EQUAL if self.__match("=") else TokenType.LESSER
-            )
-
-        # Comments
-        elif char == "/":
-            if self.__match("/"):
-                while self.__peek() != "\n" and not self.__is_at_end():
-                    self.__advance()
-            else:
-                self.__add_token(TokenType.SLASH)
-
-        # Whitespace
-        elif char == " " or char == "\r" or char == "\t":
-            # Ignore whitespace
-            pass
-        elif char == "\n":
-            self.line += 1
-
-        # Literals
-        elif char == '"':
-            self.__string()
-        elif char.isdigit():
-            self.__number()
-        elif char.isalpha():
-            self.__identifier()
-        else:
-            pass  # Throw error -> unrecognised token
+        self.tokens = []
 
     def get_tokens(self) -> List[Token]:
-        if len(self.tokens) != 0:
-            self.tokens = []
-
-        # do the tokenising
-        while not self.__is_at_end():
-            self.start = self.current
-            self.__scan_token()
-
-        self.tokens.append(Token(TokenType.EOF, "", None, self.line))
-
-        return self.tokens
+        (tokens, self.line, _) = scan(self.source, 1)
+        tokens.append(Token(TokenType.EOF, "", None, self.line))
+
+        self.tokens = tokens
+        return tokens
+
+    @staticmethod
+    def stream(reader: TextIO, chunk_size: int = 1 << 16) -> Iterator[Token]:
+        """the tokens of the source read from the reader, scanned a chunk at a time as
+        they are needed. only strings go on past the end of a line, so every chunk is
+        scanned up to its last newline and the rest is kept for the next one"""
+        buffer = ""
+        line = 1
+
+        while True:
+            chunk = reader.read(chunk_size)
+            if not chunk:
+                break
+
+            buffer += chunk
+            end = buffer.rfind("\n") + 1
+            if end == 0:
+                continue
+
+            (tokens, line, taken) = scan(buffer, line, end)
+            buffer = buffer[taken:]
+            yield from tokens
+
+        (tokens, line, _) = scan(buffer, line)
+        yield from tokens
+        yield Token(TokenType.EOF, "", None, line)
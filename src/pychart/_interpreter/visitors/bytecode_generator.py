@@ -1,5 +1,5 @@
 
-from typing import Any, Dict, List, Callable
+from typing import Any, Dict, Iterable, List, Callable, Optional, Tuple
 
 from src.pychart._interpreter.ast_nodes.statement import *
 from src.pychart._interpreter.ast_nodes.expression import *
@@ -17,35 +17,99 @@ def remove_inner_lists(obj: List[Any]):
             result.append(val)
     return result
 
+class BytecodeGeneratorFrame:
+    """compile time view of a runtime frame (a function call, block or loop)
+    every variable that lives in the frame gets its own slot, temporaries share slots
+    once the value in them is dead. every temporary is read by exactly one instruction,
+    so it is dead as soon as that instruction has been made"""
+    size: int
+    # slots of temporaries that can be handed out again, and those still in use
+    free_temporaries: List[int]
+    live_temporaries: List[int]
+
+    def __init__(self):
+        self.size = 0
+        self.free_temporaries = []
+        self.live_temporaries = []
+
+    def allocate(self) -> int:
+        slot = self.size
+        self.size += 1
+        return slot
+
+    def allocate_temporary(self) -> Tuple[int, bool]:
+        """a slot for a temporary and whether a new one had to be made for it"""
+        is_new = len(self.free_temporaries) == 0
+        slot = self.allocate() if is_new else self.free_temporaries.pop()
+        self.live_temporaries.append(slot)
+        return (slot, is_new)
+
+    def release_temporary(self, slot: int):
+        """the temporary in the slot has been read for the last time"""
+        if slot in self.live_temporaries:
+            self.live_temporaries.remove(slot)
+            self.free_temporaries.append(slot)
+
+    def release_temporaries(self, mark: int):
+        """every temporary allocated since `mark` live temporaries is dead"""
+        while len(self.live_temporaries) > mark:
+            self.free_temporaries.append(self.live_temporaries.pop())
+
 class BytecodeGeneratorState:
-    variables : Dict[str, Any] = {}
-    bytecode  : List[bt.Bytecode] = []
-    statements: List[Stmt]     = None
-    loop_id   : str
+    variables  : Dict[str, Any] = {}
+    bytecode   : List[bt.Bytecode] = []
+    statements : List[Stmt]     = None
+    loop_id    : str
+    loop_level : int
+    frame      : BytecodeGeneratorFrame
+    frame_level: int
 
     def __init__(self, variables: Dict[str, Any],
-            bytecode: List[bt.Bytecode], statements: List[Stmt], loop_id: str):
-        self.variables  = variables
-        self.bytecode   = bytecode
-        self.statements = statements
-        self.loop_id    = loop_id
+            bytecode: List[bt.Bytecode], statements: List[Stmt], loop_id: str,
+            loop_level: int, frame: BytecodeGeneratorFrame, frame_level: int):
+        self.variables   = variables
+        self.bytecode    = bytecode
+        self.statements  = statements
+        self.loop_id     = loop_id
+        self.loop_level  = loop_level
+        self.frame       = frame
+        self.frame_level = frame_level
 
 class BytecodeGeneratorIdentifier:
     is_function: bool = False
-    name: bt.Identifier
-    def __init__(self, name: str, is_function: bool):
+    name : str
+    level: int
+    slot : int
+    def __init__(self, name: str, is_function: bool, level: int, slot: int):
         self.is_function = is_function
-        self.name        = bt.Identifier(name)
+        self.name        = name
+        self.level       = level
+        self.slot        = slot
+
+    def at(self, level: int) -> bt.Identifier:
+        """the identifier as seen from code running in a frame nested `level` deep"""
+        return bt.Identifier(self.name, level - self.level, self.slot)
 
 
 class BytecodeExpression:
+    """an instruction waiting for where its result goes, the temporaries it reads are
+    handed back to their frame once it is made"""
     callback: Callable
-    def __init__(self, callback: Callable):
+    frame   : Optional[BytecodeGeneratorFrame]
+    reads   : List[bt.Identifier]
+    def __init__(self, callback: Callable, frame: Optional[BytecodeGeneratorFrame] = None,
+            reads: Iterable[Any] = ()):
         self.callback = callback
+        self.frame    = frame
+        self.reads    = [operand for operand in reads if bt.is_temporary(operand)]
 
     def __call__(self, identifier: bt.Identifier):
         assert isinstance(identifier, bt.Identifier) or identifier is None
-        return self.callback(identifier)
+        code = self.callback(identifier)
+        # the result was given its slot before this, so it never shares one with these
+        for temporary in self.reads:
+            self.frame.release_temporary(temporary.slot)
+        return code
 
 def is_token(operator, token: TokenType):
     return operator.token_type == token
@@ -56,34 +120,63 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
     bytecode   : list[bt.Bytecode] = []
     statements : list[Stmt]     = None
     loop_id    : str = None
+    loop_level : int = 0
+    natives    : list[str] = []
+    # the natives are found after the globals, a global of the same name hides one
+    native_variables : dict[str, BytecodeGeneratorIdentifier] = {}
+
+    # the frame slots are allocated from, and how many frames deep it is
+    frame       : BytecodeGeneratorFrame = None
+    frame_level : int = 0
 
     # this is used for generated names
     generated_id : int          = 0
 
+    # how many temporaries the code asked for and how many slots they ended up needing
+    temporaries_requested : int = 0
+    temporary_slots       : int = 0
+
     def __init__(self, statements: list[Stmt], native_functions: list[str]):
-        self.statements = statements
+        self.state_stack = []
+        self.variables   = {}
+        self.bytecode    = []
+        self.statements  = statements
+        self.frame       = BytecodeGeneratorFrame()
+        self.natives     = list(native_functions)
+        self.native_variables      = {}
+        self.temporaries_requested = 0
+        self.temporary_slots       = 0
         for name in native_functions:
-            self.variables[name] = BytecodeGeneratorIdentifier(name, True)
+            self.native_variables[name] = BytecodeGeneratorIdentifier(name, True,
+                    self.frame_level, self.frame.allocate())
 
-    def push_state(self, statements: list[Stmt]):
+    def push_state(self, statements: list[Stmt], new_frame: bool = False):
         state_obj = BytecodeGeneratorState(self.variables,
-                self.bytecode, self.statements, self.loop_id)
+                self.bytecode, self.statements, self.loop_id,
+                self.loop_level, self.frame, self.frame_level)
 
         self.state_stack.append(state_obj)
         self.variables  = {}
         self.bytecode   = []
         self.statements = statements
+        if new_frame:
+            self.frame        = BytecodeGeneratorFrame()
+            self.frame_level += 1
 
     def pop_state(self):
         if len(self.state_stack) == 0:
             return None
         current_state = BytecodeGeneratorState(self.variables,
-                self.bytecode, self.statements, self.loop_id)
+                self.bytecode, self.statements, self.loop_id,
+                self.loop_level, self.frame, self.frame_level)
         old_state = self.state_stack.pop()
-        self.variables  = old_state.variables
-        self.bytecode   = old_state.bytecode
-        self.statements = old_state.statements
-        self.loop_id    = old_state.loop_id
+        self.variables   = old_state.variables
+        self.bytecode    = old_state.bytecode
+        self.statements  = old_state.statements
+        self.loop_id     = old_state.loop_id
+        self.loop_level  = old_state.loop_level
+        self.frame       = old_state.frame
+        self.frame_level = old_state.frame_level
         return current_state
 
     def next_id(self) -> int:
@@ -99,6 +192,20 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
                 return state.variables[name]
         return None
 
+    def lookup(self, name: str) -> bt.Identifier:
+        identifier = self.get_identifier(name)
+        if identifier is None:
+            identifier = self.native_variables.get(name)
+        if identifier is None:
+            raise RuntimeError(f"no variable named {name}")
+        return identifier.at(self.frame_level)
+
+    def temporary(self) -> bt.Identifier:
+        (slot, is_new) = self.frame.allocate_temporary()
+        self.temporaries_requested += 1
+        self.temporary_slots       += is_new
+        return bt.Identifier('.tmp' + str(slot), 0, slot)
+
     def push_function(self, name: str):
         if name in self.variables:
             raise RuntimeError(f"Variable {name} is already defined")
@@ -107,7 +214,8 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
             print(f"Warning: Shadowing declaration of variable {name}")
 
         actual_name = str(len(self.state_stack)) + name
-        self.variables[name] = BytecodeGeneratorIdentifier(actual_name, True)
+        self.variables[name] = BytecodeGeneratorIdentifier(actual_name, True,
+                self.frame_level, self.frame.allocate())
 
     def push_identifier(self, name: str):
         if name in self.variables:
@@ -117,7 +225,8 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
             print(f"Warning: Shadowing declaration of variable {name}")
 
         actual_name = str(len(self.state_stack)) + name
-        self.variables[name] = BytecodeGeneratorIdentifier(actual_name, False)
+        self.variables[name] = BytecodeGeneratorIdentifier(actual_name, False,
+                self.frame_level, self.frame.allocate())
 
     def push(self, bytecode: bt.Bytecode):
         self.bytecode.append(bytecode)
@@ -129,25 +238,49 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
         return temporary
 
     def gen_internal_bytecode_expression(self, code: BytecodeExpression):
-        temporary_name = '.tmp' + str(self.next_id())
-        temporary   = bt.Identifier(temporary_name)
+        temporary   = self.temporary()
         create_temp = bt.Create(temporary)
         set_value   = code(temporary)
         return ([create_temp, set_value], temporary)
 
-    def generate(self, keep_labels: bool = False):
-        return self.internal_generate(True, keep_labels)
+    def gen_condition(self, expr: Expr) -> bt.Identifier:
+        value = expr(self)
+        if isinstance(value, Variable):
+            return self.lookup(value.name.lexeme)
+        if isinstance(value, Literal):
+            temporary = self.temporary()
+            self.push(bt.Create(temporary))
+            self.push(bt.Push(temporary, bt.Value(value.value)))
+            return temporary
+        if isinstance(value, bt.Push):
+            #assignment expression
+            self.push(value)
+            return value.identifier
+        if isinstance(value, BytecodeExpression):
+            return self.gen_bytecode_expression(value)
+        raise RuntimeError("invalid condition")
 
-    def internal_generate(self, should_solve: bool, keep_labels: bool = False):
+    def generate(self, keep_labels: bool = False, compact: bool = False):
         try:
-            for statement in self.statements:
-                statement(self)
+            bytecode = self.internal_generate()
         except RuntimeError as err:
             print(f"Error: {err}")
             print("Exiting...")
             return None
-        if should_solve:
-            self.bytecode = bt.solve_block(self.bytecode, keep_labels=keep_labels)
+
+        # the global frame is created by the program itself, natives are loaded into it
+        prologue: List[bt.Bytecode] = [bt.Frame(self.frame.size)]
+        for name in self.natives:
+            prologue.append(bt.Native(self.native_variables[name].at(self.frame_level)))
+
+        return bt.solve_block(prologue + bytecode, keep_labels=keep_labels, compact=compact)
+
+    def internal_generate(self):
+        for statement in self.statements:
+            # a temporary never outlives the statement it was made for
+            mark = len(self.frame.live_temporaries)
+            statement(self)
+            self.frame.release_temporaries(mark)
         return self.bytecode
 
     def expression(self, stmt: Expression) -> Any:
@@ -163,7 +296,7 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
     def let(self, stmt: Let) -> Any:
         name = stmt.name.lexeme
         self.push_identifier(name)
-        identifier = self.get_identifier(name).name
+        identifier = self.lookup(name)
         self.push(bt.Create(identifier))
 
         if stmt.initializer is not None:
@@ -171,8 +304,7 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
             if isinstance(value, Literal):
                 self.push(bt.Push(identifier, bt.Value(value.value)))
             elif isinstance(value, Variable):
-                value_name = self.get_identifier(value.name.lexeme).name
-                self.push(bt.Push(identifier, value_name))
+                self.push(bt.Push(identifier, self.lookup(value.name.lexeme)))
             elif isinstance(value, BytecodeExpression):
                 self.push(value(identifier))
             else:
@@ -182,32 +314,38 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
         #HACK: block creates a function with and immediately executes it
         #      this is because I'm dumb and forgot blocs existed
 
-        self.push_state(stmt.statements)
-        bytecode = self.internal_generate(False)
-        block = [bt.Frame()] + bytecode + [bt.Raze()]
+        self.push_state(stmt.statements, new_frame=True)
+        bytecode = self.internal_generate()
+        state = self.pop_state()
 
-        self.pop_state()
+        block = [bt.Frame(state.frame.size)] + remove_inner_lists(bytecode) + [bt.Raze()]
         self.push(block)
 
     def function(self, stmt: Function) -> Any:
         name: str = stmt.name.lexeme
+        self.push_function(name)
+        identifier = self.lookup(name)
+
+        self.push_state(stmt.body, new_frame=True)
+        # a break can't jump out of the function it is in
+        self.loop_id = None
+
+        # the arguments are bound to the first slots of the call frame
         params : list[bt.Identifier] = []
         for param in stmt.params:
-            params.append(bt.Identifier(param.lexeme))
-
-        self.push_function(name)
+            variable = BytecodeGeneratorIdentifier(param.lexeme, False,
+                    self.frame_level, self.frame.allocate())
+            self.variables[param.lexeme] = variable
+            params.append(variable.at(self.frame_level))
 
-        self.push_state(stmt.body)
-        for param in params:
-            self.variables[param.value] = BytecodeGeneratorIdentifier(param.value, False)
-        bytecodes = self.internal_generate(False)
+        bytecodes = self.internal_generate()
         bytecodes.append(bt.Return(None))
         # needed to get the actual number of instructions in the function
         # but it is actually wrong at this point and would lead to erroneous jumps
         bytecodes = remove_inner_lists(bytecodes)
-        fun = bt.Function(self.get_identifier(name).name, params, len(bytecodes))
+        state = self.pop_state()
+        fun = bt.Function(identifier, params, len(bytecodes), state.frame.size)
 
-        self.pop_state()
         self.push(fun)
         for bytecode in bytecodes:
             self.push(bytecode)
@@ -224,7 +362,7 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
 
         temporary = None
         if isinstance(expr, Variable):
-            temporary = self.get_identifier(expr.name.lexeme).name
+            temporary = self.lookup(expr.name.lexeme)
         elif isinstance(expr, bt.Push):
             #assignment expression
             temporary = expr.identifier
@@ -242,47 +380,34 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
             expr = expr.right
 
         name       : str = str(self.next_id()) + 'if'
-        temporary  : bt.Identifier = None
         true_block : List[bt.Bytecode] = []
         false_block: List[bt.Bytecode] = []
 
-        expr = expr(self)
-        if isinstance(expr, Variable):
-            temporary = self.get_identifier(expr.name).name
-        elif isinstance(expr, Literal):
-            temporary_name = '.tmp' + str(self.next_id())
-            temporary   = bt.Identifier(temporary_name)
-            create_temp = bt.Create(temporary)
-            set_value   = bt.Push(temporary, bt.Value(expr.value))
-            self.push(create_temp)
-            self.push(set_value)
-        elif isinstance(expr, bt.Push):
-            #assignment expression
-            temporary = expr.identifier
-            self.push(expr)
-        elif isinstance(expr, BytecodeExpression):
-            temporary = self.gen_bytecode_expression(expr)
+        # the condition is read by the jump before either branch runs
+        mark = len(self.frame.live_temporaries)
+        temporary = self.gen_condition(expr)
+        self.frame.release_temporaries(mark)
 
         if_body = stmt.if_body
         if if_body is not None:
             if isinstance(if_body, Block):
                 self.push_state(if_body.statements)
-                true_block = self.internal_generate(False)
+                true_block = self.internal_generate()
                 self.pop_state()
             else:
                 self.push_state([stmt.if_body])
-                true_block = self.internal_generate(False)
+                true_block = self.internal_generate()
                 self.pop_state()
 
         if stmt.else_body is not None:
             if isinstance(stmt.else_body, Block):
                 else_body: Block = stmt.else_body
                 self.push_state(else_body.statements)
-                false_block = self.internal_generate(False)
+                false_block = self.internal_generate()
                 self.pop_state()
             else:
                 self.push_state([stmt.else_body])
-                false_block = self.internal_generate(False)
+                false_block = self.internal_generate()
                 self.pop_state()
 
         true_block  = remove_inner_lists(true_block)
@@ -291,54 +416,37 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
 
 
     def while_stmt(self, stmt: While) -> Any:
-        expr = stmt.while_test
-
         name       : str               = str(self.next_id()) + 'while'
-        temporary  : bt.Identifier     = None
         block      : List[bt.Bytecode] = []
 
-
-        header = None
-        expr = expr(self)
-        if isinstance(expr, Variable):
-            temporary = self.get_identifier(expr.name).name
-        elif isinstance(expr, Literal):
-            temporary_name = '.tmp' + str(self.next_id())
-            temporary   = bt.Identifier(temporary_name)
-            create_temp = bt.Create(temporary)
-            set_value   = bt.Push(temporary, bt.Value(expr.value))
-            self.push(create_temp)
-            self.push(set_value)
-        elif isinstance(expr, bt.Push):
-            #assignment expression
-            temporary = expr.identifier
-            self.push(expr)
-        elif isinstance(expr, BytecodeExpression):
-            (header, temporary) = self.gen_internal_bytecode_expression(expr)
-
         while_body = stmt.while_body
         if isinstance(while_body, Block):
             while_body = while_body.statements
         else:
             while_body = [while_body]
 
-        self.push_state(while_body)
-        self.loop_id = name
-        block = self.internal_generate(False)
-        self.pop_state()
+        # the loop runs in its own frame, the condition is evaluated inside it
+        # on every iteration so it is generated into the header
+        self.push_state(while_body, new_frame=True)
+        self.loop_id    = name
+        self.loop_level = self.frame_level
+        temporary = self.gen_condition(stmt.while_test)
+        header = remove_inner_lists(self.bytecode)
+        self.bytecode = []
+        block = self.internal_generate()
+        state = self.pop_state()
 
         block  = remove_inner_lists(block)
-        self.push(bt.Frame())
-        if (header != None):
-            self.push(header[0])
-            self.push(bt.While(name, [header[1]], temporary, block))
-        else:
-            self.push(bt.While(name, None, temporary, block))
+        self.push(bt.Frame(state.frame.size))
+        self.push(bt.While(name, header, temporary, block))
         self.push(bt.Raze())
 
     def break_stmt(self, stmt: Break) -> Any:
         if self.loop_id is None:
             raise RuntimeError('break outside of loop')
+        # leave every frame opened since the loop started, the loop razes its own
+        for _ in range(self.frame_level - self.loop_level):
+            self.push(bt.Raze())
         self.push(bt.Jump(bt.Label('.end_' + self.loop_id)))
 
     def binary_find_common_type(self, left, right):
@@ -411,13 +519,12 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
         if binary_bytecode is None:
             raise RuntimeError(f"unsuported unary operator '{expr.operator}'")
 
-        left_val  = bt.Identifier('.tmp' + str(self.next_id()))
-        right_val = bt.Identifier('.tmp' + str(self.next_id()))
         if isinstance(left, Variable):
-            left_val = self.get_identifier(left.name.lexeme).name
+            left_val = self.lookup(left.name.lexeme)
         elif isinstance(left, Literal):
             left_val = bt.Value(left.value)
         else:
+            left_val  = self.temporary()
             temporary = bt.Create(left_val)
             self.push(temporary)
             if isinstance(left, BytecodeExpression):
@@ -425,10 +532,11 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
                 self.push(set_value)
 
         if isinstance(right, Variable):
-            right_val = self.get_identifier(right.name.lexeme).name
+            right_val = self.lookup(right.name.lexeme)
         elif isinstance(right, Literal):
             right_val = bt.Value(right.value)
         else:
+            right_val = self.temporary()
             temporary = bt.Create(right_val)
             self.push(temporary)
             if isinstance(right, BytecodeExpression):
@@ -436,7 +544,7 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
                 self.push(set_value)
 
         return BytecodeExpression(lambda result:
-               binary_bytecode(result, left_val, right_val))
+               binary_bytecode(result, left_val, right_val), self.frame, [left_val, right_val])
 
     def unary(self, expr: Unary) -> Any:
         right = expr.right(self)
@@ -456,18 +564,17 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
         if unary_bytecode is None:
             raise RuntimeError(f"unsupported unary operator '{expr.operator}'")
 
-        temporary_name = '.tmp' + str(self.next_id())
         if isinstance(right, Variable):
-            temporary_name = self.get_identifier(right.name.lexeme).name.value
+            value = self.lookup(right.name.lexeme)
         else:
-            temporary = bt.Create(bt.Identifier(temporary_name))
-            self.push(temporary)
+            value = self.temporary()
+            self.push(bt.Create(value))
             if isinstance(right, BytecodeExpression):
-                set_value = right(bt.Identifier(temporary_name))
+                set_value = right(value)
                 self.push(set_value)
 
         return BytecodeExpression(lambda result:
-               unary_bytecode(result, bt.Identifier(temporary_name)))
+               unary_bytecode(result, value), self.frame, [value])
 
     def literal(self, expr: Literal) -> Any:
         return expr
@@ -483,17 +590,24 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
         value = expr.initializer(self)
         if isinstance(value, BytecodeExpression):
             temporary = self.gen_bytecode_expression(value)
-            return bt.Push(self.get_identifier(name).name, temporary)
-        #NOCHEKIN:
-        return bt.Push(self.get_identifier(name).name, bt.Value(value.value))
+            return bt.Push(self.lookup(name), temporary)
+        if isinstance(value, Variable):
+            return bt.Push(self.lookup(name), self.lookup(value.name.lexeme))
+        if isinstance(value, bt.Push):
+            #chained assignment
+            self.push(value)
+            return bt.Push(self.lookup(name), value.identifier)
+        return bt.Push(self.lookup(name), bt.Value(value.value))
 
     def call(self, expr: Call) -> Any:
         callee = expr.callee(self)
         if not isinstance(callee, Variable):
             raise RuntimeError("invalid call expression")
         function_name = callee.name.lexeme
-        if self.get_identifier(function_name) is None:
+        if (self.get_identifier(function_name) is None
+                and function_name not in self.native_variables):
             raise RuntimeError(f"no function named {function_name}")
+        function = self.lookup(function_name)
 
         #TODO: make functions have a return type so that we can cascade pseudo typing
         # if not self.get_identifier(function_name).is_function:
@@ -503,11 +617,7 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
         for arg in expr.arguments:
             val = arg(self)
             if isinstance(val, Variable):
-                name = val.name.lexeme
-                if self.get_identifier(name) is not None:
-                    args.append(self.get_identifier(name).name)
-                else:
-                    raise RuntimeError(f"no variable named {name}")
+                args.append(self.lookup(val.name.lexeme))
             elif isinstance(val, Literal):
                 args.append(bt.Value(val.value))
             elif isinstance(val, BytecodeExpression):
@@ -517,18 +627,14 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
                 raise RuntimeError("invalid call expression")
 
         return BytecodeExpression(lambda result:
-                bt.Call(result, self.get_identifier(function_name).name, args))
+                bt.Call(result, function, args), self.frame, args)
 
     def array(self, expr: Array) -> Any:
         elements : List[Any] = []
         for elem in expr.elems:
             val = elem(self)
             if isinstance(val, Variable):
-                name = val.name.lexeme
-                if self.get_identifier(name) is not None:
-                    elements.append(self.get_identifier(name).name)
-                else:
-                    raise RuntimeError(f"no variable named {name}")
+                elements.append(self.lookup(val.name.lexeme))
             elif isinstance(val, Literal):
                 elements.append(bt.Value(val.value))
             elif isinstance(val, BytecodeExpression):
@@ -536,7 +642,8 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
                 elements.append(temporary)
             else:
                 raise RuntimeError("invalid array")
-        return BytecodeExpression(lambda result: bt.Array(result, elements))
+        return BytecodeExpression(lambda result: bt.Array(result, elements),
+                self.frame, elements)
 
     def solve_index(self, expr: Index):
         obj   = expr.indexee(self)
@@ -547,11 +654,7 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
 
         temporary = None
         if isinstance(obj, Variable):
-            name = obj.name.lexeme
-            if self.get_identifier(name) is not None:
-                temporary = self.get_identifier(name).name
-            else:
-                raise RuntimeError(f"no variable named {name}")
+            temporary = self.lookup(obj.name.lexeme)
         elif isinstance(obj, BytecodeExpression):
             temporary = self.gen_bytecode_expression(obj)
 
@@ -560,11 +663,7 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
 
         index_value = None
         if isinstance(index, Variable):
-            name = index.name.lexeme
-            if self.get_identifier(name) is not None:
-                index_value = self.get_identifier(name).name
-            else:
-                raise RuntimeError(f"no variable named {name}")
+            index_value = self.lookup(index.name.lexeme)
         elif isinstance(index, Literal):
             index_value = bt.Value(index.value)
         elif isinstance(index, BytecodeExpression):
@@ -576,7 +675,8 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
     def index(self, expr: Index) -> Any:
         (obj, index) = self.solve_index(expr)
 
-        return BytecodeExpression(lambda result: bt.ArrayGetAtIndex(result, obj, index))
+        return BytecodeExpression(lambda result: bt.ArrayGetAtIndex(result, obj, index),
+                self.frame, [obj, index])
 
     def indexset(self, expr: IndexSet) -> Any:
         (obj, index) = self.solve_index(expr.index)
@@ -584,11 +684,7 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
         val = expr.value(self)
         value = None
         if isinstance(val, Variable):
-            name = val.name.lexeme
-            if self.get_identifier(name) is not None:
-                value = self.get_identifier(name).name
-            else:
-                raise RuntimeError(f"no variable named {name}")
+            value = self.lookup(val.name.lexeme)
         elif isinstance(val, Literal):
             value = bt.Value(val.value)
         elif isinstance(val, BytecodeExpression):
@@ -596,4 +692,5 @@ class BytecodeGenerator(ExprVisitor, StmtVisitor):
         else:
             raise RuntimeError("invalid array")
 
-        return BytecodeExpression(lambda result: bt.ArraySetAtIndex(obj, index, value))
+        return BytecodeExpression(lambda result: bt.ArraySetAtIndex(obj, index, value),
+                self.frame, [obj, index, value])
@@ -0,0 +1,366 @@
+import operator
+from typing import Any, Callable, List, Optional, Tuple
+from src.pychart._interpreter.ast_nodes.expression import (
+    Array,
+    Assignment,
+    Binary,
+    Call,
+    ExprVisitor,
+    Grouping,
+    Index,
+    IndexSet,
+    Literal,
+    Unary,
+    Variable,
+)
+from src.pychart._interpreter.ast_nodes.statement import (
+    Block,
+    Break,
+    Expression,
+    Function,
+    If,
+    Let,
+    Return,
+    Stmt,
+    StmtVisitor,
+    While,
+)
+from src.pychart._interpreter.helpers.array import PychartArray
+from src.pychart._interpreter.helpers.callable import PychartCallable
+from src.pychart._interpreter.helpers.environment import UNDEFINED, Environment
+from src.pychart._interpreter.helpers.indexable import PychartIndexable
+from src.pychart._interpreter.helpers.number_helpers import is_number, try_cast_int
+from src.pychart._interpreter.token_type.token_type_enum import TokenType
+from src.pychart._interpreter.visitors.interpreter import (
+    BREAK,
+    Completion,
+    ReturnValue,
+    pass_by_value,
+)
+
+# a compiled node, it is given the scope it runs in
+Compiled = Callable[[Environment], Any]
+
+# binary operators that don't need anything more than the python operator
+OPERATIONS = {
+    TokenType.STAR: operator.mul,
+    TokenType.SLASH: operator.truediv,
+    TokenType.MINUS: operator.sub,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.GREATER: operator.gt,
+    TokenType.LESSER_EQUAL: operator.le,
+    TokenType.LESSER: operator.lt,
+    TokenType.EQUAL_EQUAL: operator.eq,
+    TokenType.BANG_EQUAL: operator.ne,
+}
+
+
+def fail(message: str) -> Compiled:
+    """a node that is only an error once it runs, like it is for the Interpreter"""
+
+    def failed(env: Environment) -> Any:
+        raise RuntimeError(message)
+
+    return failed
+
+
+class ClosureCompiler(ExprVisitor, StmtVisitor):
+    """compiles a resolved program into nested python closures, the same semantics as
+    the Interpreter without dispatching on the nodes every time they run
+
+    every node becomes a closure with its operator and operands already bound, it is
+    called with the Environment it runs in. statements give back what the Interpreter's
+    visitor would, completions included"""
+
+    def compile(self, stmts: List[Stmt]) -> List[Compiled]:
+        return [stmt(self) for stmt in stmts]
+
+    # Expression Visitor
+    def binary(self, expr: Binary) -> Compiled:
+        left = expr.left(self)
+        right = expr.right(self)
+        token_type = expr.operator.token_type
+
+        if token_type == TokenType.PLUS:
+
+            def add(env: Environment) -> Any:
+                left_value = left(env)
+                right_value = right(env)
+                if is_number(left_value) == is_number(right_value):
+                    return left_value + right_value
+                return str(left_value) + str(right_value)
+
+            return add
+
+        if token_type == TokenType.EQUAL:
+            return fail("Not implemented.")
+
+        operation = OPERATIONS.get(token_type)
+        if operation is None:
+            return fail("Call Binary Operator Undefined")
+
+        if isinstance(expr.right, Literal):
+            constant = try_cast_int(expr.right.value)
+            return lambda env: operation(left(env), constant)
+
+        return lambda env: operation(left(env), right(env))
+
+    def unary(self, expr: Unary) -> Compiled:
+        right = expr.right(self)
+
+        if expr.operator.token_type == TokenType.MINUS:
+            return lambda env: 0 - right(env)
+        if expr.operator.token_type == TokenType.BANG:
+            return lambda env: not right(env)
+
+        return fail("Call Unary Undefined")
+
+    def literal(self, expr: Literal) -> Compiled:
+        value = try_cast_int(expr.value)
+        return lambda env: value
+
+    def grouping(self, expr: Grouping) -> Compiled:
+        return expr.expr(self)
+
+    def variable(self, expr: Variable) -> Compiled:
+        name = expr.name.lexeme
+        depth = expr.depth
+        slot = expr.slot
+
+        if depth is None:
+            return fail(f"GET: Could not resolve variable: '{name}'")
+
+        def undefined() -> Any:
+            raise RuntimeError(f"Variable {name} is not defined")
+
+        if depth == 0:
+
+            def local(env: Environment) -> Any:
+                value = env.values[slot]
+                if value is UNDEFINED:
+                    undefined()
+                return value
+
+            return local
+
+        if depth == 1:
+
+            def enclosing(env: Environment) -> Any:
+                value = env.enclosing.values[slot]
+                if value is UNDEFINED:
+                    undefined()
+                return value
+
+            return enclosing
+
+        return lambda env: env.get_at(depth, slot, name)
+
+    def assignment(self, expr: Assignment) -> Compiled:
+        name = expr.name.lexeme
+        depth = expr.depth
+        slot = expr.slot
+        initializer = expr.initializer(self)
+
+        if depth is None:
+            return fail(f"SET: Could not resolve variable: '{name}'")
+
+        if depth == 0:
+
+            def assign_local(env: Environment) -> Any:
+                value = initializer(env)
+                values = env.values
+                if values[slot] is UNDEFINED:
+                    raise RuntimeError(f"Variable {name} not initialized")
+                values[slot] = value
+                return value
+
+            return assign_local
+
+        def assign(env: Environment) -> Any:
+            value = initializer(env)
+            env.set_at(depth, slot, name, value)
+            return value
+
+        return assign
+
+    def call(self, expr: Call) -> Compiled:
+        callee = expr.callee(self)
+        arguments = [arg(self) for arg in expr.arguments]
+
+        def call(env: Environment) -> Any:
+            callee_eval = callee(env)
+            args = [argument(env) for argument in arguments]
+
+            callable_fn = PychartCallable.from_expr(callee_eval)
+
+            error, message = callable_fn.arity(args)
+            if error:
+                raise RuntimeError(message)
+
+            return callable_fn(args)
+
+        return call
+
+    def array(self, expr: Array) -> Compiled:
+        elems = [item(self) for item in expr.elems]
+        return lambda env: PychartArray([elem(env) for elem in elems])
+
+    def index(self, expr: Index) -> Compiled:
+        indexee = expr.indexee(self)
+        index = expr.index(self)
+        return lambda env: PychartIndexable.from_expr(indexee(env)).get(index(env))
+
+    def indexset(self, expr: IndexSet) -> Compiled:
+        indexee = expr.index.indexee(self)
+        index = expr.index.index(self)
+        value = expr.value(self)
+
+        def indexset(env: Environment) -> Any:
+            indexable = PychartIndexable.from_expr(indexee(env))
+            return indexable.set(index(env), value(env))
+
+        return indexset
+
+    # Statement Visitor
+    def expression(self, stmt: Expression) -> Compiled:
+        return stmt.expr(self)
+
+    def return_stmt(self, stmt: Return) -> Compiled:
+        value = stmt.expr(self)
+        return lambda env: ReturnValue(value(env))
+
+    def let(self, stmt: Let) -> Compiled:
+        name = stmt.name.lexeme
+        slot = stmt.slot
+        initializer: Optional[Compiled] = None
+        if stmt.initializer is not None:
+            initializer = stmt.initializer(self)
+
+        def let(env: Environment) -> Any:
+            value = None
+            if initializer is not None:
+                value = initializer(env)
+
+            env.reverve(slot, name, value)
+            return value
+
+        return let
+
+    def block(self, stmt: Block) -> Compiled:
+        size = stmt.size
+        statements = self.compile(stmt.statements)
+
+        def block(env: Environment) -> Any:
+            inner = Environment(size, env)
+            for statement in statements:
+                result = statement(inner)
+                if isinstance(result, Completion):
+                    return result
+            return None
+
+        return block
+
+    def function(self, stmt: Function) -> Compiled:
+        name = stmt.name.lexeme
+        slot = stmt.slot
+        body = self.compile(stmt.body)
+
+        # the parameters take the first slots, a repeated one would share a slot
+        repeated: Optional[str] = None
+        names = set()
+        for param in stmt.params:
+            if param.lexeme in names:
+                repeated = param.lexeme
+            names.add(param.lexeme)
+
+        def function(env: Environment) -> Any:
+            if repeated is not None:
+                raise RuntimeError(f"Variable {repeated} is already defined")
+
+            fncallable = CompiledFunction(stmt, body, env)
+            env.reverve(slot, name, fncallable)
+            return fncallable
+
+        return function
+
+    def if_stmt(self, stmt: If) -> Compiled:
+        test = stmt.if_test(self)
+        body = stmt.if_body(self)
+        else_body: Optional[Compiled] = None
+        if stmt.else_body:
+            else_body = stmt.else_body(self)
+
+        def if_stmt(env: Environment) -> Any:
+            if test(env):
+                result = body(env)
+            elif else_body is not None:
+                result = else_body(env)
+            else:
+                return None
+
+            if isinstance(result, Completion):
+                return result
+            return None
+
+        return if_stmt
+
+    def while_stmt(self, stmt: While) -> Compiled:
+        test = stmt.while_test(self)
+        body = stmt.while_body(self)
+
+        def while_stmt(env: Environment) -> Any:
+            while test(env):
+                result = body(env)
+                if result is BREAK:
+                    break
+                if isinstance(result, Completion):
+                    return result
+            return None
+
+        return while_stmt
+
+    def break_stmt(self, stmt: Break) -> Compiled:
+        return lambda env: BREAK
+
+
+class CompiledFunction(PychartCallable):
+    """a function declared by compiled code, like PychartFunction it is called with the
+    arguments passed by value in a new scope nested in the one it was declared in"""
+
+    definition: Function
+    body: List[Compiled]
+    closure: Environment
+
+    def __init__(
+        self, definition: Function, body: List[Compiled], closure: Environment
+    ) -> None:
+        self.definition = definition
+        self.body = body
+        self.closure = closure
+
+    def __str__(self) -> str:
+        return f'<Function "{self.definition.name.lexeme}">'
+
+    def __call__(self, args: List[Any]) -> Any:
+        environment = Environment(self.definition.size, self.closure)
+        values = environment.values
+
+        # pylint: disable=consider-using-enumerate
+        for i in range(len(args)):
+            values[i] = pass_by_value(args[i])
+        # pylint: enable=consider-using-enumerate
+
+        for statement in self.body:
+            result = statement(environment)
+            if isinstance(result, ReturnValue):
+                return result.value
+            if isinstance(result, Completion):
+                raise RuntimeError(result.misplaced)
+
+        return None
+
+    def arity(self, args: List[Any]) -> Tuple[bool, str]:
+        return (
+            len(self.definition.params) != len(args),
+            f"Wrong amount of args used to call {self.definition.name.lexeme}, expected {len(self.definition.params)} got {len(args)}",
+        )
@@ -1,11 +1,10 @@
 from copy import deepcopy
-from typing import Any, Dict, List, Tuple
+from typing import Any, List, Optional, Tuple, Union
 from src.pychart._interpreter.ast_nodes.expression import (
     Array,
     Assignment,
     Binary,
     Call,
-    Expr,
     ExprVisitor,
     Grouping,
     Index,
@@ -22,9 +21,11 @@ from src.pychart._interpreter.ast_nodes.statement import (
     If,
     Let,
     Return,
+    Stmt,
     StmtVisitor,
     While,
 )
+from src.pychart._interpreter.helpers.array import PychartArray
 from src.pychart._interpreter.helpers.callable import PychartCallable
 from src.pychart._interpreter.helpers.environment import Environment
 from src.pychart._interpreter.helpers.indexable import PychartIndexable
@@ -33,41 +34,69 @@ from src.pychart._interpreter.token_type.token import Token
 from src.pychart._interpreter.token_type.token_type_enum import TokenType
 
 
-class BreakStatementException(Exception):
-    pass
+class Completion:
+    """handed back by a statement that stops the statements after it from running,
+    blocks, ifs and loops pass it up until a loop or function handles it"""
 
+    __slots__ = ()
+    # the error if nothing handles it
+    misplaced: str
 
-class ReturnValue(Exception):
+
+class BreakCompletion(Completion):
+    __slots__ = ()
+    misplaced = "Cannot invoke 'break;' outside of a while loop"
+
+
+class ReturnValue(Completion):
+    __slots__ = ("value",)
+    misplaced = "Cannot `return` outside of a function"
     value: Any
 
     def __init__(self, value: Any) -> None:
-        super().__init__("Cannot `return` outside of a function")
         self.value = value
 
 
+BREAK = BreakCompletion()
+
+# how often a function is called or a loop's body runs before it is compiled to closures
+HOT_CALLS = 100
+HOT_ITERATIONS = 1000
+
+
+def compile_hot(stmts: List[Stmt]) -> List[Any]:
+    # the closure compiler builds on this module, so it is only imported once needed
+    # pylint: disable=import-outside-toplevel
+    from src.pychart._interpreter.visitors.closure_compiler import ClosureCompiler
+
+    return ClosureCompiler().compile(stmts)
+
+
 class Interpreter(ExprVisitor, StmtVisitor):
-    environment: Environment
-    resolver_bindings: Dict[Expr, int]
+    """runs a program the resolver has been over, globals_size is the number of global
+    slots it returned
 
-    def __init__(self, resolver_bindings: Dict[Expr, int]):
-        self.environment = Environment()
-        self.resolver_bindings = resolver_bindings
+    when tiered, functions called HOT_CALLS times and loops whose body ran HOT_ITERATIONS
+    times are compiled to closures, which run from then on in the same scopes"""
 
-    def get(self, name: Token, expr: Expr):
-        depth = self.resolver_bindings.get(expr)
+    environment: Environment
+    tiered: bool
 
-        if depth is None:
-            raise RuntimeError(f"GET: Could not resolve variable: '{name.lexeme}'")
+    def __init__(self, globals_size: int, tiered: bool = False):
+        self.environment = Environment(globals_size)
+        self.tiered = tiered
 
-        return self.environment.get_at(depth, name.lexeme)
+    def get(self, name: Token, expr: Union[Variable, Assignment]):
+        if expr.depth is None:
+            raise RuntimeError(f"GET: Could not resolve variable: '{name.lexeme}'")
 
-    def set(self, name: Token, expr: Expr, value: Any):
-        depth = self.resolver_bindings.get(expr)
+        return self.environment.get_at(expr.depth, expr.slot, name.lexeme)
 
-        if depth is None:
+    def set(self, name: Token, expr: Union[Variable, Assignment], value: Any):
+        if expr.depth is None:
             raise RuntimeError(f"SET: Could not resolve variable: '{name.lexeme}'")
 
-        return self.environment.set_at(depth, name.lexeme, value)
+        return self.environment.set_at(expr.depth, expr.slot, name.lexeme, value)
 
     # Expression Visitor
     def binary(self, expr: Binary) -> Any:
@@ -171,92 +200,93 @@ class Interpreter(ExprVisitor, StmtVisitor):
         return stmt.expr(self)
 
     def return_stmt(self, stmt: Return) -> Any:
-        value = stmt.expr(self)
-        raise ReturnValue(value)
+        return ReturnValue(stmt.expr(self))
 
     def let(self, stmt: Let) -> Any:
         value = None
         if stmt.initializer is not None:
             value = stmt.initializer(self)
 
-        self.environment.reverve(stmt.name.lexeme, value)
+        self.environment.reverve(stmt.slot, stmt.name.lexeme, value)
 
         return value
 
     def block(self, stmt: Block) -> Any:
         previous = self.environment
-        self.environment = Environment(self.environment)
+        self.environment = Environment(stmt.size, self.environment)
 
         for statement in stmt.statements:
-            statement(self)
+            result = statement(self)
+            if isinstance(result, Completion):
+                self.environment = previous
+                return result
 
         self.environment = previous
+        return None
 
     def function(self, stmt: Function) -> Any:
-        # print(self.environment.values)
+        # the parameters take the first slots, a repeated one would share a slot
+        names = set()
+        for param in stmt.params:
+            if param.lexeme in names:
+                raise RuntimeError(f"Variable {param.lexeme} is already defined")
+            names.add(param.lexeme)
+
         fncallable = PychartFunction(stmt, self)
 
-        self.environment.reverve(stmt.name.lexeme, fncallable)
+        self.environment.reverve(stmt.slot, stmt.name.lexeme, fncallable)
         return fncallable
 
     def if_stmt(self, stmt: If) -> Any:
+        result = None
         test_result = stmt.if_test(self)
         if test_result:
-            stmt.if_body(self)
+            result = stmt.if_body(self)
         elif stmt.else_body:
-            stmt.else_body(self)
+            result = stmt.else_body(self)
+
+        if isinstance(result, Completion):
+            return result
+        return None
 
     def while_stmt(self, stmt: While) -> Any:
+        if stmt.compiled is not None:
+            return stmt.compiled(self.environment)
+
         while stmt.while_test(self):
-            try:
-                stmt.while_body(self)
-            except BreakStatementException:
+            result = stmt.while_body(self)
+            if result is BREAK:
                 break
+            if isinstance(result, Completion):
+                return result
+
+            if self.tiered:
+                stmt.iterations += 1
+                if stmt.iterations >= HOT_ITERATIONS:
+                    # the compiled loop carries on from the next test
+                    [stmt.compiled] = compile_hot([stmt])
+                    return stmt.compiled(self.environment)
         return None
 
     def break_stmt(self, stmt: Break) -> Any:
-        raise BreakStatementException("Cannot invoke 'break;' outside of a while loop")
+        return BREAK
 
 
-class PychartArray(PychartIndexable):
-    elems: List[Any]
-
-    def __init__(self, elems: List[Any]) -> None:
-        self.elems = elems
-
-    def set(self, index: Any, value: Any) -> Any:
-        if not isinstance(index, int):
-            raise RuntimeError(f'Array index "{index}" is not an integer')
-
-        if index >= len(self.elems) or index < 0:
-            raise RuntimeError(f'Array index "{index}" is out of bounds')
-
-        self.elems[index] = value
-
+def pass_by_value(value: Any) -> Any:
+    """arguments are passed by value, arrays are copied lazily when they are written to"""
+    if isinstance(value, PychartArray):
+        return value.copy()
+    if value is None or isinstance(value, (bool, int, float, str)):
         return value
-
-    def get(self, index: Any):
-        if not isinstance(index, int):
-            raise RuntimeError(f'Array index "{index}" is not an integer')
-
-        if index >= len(self.elems) or index < 0:
-            raise RuntimeError(f'Array index "{index}" is out of bounds')
-
-        return self.elems[index]
-
-    def __str__(self) -> str:
-        string = "["
-
-        for elem in self.elems:
-            string += str(elem) + ", "
-
-        return string + "]"
+    return deepcopy(value)
 
 
 class PychartFunction(PychartCallable):
     definition: Function
     interpreter: Interpreter
     closure: Environment
+    # the function as compiled code, once its definition is hot
+    promoted: Optional[PychartCallable]
 
     def __init__(
         self,
@@ -266,32 +296,55 @@ class PychartFunction(PychartCallable):
         self.definition = definition
         self.interpreter = interpreter
         self.closure = interpreter.environment
+        self.promoted = None
 
     def __str__(self) -> str:
         return f'<Function "{self.definition.name.lexeme}">'
 
     def __call__(self, args: List[Any]) -> Any:
+        if self.promoted is not None:
+            return self.promoted(args)
+
+        if self.interpreter.tiered:
+            self.definition.calls += 1
+            if self.definition.compiled is None and self.definition.calls >= HOT_CALLS:
+                self.definition.compiled = compile_hot(self.definition.body)
+            if self.definition.compiled is not None:
+                self.promoted = self.promote()
+                return self.promoted(args)
+
         previous = self.interpreter.environment
-        self.interpreter.environment = Environment(self.closure)
+        self.interpreter.environment = Environment(self.definition.size, self.closure)
 
+        # the parameters take the first slots
         # pylint: disable=consider-using-enumerate
         for i in range(len(args)):
             self.interpreter.environment.reverve(
-                self.definition.params[i].lexeme, deepcopy(args[i])
+                i, self.definition.params[i].lexeme, pass_by_value(args[i])
             )
         # pylint: enable=consider-using-enumerate
 
         value = None
-        try:
-            for statement in self.definition.body:
-                statement(self.interpreter)
-        except ReturnValue as ret:
-            value = ret.value
+        for statement in self.definition.body:
+            result = statement(self.interpreter)
+            if isinstance(result, ReturnValue):
+                value = result.value
+                break
+            if isinstance(result, Completion):
+                self.interpreter.environment = previous
+                raise RuntimeError(result.misplaced)
 
         self.interpreter.environment = previous
 
         return value
 
+    def promote(self) -> PychartCallable:
+        # pylint: disable=import-outside-toplevel
+        from src.pychart._interpreter.visitors.closure_compiler import CompiledFunction
+
+        assert self.definition.compiled is not None
+        return CompiledFunction(self.definition, self.definition.compiled, self.closure)
+
     def arity(self, args: List[Any]) -> Tuple[bool, str]:
         return (
             len(self.definition.params) != len(args),
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, Iterable, List, Union
 
 from pkg_resources import ResolutionError
 from src.pychart._interpreter.ast_nodes.expression import (
@@ -31,22 +31,58 @@ from src.pychart._interpreter.token_type.token import Token
 
 
 class Resolver(ExprVisitor, StmtVisitor):
+    """finds the scope every variable is declared in, how many scopes up from where it is
+    used that is and its slot in that scope. they are stored on the nodes using and
+    declaring the variables, blocks and functions are given the number of slots they need
+
+    the natives are looked up after the global scope, so a global of the same name hides
+    them. they live in the first slots of the global scope and the globals come after"""
+
     scopes: List[Dict[str, bool]]
-    locals: Dict[Expr, int]
+    slots: List[Dict[str, int]]
+    # every native's global slot
+    natives: Dict[str, int]
+    # the names declared in the global scope, in order
+    declared_globals: List[str]
 
     def __init__(self):
         self.scopes = [{}]
-        self.locals = {}
+        self.slots = [{}]
+        self.natives = {}
+        self.declared_globals = []
+
+    @staticmethod
+    def resolve_slots(stmts: List[Stmt], native: List[str]) -> int:
+        """resolves the program, the natives take the first global slots in order
+        returns the number of global slots"""
+        resolver = Resolver.with_natives(native)
+        resolver.resolve(stmts)
+
+        return resolver.globals_size()
 
     @staticmethod
-    def variable_bindings(stmts: List[Stmt], native: List[str]):
+    def with_natives(native: List[str]) -> "Resolver":
+        """a resolver for top level statements given to it one at a time, the natives
+        take the first global slots in order"""
         resolver = Resolver()
-        for name in native:
-            resolver.scopes[0][name] = True
+        resolver.natives = {name: slot for (slot, name) in enumerate(native)}
 
-        resolver.resolve(stmts)
+        return resolver
+
+    @staticmethod
+    def with_globals(
+        native: List[str], slots: Dict[str, int], visible: Iterable[str]
+    ) -> "Resolver":
+        """a resolver for top level statements after the ones declaring the visible
+        globals, slots has every global's slot and new globals are added to it"""
+        resolver = Resolver.with_natives(native)
+        resolver.scopes[0] = dict.fromkeys(visible, True)
+        resolver.slots[0] = slots
 
-        return resolver.locals
+        return resolver
+
+    def globals_size(self) -> int:
+        return len(self.natives) + len(self.slots[0])
 
     def resolve(
         self, thing: Union[Union[List[Stmt], List[Expr]], Union[Stmt, Expr]]
@@ -61,20 +97,39 @@ class Resolver(ExprVisitor, StmtVisitor):
         i = len(self.scopes) - 1
         while i >= 0:
             if self.scopes[i].get(name.lexeme) is not None:
-                self.locals[expr] = len(self.scopes) - 1 - i
+                expr.depth = len(self.scopes) - 1 - i
+                expr.slot = self.slots[i][name.lexeme]
                 return
             i -= 1
+        if name.lexeme in self.natives:
+            expr.depth = len(self.scopes) - 1
+            expr.slot = self.natives[name.lexeme]
+            return
         raise ResolutionError(f"Variable {name} not initialised before usage")
 
     def open_scope(self):
         self.scopes.append({})
+        self.slots.append({})
 
-    def close_scope(self):
+    def close_scope(self) -> int:
+        """closes the innermost scope, returns how many slots it needed"""
         self.scopes.pop()
+        return len(self.slots.pop())
 
-    def declare(self, name: str):
+    def declare(self, name: str) -> int:
+        """declares the name in the innermost scope, returns its slot
+        declaring a name again reuses its slot"""
         scope = self.scopes[len(self.scopes) - 1]
         scope[name] = False
+        if len(self.scopes) == 1:
+            self.declared_globals.append(name)
+
+        slots = self.slots[len(self.slots) - 1]
+        if name not in slots:
+            # the globals come after the natives
+            first = len(self.natives) if len(self.slots) == 1 else 0
+            slots[name] = first + len(slots)
+        return slots[name]
 
     def define(self, name: str):
         scope = self.scopes[len(self.scopes) - 1]
@@ -140,11 +195,11 @@ class Resolver(ExprVisitor, StmtVisitor):
     def block(self, stmt: Block):
         self.open_scope()
         self.resolve(stmt.statements)
-        self.close_scope()
+        stmt.size = self.close_scope()
         return None
 
     def let(self, stmt: Let):
-        self.declare(stmt.name.lexeme)
+        stmt.slot = self.declare(stmt.name.lexeme)
         if stmt.initializer:
             self.resolve(stmt.initializer)
         self.define(stmt.name.lexeme)
@@ -155,7 +210,7 @@ class Resolver(ExprVisitor, StmtVisitor):
         return None
 
     def function(self, stmt: Function) -> Any:
-        self.declare(stmt.name.lexeme)
+        stmt.slot = self.declare(stmt.name.lexeme)
         self.define(stmt.name.lexeme)
 
         self.open_scope()
@@ -163,7 +218,7 @@ class Resolver(ExprVisitor, StmtVisitor):
             self.declare(param.lexeme)
             self.define(param.lexeme)
         self.resolve(stmt.body)
-        self.close_scope()
+        stmt.size = self.close_scope()
 
     def if_stmt(self, stmt: If) -> Any:
         self.resolve(stmt.if_test)
@@ -0,0 +1,570 @@
+from copy import deepcopy
+from types import FunctionType
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from src.pychart._interpreter.ast_nodes.expression import (
+    Array,
+    Assignment,
+    Binary,
+    Call,
+    Expr,
+    ExprVisitor,
+    Grouping,
+    Index,
+    IndexSet,
+    Literal,
+    Unary,
+    Variable,
+)
+from src.pychart._interpreter.ast_nodes.statement import (
+    Block,
+    Break,
+    Expression,
+    Function,
+    If,
+    Let,
+    Return,
+    Stmt,
+    StmtVisitor,
+    While,
+)
+from src.pychart._interpreter.helpers.array import PychartArray
+from src.pychart._interpreter.helpers.callable import PychartCallable
+from src.pychart._interpreter.helpers.indexable import PychartIndexable
+from src.pychart._interpreter.helpers.number_helpers import is_number, try_cast_int
+from src.pychart._interpreter.token_type.token_type_enum import TokenType
+from src.pychart._interpreter.visitors.interpreter import (
+    BREAK,
+    ReturnValue,
+    pass_by_value,
+)
+
+# a variable's declaration, the node of the scope declaring it and its slot there
+Declaration = Tuple[int, int]
+
+# binary operators pychart shares with python
+OPERATORS = {
+    TokenType.STAR: "*",
+    TokenType.SLASH: "/",
+    TokenType.MINUS: "-",
+    TokenType.GREATER_EQUAL: ">=",
+    TokenType.GREATER: ">",
+    TokenType.LESSER_EQUAL: "<=",
+    TokenType.LESSER: "<",
+    TokenType.EQUAL_EQUAL: "==",
+    TokenType.BANG_EQUAL: "!=",
+}
+
+
+class TranspiledFunction(PychartCallable):
+    """a pychart function compiled to a python function taking its arguments positionally,
+    the python function copies its arguments so they are passed by value"""
+
+    name: str
+    params: int
+    function: Callable[..., Any]
+
+    def __init__(self, name: str, params: int, function: Callable[..., Any]) -> None:
+        self.name = name
+        self.params = params
+        self.function = function
+
+    def __str__(self) -> str:
+        return f'<Function "{self.name}">'
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "TranspiledFunction":
+        """passed by value it gets copies of the variables it carries in as defaults, like
+        a PychartFunction gets a copy of its closure"""
+        copied = TranspiledFunction(self.name, self.params, self.function)
+        memo[id(self)] = copied
+
+        function = self.function
+        copied.function = FunctionType(
+            function.__code__,
+            function.__globals__,
+            function.__name__,
+            function.__defaults__,
+            function.__closure__,
+        )
+        copied.function.__kwdefaults__ = deepcopy(function.__kwdefaults__, memo)
+        return copied
+
+    def __call__(self, args: List[Any]) -> Any:
+        return self.function(*args)
+
+    def arity(self, args: List[Any]) -> Tuple[bool, str]:
+        return (
+            self.params != len(args),
+            f"Wrong amount of args used to call {self.name}, expected {self.params} got {len(args)}",
+        )
+
+
+# the runtime of transpiled programs, every one of these keeps the Interpreter's semantics
+def add(left: Any, right: Any) -> Any:
+    if is_number(left) == is_number(right):
+        return left + right
+    return str(left) + str(right)
+
+
+def call(callee: Any, *args: Any) -> Any:
+    if callee.__class__ is TranspiledFunction and callee.params == len(args):
+        return callee.function(*args)
+
+    callable_fn = PychartCallable.from_expr(callee)
+    arguments = list(args)
+
+    error, message = callable_fn.arity(arguments)
+    if error:
+        raise RuntimeError(message)
+
+    return callable_fn(arguments)
+
+
+def index(indexee: Any, position: Any) -> Any:
+    return PychartIndexable.from_expr(indexee).get(position)
+
+
+def index_set(indexee: Any, position: Any, value: Any) -> Any:
+    return PychartIndexable.from_expr(indexee).set(position, value)
+
+
+def store(box: List[Any], value: Any) -> Any:
+    box[0] = value
+    return value
+
+
+def fail(message: str, *evaluated: Any) -> Any:
+    """raises once its operands have been evaluated, like the Interpreter does"""
+    raise RuntimeError(message)
+
+
+RUNTIME: Dict[str, Any] = {
+    "_add": add,
+    "_call": call,
+    "_index": index,
+    "_index_set": index_set,
+    "_store": store,
+    "_fail": fail,
+    "_array": PychartArray,
+    "_function": TranspiledFunction,
+    "_by_value": pass_by_value,
+}
+
+
+class CaptureAnalysis(ExprVisitor, StmtVisitor):
+    """finds the variables used by functions nested in the function declaring them,
+    and for every function the ones it has to carry in from outside"""
+
+    # the node of every open scope and the number of functions around it
+    scopes: List[Tuple[int, int]]
+    functions: List[Function]
+    captured: Set[Declaration]
+    free: Dict[int, List[Declaration]]
+
+    def __init__(self, program: int):
+        self.scopes = [(program, 0)]
+        self.functions = []
+        self.captured = set()
+        self.free = {}
+
+    def analyse(self, stmts: List[Stmt]):
+        for stmt in stmts:
+            stmt(self)
+
+    def use(self, expr: Any):
+        if expr.depth is None:
+            return
+
+        (node, level) = self.scopes[len(self.scopes) - 1 - expr.depth]
+        if level == len(self.functions):
+            return
+
+        declaration = (node, expr.slot)
+        self.captured.add(declaration)
+        for function in self.functions[level:]:
+            free = self.free.setdefault(id(function), [])
+            if declaration not in free:
+                free.append(declaration)
+
+    # ExprVisitor
+    def binary(self, expr: Binary) -> Any:
+        expr.left(self)
+        expr.right(self)
+
+    def unary(self, expr: Unary) -> Any:
+        expr.right(self)
+
+    def literal(self, expr: Literal) -> Any:
+        return None
+
+    def grouping(self, expr: Grouping) -> Any:
+        expr.expr(self)
+
+    def variable(self, expr: Variable) -> Any:
+        self.use(expr)
+
+    def assignment(self, expr: Assignment) -> Any:
+        expr.initializer(self)
+        self.use(expr)
+
+    def call(self, expr: Call) -> Any:
+        expr.callee(self)
+        for arg in expr.arguments:
+            arg(self)
+
+    def array(self, expr: Array) -> Any:
+        for elem in expr.elems:
+            elem(self)
+
+    def index(self, expr: Index) -> Any:
+        expr.indexee(self)
+        expr.index(self)
+
+    def indexset(self, expr: IndexSet) -> Any:
+        expr.index(self)
+        expr.value(self)
+
+    # StmtVisitor
+    def expression(self, stmt: Expression) -> Any:
+        stmt.expr(self)
+
+    def return_stmt(self, stmt: Return) -> Any:
+        stmt.expr(self)
+
+    def let(self, stmt: Let) -> Any:
+        if stmt.initializer is not None:
+            stmt.initializer(self)
+
+    def block(self, stmt: Block) -> Any:
+        self.scopes.append((id(stmt), len(self.functions)))
+        self.analyse(stmt.statements)
+        self.scopes.pop()
+
+    def function(self, stmt: Function) -> Any:
+        self.functions.append(stmt)
+        self.scopes.append((id(stmt), len(self.functions)))
+        self.analyse(stmt.body)
+        self.scopes.pop()
+        self.functions.pop()
+
+    def if_stmt(self, stmt: If) -> Any:
+        stmt.if_test(self)
+        stmt.if_body(self)
+        if stmt.else_body:
+            stmt.else_body(self)
+
+    def while_stmt(self, stmt: While) -> Any:
+        stmt.while_test(self)
+        stmt.while_body(self)
+
+    def break_stmt(self, stmt: Break) -> Any:
+        return None
+
+
+class TranspilerScope:
+    node: int
+    # the python name of every slot declared so far
+    names: Dict[int, str]
+
+    def __init__(self, node: int):
+        self.node = node
+        self.names = {}
+
+
+class Transpiler(ExprVisitor, StmtVisitor):
+    """translates a resolved program into the source of a python function and compiles it,
+    the function is called with the natives in slot order and gives back the value of
+    the last top level statement
+
+    every variable becomes a python local with a name of its own. a variable used by a
+    function nested in the one declaring it is kept in a one element list instead, the
+    list is made when the declaration runs and nested functions get it as a default
+    argument, so each one shares the variable it saw declared like it does in pychart
+
+    errors pychart raises at runtime are raised by the generated code when it runs, the
+    same messages included. a function declared directly in the body of an if or while
+    without a block is the exception, redeclaring it is only an error when that is
+    visible where it is declared"""
+
+    natives: List[str]
+    lines: List[str]
+    depth: int
+    scopes: List[TranspilerScope]
+    captured: Set[Declaration]
+    free: Dict[int, List[Declaration]]
+    counter: int
+    # loops around the statement being translated in the current function, and if there
+    # is a current function at all
+    loops: int
+    functions: int
+
+    def __init__(self, natives: List[str]):
+        self.natives = natives
+        self.lines = []
+        self.depth = 0
+        self.scopes = []
+        self.captured = set()
+        self.free = {}
+        self.counter = 0
+        self.loops = 0
+        self.functions = 0
+
+    def transpile(self, stmts: List[Stmt]) -> str:
+        program = id(stmts)
+        analysis = CaptureAnalysis(program)
+        analysis.analyse(stmts)
+        self.captured = analysis.captured
+        self.free = analysis.free
+
+        scope = TranspilerScope(program)
+        self.scopes = [scope]
+        names = [self.declare(slot, name) for (slot, name) in enumerate(self.natives)]
+
+        self.emit(f"def __program__({', '.join(names)}):")
+        self.depth += 1
+        for (slot, name) in enumerate(names):
+            if self.boxed(slot):
+                self.emit(f"{name} = [{name}]")
+        self.emit("_last = None")
+        for stmt in stmts:
+            self.emit(f"_last = {stmt(self)}")
+        self.emit("return _last")
+        self.depth -= 1
+
+        return "\n".join(self.lines) + "\n"
+
+    def compile(self, stmts: List[Stmt]) -> Callable[..., Any]:
+        namespace = dict(RUNTIME)
+        exec(compile(self.transpile(stmts), "<pychart>", "exec"), namespace)
+        return namespace["__program__"]
+
+    # helpers
+    def emit(self, line: str):
+        self.lines.append("    " * self.depth + line)
+
+    def suite(self, stmt: Stmt):
+        """the statement as the indented body of a python statement"""
+        self.depth += 1
+        start = len(self.lines)
+        stmt(self)
+        if len(self.lines) == start:
+            self.emit("pass")
+        self.depth -= 1
+
+    def scope(self) -> TranspilerScope:
+        return self.scopes[len(self.scopes) - 1]
+
+    def boxed(self, slot: int) -> bool:
+        return (self.scope().node, slot) in self.captured
+
+    def declared(self, slot: int) -> bool:
+        return slot in self.scope().names
+
+    def declare(self, slot: int, name: str) -> str:
+        self.counter += 1
+        if not name.isidentifier():
+            name = "v"
+        python_name = f"{name}_{self.counter}"
+        self.scope().names[slot] = python_name
+        return python_name
+
+    def fresh(self, name: str) -> str:
+        self.counter += 1
+        return f"_{name}_{self.counter}"
+
+    def reference(self, expr: Any) -> Optional[Tuple[str, bool]]:
+        """the python name of the variable and if it is boxed"""
+        if expr.depth is None:
+            return None
+        scope = self.scopes[len(self.scopes) - 1 - expr.depth]
+        return (scope.names[expr.slot], (scope.node, expr.slot) in self.captured)
+
+    def raise_error(self, message: str):
+        self.emit(f"raise RuntimeError({message!r})")
+
+    # ExprVisitor
+    def binary(self, expr: Binary) -> str:
+        left = expr.left(self)
+        right = expr.right(self)
+        token_type = expr.operator.token_type
+
+        if token_type == TokenType.PLUS:
+            return f"_add({left}, {right})"
+        if token_type == TokenType.EQUAL:
+            return f"_fail('Not implemented.', {left}, {right})"
+        if token_type not in OPERATORS:
+            return f"_fail('Call Binary Operator Undefined', {left}, {right})"
+
+        return f"({left} {OPERATORS[token_type]} {right})"
+
+    def unary(self, expr: Unary) -> str:
+        right = expr.right(self)
+
+        if expr.operator.token_type == TokenType.MINUS:
+            return f"(0 - {right})"
+        if expr.operator.token_type == TokenType.BANG:
+            return f"(not {right})"
+
+        return f"_fail('Call Unary Undefined', {right})"
+
+    def literal(self, expr: Literal) -> str:
+        return repr(try_cast_int(expr.value))
+
+    def grouping(self, expr: Grouping) -> str:
+        return f"({expr.expr(self)})"
+
+    def variable(self, expr: Variable) -> str:
+        reference = self.reference(expr)
+        if reference is None:
+            return repr_fail(f"GET: Could not resolve variable: '{expr.name.lexeme}'")
+
+        (name, boxed) = reference
+        return f"{name}[0]" if boxed else name
+
+    def assignment(self, expr: Assignment) -> str:
+        value = expr.initializer(self)
+        reference = self.reference(expr)
+        if reference is None:
+            return repr_fail(
+                f"SET: Could not resolve variable: '{expr.name.lexeme}'", value
+            )
+
+        (name, boxed) = reference
+        return f"_store({name}, {value})" if boxed else f"({name} := {value})"
+
+    def call(self, expr: Call) -> str:
+        arguments = [expr.callee(self)] + [arg(self) for arg in expr.arguments]
+        return f"_call({', '.join(arguments)})"
+
+    def array(self, expr: Array) -> str:
+        return f"_array([{', '.join(elem(self) for elem in expr.elems)}])"
+
+    def index(self, expr: Index) -> str:
+        return f"_index({expr.indexee(self)}, {expr.index(self)})"
+
+    def indexset(self, expr: IndexSet) -> str:
+        return (
+            f"_index_set({expr.index.indexee(self)}, {expr.index.index(self)}, "
+            f"{expr.value(self)})"
+        )
+
+    # StmtVisitor, each emits the statement and gives back what the Interpreter would
+    def expression(self, stmt: Expression) -> str:
+        value = self.fresh("value")
+        self.emit(f"{value} = {stmt.expr(self)}")
+        return value
+
+    def return_stmt(self, stmt: Return) -> str:
+        value = stmt.expr(self)
+        if self.functions == 0:
+            self.emit(value)
+            self.raise_error(ReturnValue.misplaced)
+        else:
+            self.emit(f"return {value}")
+        return "None"
+
+    def let(self, stmt: Let) -> str:
+        value = "None"
+        if stmt.initializer is not None:
+            value = stmt.initializer(self)
+
+        if self.declared(stmt.slot):
+            self.emit(value)
+            self.raise_error(f"Variable {stmt.name.lexeme} is already defined")
+            return "None"
+
+        name = self.declare(stmt.slot, stmt.name.lexeme)
+        if self.boxed(stmt.slot):
+            self.emit(f"{name} = [{value}]")
+            return f"{name}[0]"
+
+        self.emit(f"{name} = {value}")
+        return name
+
+    def block(self, stmt: Block) -> str:
+        self.scopes.append(TranspilerScope(id(stmt)))
+        for statement in stmt.statements:
+            statement(self)
+        self.scopes.pop()
+        return "None"
+
+    def function(self, stmt: Function) -> str:
+        lexeme = stmt.name.lexeme
+        params = [param.lexeme for param in stmt.params]
+        if self.declared(stmt.slot):
+            self.raise_error(f"Variable {lexeme} is already defined")
+            return "None"
+
+        name = self.declare(stmt.slot, lexeme)
+        for (i, param) in enumerate(params):
+            if param in params[:i]:
+                self.raise_error(f"Variable {param} is already defined")
+                return "None"
+
+        boxed = self.boxed(stmt.slot)
+        if boxed:
+            # made before the function, which may need it to call itself
+            self.emit(f"{name} = [None]")
+
+        # the variables of enclosing functions it uses come in as defaults
+        free = []
+        for (node, slot) in self.free.get(id(stmt), []):
+            scope = next(scope for scope in self.scopes if scope.node == node)
+            free.append(scope.names[slot])
+
+        definition = self.fresh(lexeme if lexeme.isidentifier() else "function")
+        self.scopes.append(TranspilerScope(id(stmt)))
+        arguments = [self.declare(slot, param) for (slot, param) in enumerate(params)]
+        signature = list(arguments)
+        if free:
+            signature += ["*"] + [f"{variable}={variable}" for variable in free]
+        self.emit(f"def {definition}({', '.join(signature)}):")
+
+        (loops, self.loops) = (self.loops, 0)
+        self.functions += 1
+        self.depth += 1
+        for (slot, argument) in enumerate(arguments):
+            if self.boxed(slot):
+                self.emit(f"{argument} = [_by_value({argument})]")
+            else:
+                self.emit(f"{argument} = _by_value({argument})")
+        for statement in stmt.body:
+            statement(self)
+        self.emit("return None")
+        self.depth -= 1
+        self.functions -= 1
+        self.loops = loops
+        self.scopes.pop()
+
+        function = f"_function({lexeme!r}, {len(params)}, {definition})"
+        if boxed:
+            self.emit(f"{name}[0] = {function}")
+            return f"{name}[0]"
+
+        self.emit(f"{name} = {function}")
+        return name
+
+    def if_stmt(self, stmt: If) -> str:
+        self.emit(f"if {stmt.if_test(self)}:")
+        self.suite(stmt.if_body)
+        if stmt.else_body:
+            self.emit("else:")
+            self.suite(stmt.else_body)
+        return "None"
+
+    def while_stmt(self, stmt: While) -> str:
+        self.emit(f"while {stmt.while_test(self)}:")
+        self.loops += 1
+        self.suite(stmt.while_body)
+        self.loops -= 1
+        return "None"
+
+    def break_stmt(self, stmt: Break) -> str:
+        if self.loops == 0:
+            self.raise_error(BREAK.misplaced)
+        else:
+            self.emit("break")
+        return "None"
+
+
+def repr_fail(message: str, *evaluated: str) -> str:
+    return f"_fail({', '.join([repr(message), *evaluated])})"
@@ -11,6 +11,7 @@ class Mnemonics(Enum):
     PUSH_VALUE          = auto()
     FRAME               = auto()
     RAZE                = auto()
+    NATIVE              = auto()
     # jumps
     JUMP                = auto()
     JUMP_IF_TRUE        = auto()
@@ -40,6 +41,21 @@ class Mnemonics(Enum):
     ARRAY               = auto()
     ARRAY_GET_AT_INDEX  = auto()
     ARRAY_SET_AT_INDEX  = auto()
+    # superinstructions, only made by the optimizer
+    JUMP_IF_COMPARE     = auto()
+    JUMP_IF_NOT_COMPARE = auto()
+    INCREMENT           = auto()
+    DECREMENT           = auto()
+
+# the comparisons a JUMP_IF_COMPARE can be fused from
+COMPARISONS = (
+    Mnemonics.EQUALS,
+    Mnemonics.NOT_EQUALS,
+    Mnemonics.LESS_THAN,
+    Mnemonics.LESS_THAN_EQUALS,
+    Mnemonics.GREATER_THAN,
+    Mnemonics.GREATER_THAN_EQUALS,
+)
 
 
 def union_contains(union: Union, value: Any) -> bool:
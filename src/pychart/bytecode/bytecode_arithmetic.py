@@ -1,5 +1,5 @@
-from src.pychart.bytecode.bytecode import Mnemonics
-from src.pychart.bytecode.bytecode_util import IdentifierOrValue, Identifier
+from src.pychart.bytecode.bytecode import Bytecode, Mnemonics
+from src.pychart.bytecode.bytecode_util import IdentifierOrValue, Identifier, Value
 from src.pychart.bytecode.bytecode_binary import BinaryBytecode
 from src.pychart.bytecode.bytecode_unary import UnaryBytecode
 
@@ -26,3 +26,21 @@ class Sign(UnaryBytecode):
 class Negate(UnaryBytecode):
     def __init__(self, destination: Identifier, value: IdentifierOrValue):
         super().__init__(Mnemonics.NEGATE, destination, value)
+
+class Increment(Bytecode):
+    identifier: Identifier
+    amount    : Value
+    def __init__(self, identifier: Identifier, amount: Value,
+            mnemonic: Mnemonics = Mnemonics.INCREMENT):
+        super().__init__(mnemonic)
+        if not isinstance(identifier, Identifier):
+            raise TypeError("expected an identifier")
+        if not isinstance(amount, Value) or not isinstance(amount.value, (int, float)) \
+                or isinstance(amount.value, bool):
+            raise TypeError("expected 'amount' to be a number but got: " + str(amount))
+        self.identifier = identifier
+        self.amount     = amount
+
+class Decrement(Increment):
+    def __init__(self, identifier: Identifier, amount: Value):
+        super().__init__(identifier, amount, Mnemonics.DECREMENT)
@@ -6,11 +6,15 @@ class BinaryBytecode(Bytecode):
     destination : Optional[Identifier]
     left : IdentifierOrValue
     right: IdentifierOrValue
+    # a string and a non string operand are both made strings, unless the types are known
+    # to match and the check can be skipped
+    coerce: bool = True
     def __init__(self,
             mnemonic: Mnemonics,
             destination: Optional[Identifier],
             left: IdentifierOrValue,
-            right: IdentifierOrValue
+            right: IdentifierOrValue,
+            coerce: bool = True
         ):
         if destination is not None and not isinstance(destination, Identifier):
             raise TypeError("expected an identifier")
@@ -23,5 +27,6 @@ class BinaryBytecode(Bytecode):
         self.destination = destination
         self.left  = left
         self.right = right
+        self.coerce = coerce
 
         super().__init__(mnemonic)
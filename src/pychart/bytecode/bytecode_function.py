@@ -4,13 +4,13 @@ from typing import List, Optional, Union
 # god i hate formatters
 from src.pychart.bytecode.bytecode import (Bytecode, Mnemonics, is_list_of,
                                            union_contains)
-from src.pychart.bytecode.bytecode_jumps import Jump, JumpIfTrue, JumpIfNotTrue
+from src.pychart.bytecode.bytecode_jumps import JumpBytecode
+from src.pychart.bytecode.compact import encode
 from src.pychart.bytecode.bytecode_util import (Frame, Identifier,
-                                                IdentifierOrValue, Label, Noop,
-                                                Value)
+                                                IdentifierOrValue, Label, Value)
 
 
-def solve_block(bytecodes: list[Bytecode], keep_labels: bool = False):
+def solve_block(bytecodes: list[Bytecode], keep_labels: bool = False, compact: bool = False):
     block = []
     for item in bytecodes:
         if is_list_of(Bytecode, item):
@@ -23,33 +23,67 @@ def solve_block(bytecodes: list[Bytecode], keep_labels: bool = False):
     if keep_labels:
         return block
 
+    # a label stands for the instruction after it, so it doesn't need to be in the program
     labels = {}
-    for (i, item) in enumerate(block):
+    position = 0
+    for item in block:
         if isinstance(item, Label):
-            labels[item.identifier] = i
+            labels[item.identifier] = position
+        else:
+            position += 1
 
-    for (i, item) in enumerate(block):
-        if isinstance(item, (Jump, JumpIfTrue, JumpIfNotTrue)):
+    block = remove_instructions(block, [not isinstance(item, Label) for item in block])
+    for item in block:
+        if isinstance(item, JumpBytecode):
             if not isinstance(item.location, int):
                 item.location = labels[item.location.identifier]
-        elif isinstance(item, Label):
-            block[i] = Noop()
+
+    if compact:
+        return encode(block)
     return block
 
+def remove_instructions(block: List[Bytecode], keep: List[bool]) -> List[Bytecode]:
+    """drops the instructions that aren't kept, functions are given their new length"""
+    return replace_instructions(block,
+            [[item] if kept else [] for (item, kept) in zip(block, keep)])
+
+def replace_instructions(block: List[Bytecode],
+        replacements: List[List[Bytecode]]) -> List[Bytecode]:
+    """every instruction is replaced by the instructions at its index in replacements,
+    functions are given their new length"""
+    placed_before = [0]
+    for replacement in replacements:
+        placed_before.append(placed_before[-1] + len(replacement))
+
+    result = []
+    for (i, replacement) in enumerate(replacements):
+        for item in replacement:
+            if item is block[i] and isinstance(item, Function):
+                end = i + 1 + item.num_instructions
+                item = Function(item.name, item.arguments,
+                        placed_before[end] - placed_before[i + 1], item.size)
+            result.append(item)
+    return result
+
 class Function(Bytecode):
     name: Identifier
     arguments: List[Identifier]
     num_instructions: int
-    def __init__(self, name, arguments, num_instructions):
+    size: int
+    def __init__(self, name, arguments, num_instructions, size):
         super().__init__(Mnemonics.FUNCTION)
         if not isinstance(name, Identifier):
             raise TypeError("expected an identifier but got: " + str(type(name)))
         if not is_list_of(Identifier, arguments):
             raise TypeError("expected a list of identifiers but got: " + str(type(arguments)))
+        if not isinstance(size, int) or size < len(arguments):
+            raise TypeError("expected a frame size but got: " + str(size))
 
         self.name             = name
         self.arguments        = arguments
         self.num_instructions = num_instructions
+        # number of slots in the frame created for each call, arguments come first
+        self.size             = size
 
 class Call(Bytecode):
     destination: Optional[Identifier]
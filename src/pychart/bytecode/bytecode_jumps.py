@@ -36,6 +36,35 @@ class JumpIfNotTrue(Bytecode):
         self.condition = condition
         self.location = label
 
+class JumpIfCompare(Bytecode):
+    comparison: Mnemonics
+    left      : IdentifierOrValue
+    right     : IdentifierOrValue
+    location  : Union[Label,int]
+    coerce    : bool
+    def __init__(self, comparison: Mnemonics, left: IdentifierOrValue, right: IdentifierOrValue,
+            label: Label, mnemonic: Mnemonics = Mnemonics.JUMP_IF_COMPARE, coerce: bool = True):
+        super().__init__(mnemonic)
+        if comparison not in COMPARISONS:
+            raise TypeError("expected parameter 'comparison' to be a comparison but got: '"
+                    + str(comparison) + "'")
+        if not is_identifier_or_value(left) or not is_identifier_or_value(right):
+            raise TypeError("expected the compared values to be identifiers or values")
+        if type(label) != Label:
+            raise TypeError("expected parameter 'label' to be a label but got: '" + str(label) + "'")
+        self.comparison = comparison
+        self.left       = left
+        self.right      = right
+        self.location   = label
+        self.coerce     = coerce
+
+class JumpIfNotCompare(JumpIfCompare):
+    def __init__(self, comparison: Mnemonics, left: IdentifierOrValue, right: IdentifierOrValue,
+            label: Label, coerce: bool = True):
+        super().__init__(comparison, left, right, label, Mnemonics.JUMP_IF_NOT_COMPARE, coerce)
+
+JumpBytecode = (Jump, JumpIfTrue, JumpIfNotTrue, JumpIfCompare)
+
 def If(name: str, condition: Identifier, true_block: list[Bytecode], false_block: list[Bytecode]) -> list[Bytecode]:
     if type(name) != str:
         raise TypeError("expected name to be a string")
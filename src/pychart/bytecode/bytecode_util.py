@@ -4,9 +4,19 @@ from src.pychart.bytecode.bytecode import Bytecode, Mnemonics, union_contains
 
 
 class Identifier(Bytecode):
-    def __init__(self, value):
+    value: str
+    depth: int
+    slot : int
+    def __init__(self, value: str, depth: int, slot: int):
         super().__init__(Mnemonics.NIL_CODE)
+        if not isinstance(depth, int) or depth < 0:
+            raise TypeError("expected a frame depth but got: '" + str(depth) + "'")
+        if not isinstance(slot, int) or slot < 0:
+            raise TypeError("expected a slot index but got: '" + str(slot) + "'")
+        # value is only kept around for printing, the interpreter uses depth and slot
         self.value = value
+        self.depth = depth
+        self.slot  = slot
 
 class Value(Bytecode):
     value : Union[int,str,float]
@@ -20,6 +30,10 @@ IdentifierOrValue = Union[Identifier, Value]
 def is_identifier_or_value(obj: Any):
     return isinstance(obj, (Identifier, Value))
 
+def is_temporary(obj: Any):
+    """temporaries are made by the generator for a single use, no other code can see them"""
+    return isinstance(obj, Identifier) and obj.value.startswith(".tmp")
+
 class Label(Bytecode):
     identifier: str
     def __init__(self, identifier: str):
@@ -33,8 +47,12 @@ class Noop(Bytecode):
         super().__init__(Mnemonics.NOOP)
 
 class Frame(Bytecode):
-    def __init__(self):
+    size: int
+    def __init__(self, size: int):
         super().__init__(Mnemonics.FRAME)
+        if not isinstance(size, int) or size < 0:
+            raise TypeError("expected a frame size but got: '" + str(size) + "'")
+        self.size = size
 
 class Raze(Bytecode):
     def __init__(self):
@@ -48,6 +66,14 @@ class Create(Bytecode):
             raise TypeError("expected an identifier")
         self.name = name
 
+class Native(Bytecode):
+    name: Identifier
+    def __init__(self, name: Identifier):
+        super().__init__(Mnemonics.NATIVE)
+        if not isinstance(name, Identifier):
+            raise TypeError("expected an identifier")
+        self.name = name
+
 class Push(Bytecode):
     identifier : Identifier
     value      : IdentifierOrValue
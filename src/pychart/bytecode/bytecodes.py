@@ -3,6 +3,8 @@ from src.pychart.bytecode.bytecode import *
 from src.pychart.bytecode.bytecode_array import *
 from src.pychart.bytecode.bytecode_arithmetic import *
 from src.pychart.bytecode.bytecode_conditional import *
+from src.pychart.bytecode.compact import *
 from src.pychart.bytecode.bytecode_function import *
 from src.pychart.bytecode.bytecode_jumps import *
 from src.pychart.bytecode.bytecode_util import *
+from src.pychart.bytecode.optimizer import *
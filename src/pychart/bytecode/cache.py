@@ -0,0 +1,86 @@
+import hashlib
+import marshal
+import os
+import sys
+from array import array
+from typing import List, Optional
+
+from src.pychart.bytecode.compact import LAYOUTS, MNEMONICS, CompactBytecode
+
+# compiled files are kept in this directory next to their source, like __pycache__
+CACHE_DIRECTORY = "__pychart_cache__"
+CACHE_SUFFIX    = ".pychc"
+MAGIC           = b"pychart bytecode"
+
+# bump when the generator or the optimizer make different code for the same source,
+# changes to the instruction set are caught by the fingerprint on their own
+COMPILER_VERSION = 3
+
+def fingerprint(natives: List[str]) -> str:
+    """a digest of what the words of a compiled program mean: the instruction layouts,
+    the natives in the order the generator numbered them and how words are stored"""
+    layouts = [(mnemonic.name, LAYOUTS[mnemonic]) for mnemonic in MNEMONICS]
+    words = (sys.byteorder, array("i").itemsize)
+    return hashlib.sha256(repr((layouts, natives, words)).encode("utf-8")).hexdigest()
+
+def source_hash(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+def cache_path(filename: str, optimized: bool) -> str:
+    """where the program compiled from filename is kept, optimized and unoptimized
+    programs are kept apart so switching between them does not throw either away. the
+    compiler version is only in the header, so a newer compiler writes over the file
+    an older one left instead of leaving it behind"""
+    (directory, name) = os.path.split(os.path.abspath(filename))
+    tag = "" if optimized else ".noopt"
+    return os.path.join(directory, CACHE_DIRECTORY, f"{name}{tag}{CACHE_SUFFIX}")
+
+def header(source: str, optimized: bool, natives: List[str]) -> tuple:
+    return (MAGIC, COMPILER_VERSION, fingerprint(natives), optimized, source_hash(source))
+
+def load(filename: str, source: str, optimized: bool,
+        natives: List[str]) -> Optional[CompactBytecode]:
+    """the cached program compiled from this source, None when there is none or it was
+    compiled from another source, by another compiler or is not readable. a file that
+    can't be used is removed, it is written again once the source is compiled"""
+    path = cache_path(filename, optimized)
+    try:
+        with open(path, "rb") as cached:
+            (stored, payload) = marshal.load(cached)
+        if stored != header(source, optimized, natives):
+            discard(path)
+            return None
+
+        (code, constants, identifiers, length) = payload
+        words = array("i")
+        words.frombytes(code)
+        return CompactBytecode(words, list(constants),
+                [tuple(ident) for ident in identifiers], length)
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, ValueError, TypeError):
+        discard(path)
+        return None
+
+def discard(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def store(filename: str, source: str, optimized: bool, natives: List[str],
+        program: CompactBytecode):
+    """writes the program next to its source, a cache that can't be written is skipped.
+    the file is written whole under another name first so a run reading it never sees
+    half of it"""
+    path = cache_path(filename, optimized)
+    payload = (program.code.tobytes(), program.constants,
+               [tuple(ident) for ident in program.identifiers], program.length)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temporary, "wb") as cached:
+            marshal.dump((header(source, optimized, natives), payload), cached)
+        os.replace(temporary, path)
+    except OSError:
+        discard(temporary)
@@ -0,0 +1,215 @@
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.pychart.bytecode.bytecode import Bytecode, Mnemonics
+from src.pychart.bytecode.bytecode_util import Identifier, Value
+
+# kinds of operand an instruction can have
+OPERAND      = 0 # an identifier, a value or None
+OPERAND_LIST = 1 # a count followed by that many operands
+INTEGER      = 2 # a plain number like a jump location or a frame size
+MNEMONIC     = 3 # the mnemonic of the operation a superinstruction performs
+
+# an operand word holds a pool index in the high bits and its kind in the low two bits
+IDENTIFIER_TAG = 0
+CONSTANT_TAG   = 1
+NONE_WORD      = 2
+TAG_BITS       = 2
+TAG_MASK       = 3
+
+BINARY_LAYOUT = (("destination", OPERAND), ("left", OPERAND), ("right", OPERAND),
+                 ("coerce", INTEGER))
+LOGICAL_LAYOUT = (("destination", OPERAND), ("left", OPERAND), ("right", OPERAND))
+UNARY_LAYOUT  = (("destination", OPERAND), ("value", OPERAND))
+
+# the operands of every instruction in the order they are encoded and passed to the VM
+LAYOUTS: Dict[Mnemonics, Tuple[Tuple[str, int], ...]] = {
+    Mnemonics.NIL_CODE        : (),
+    # general
+    Mnemonics.NOOP            : (),
+    Mnemonics.CREATE          : (("name", OPERAND),),
+    Mnemonics.PUSH_IDENTIFIER : (("identifier", OPERAND), ("value", OPERAND)),
+    Mnemonics.PUSH_VALUE      : (("identifier", OPERAND), ("value", OPERAND)),
+    Mnemonics.FRAME           : (("size", INTEGER),),
+    Mnemonics.RAZE            : (),
+    Mnemonics.NATIVE          : (("name", OPERAND),),
+
+    # jumps
+    Mnemonics.JUMP            : (("location", INTEGER),),
+    Mnemonics.JUMP_IF_TRUE    : (("condition", OPERAND), ("location", INTEGER)),
+    Mnemonics.JUMP_IF_FALSE   : (("condition", OPERAND), ("location", INTEGER)),
+
+    # function
+    Mnemonics.FUNCTION        : (("name", OPERAND), ("arguments", OPERAND_LIST),
+                                 ("num_instructions", INTEGER), ("size", INTEGER)),
+    Mnemonics.CALL            : (("destination", OPERAND), ("identifier", OPERAND),
+                                 ("arguments", OPERAND_LIST)),
+    Mnemonics.RETURN          : (("value", OPERAND),),
+
+    # comparisons
+    Mnemonics.EQUALS               : BINARY_LAYOUT,
+    Mnemonics.NOT_EQUALS           : BINARY_LAYOUT,
+    Mnemonics.LESS_THAN            : BINARY_LAYOUT,
+    Mnemonics.LESS_THAN_EQUALS     : BINARY_LAYOUT,
+    Mnemonics.GREATER_THAN         : BINARY_LAYOUT,
+    Mnemonics.GREATER_THAN_EQUALS  : BINARY_LAYOUT,
+    Mnemonics.LOGICAL_AND          : LOGICAL_LAYOUT,
+    Mnemonics.LOGICAL_OR           : LOGICAL_LAYOUT,
+    Mnemonics.LOGICAL_NOT          : UNARY_LAYOUT,
+
+    # arithmetic
+    Mnemonics.ADDITION       : BINARY_LAYOUT,
+    Mnemonics.SUBTRACTION    : BINARY_LAYOUT,
+    Mnemonics.DIVISION       : BINARY_LAYOUT,
+    Mnemonics.MULTIPLICATION : BINARY_LAYOUT,
+    Mnemonics.SIGN           : UNARY_LAYOUT,
+    Mnemonics.NEGATE         : UNARY_LAYOUT,
+
+    # array
+    Mnemonics.ARRAY              : (("name", OPERAND), ("values", OPERAND_LIST)),
+    Mnemonics.ARRAY_GET_AT_INDEX : (("result", OPERAND), ("array", OPERAND), ("index", OPERAND)),
+    Mnemonics.ARRAY_SET_AT_INDEX : (("array", OPERAND), ("index", OPERAND), ("value", OPERAND)),
+
+    # superinstructions
+    Mnemonics.JUMP_IF_COMPARE     : (("comparison", MNEMONIC), ("left", OPERAND),
+                                     ("right", OPERAND), ("coerce", INTEGER),
+                                     ("location", INTEGER)),
+    Mnemonics.JUMP_IF_NOT_COMPARE : (("comparison", MNEMONIC), ("left", OPERAND),
+                                     ("right", OPERAND), ("coerce", INTEGER),
+                                     ("location", INTEGER)),
+    Mnemonics.INCREMENT           : (("identifier", OPERAND), ("amount", OPERAND)),
+    Mnemonics.DECREMENT           : (("identifier", OPERAND), ("amount", OPERAND)),
+}
+assert len(LAYOUTS.keys()) == len(Mnemonics)
+
+# mnemonics are numbered from 0 without gaps so an opcode word indexes straight into this
+MNEMONICS: List[Mnemonics] = sorted(Mnemonics, key=lambda mnemonic: mnemonic.value)
+assert [mnemonic.value for mnemonic in MNEMONICS] == list(range(len(MNEMONICS)))
+
+# how many operand words an instruction has when every one of them is an OPERAND
+OPERAND_WIDTHS: List[Optional[int]] = [
+    len(LAYOUTS[mnemonic])
+    if all(kind == OPERAND for (_, kind) in LAYOUTS[mnemonic]) else None
+    for mnemonic in MNEMONICS
+]
+
+Instruction = Tuple[Mnemonics, Tuple[Any, ...]]
+
+def instruction_operands(code: Bytecode) -> Tuple[Any, ...]:
+    return tuple(getattr(code, field) for (field, _) in LAYOUTS[code.code])
+
+class CompactBytecode:
+    """linked bytecode stored as a flat array of opcode and operand words
+
+    identifiers and literals live in pools and are referenced by index, so a program
+    costs a handful of machine words per instruction instead of a tree of objects"""
+    code       : array
+    constants  : List[Any]
+    identifiers: List[Tuple[str, int, int]]
+    length     : int
+
+    def __init__(self, code: Optional[array] = None, constants: Optional[List[Any]] = None,
+            identifiers: Optional[List[Tuple[str, int, int]]] = None, length: int = 0):
+        self.code        = code if code is not None else array("i")
+        self.constants   = constants if constants is not None else []
+        self.identifiers = identifiers if identifiers is not None else []
+        self.length      = length
+
+    def __len__(self):
+        return self.length
+
+    def instructions(self) -> Iterator[Instruction]:
+        """decodes the words, every pool entry becomes a single shared operand object"""
+        identifiers = [Identifier(name, depth, slot) for (name, depth, slot) in self.identifiers]
+        constants   = [Value(constant) for constant in self.constants]
+        code = self.code
+
+        def operand(word):
+            if word == NONE_WORD:
+                return None
+            if word & TAG_MASK == IDENTIFIER_TAG:
+                return identifiers[word >> TAG_BITS]
+            return constants[word >> TAG_BITS]
+
+        pc = 0
+        end = len(code)
+        while pc < end:
+            mnemonic = MNEMONICS[code[pc]]
+            pc += 1
+            width = OPERAND_WIDTHS[mnemonic.value]
+            if width is not None:
+                # only single word operands, the common case
+                yield (mnemonic, tuple(map(operand, code[pc : pc + width])))
+                pc += width
+                continue
+
+            operands = []
+            for (_, kind) in LAYOUTS[mnemonic]:
+                if kind == OPERAND:
+                    operands.append(operand(code[pc]))
+                    pc += 1
+                elif kind == OPERAND_LIST:
+                    count = code[pc]
+                    operands.append(list(map(operand, code[pc + 1 : pc + 1 + count])))
+                    pc += 1 + count
+                elif kind == MNEMONIC:
+                    operands.append(MNEMONICS[code[pc]])
+                    pc += 1
+                else:
+                    operands.append(code[pc])
+                    pc += 1
+            yield (mnemonic, tuple(operands))
+
+class CompactEncoder:
+    code       : array
+    constants  : Dict[Tuple[type, Any], int]
+    identifiers: Dict[Tuple[str, int, int], int]
+
+    def __init__(self):
+        self.code        = array("i")
+        self.constants   = {}
+        self.identifiers = {}
+
+    def operand(self, atom: Any) -> int:
+        if atom is None:
+            return NONE_WORD
+        if isinstance(atom, Identifier):
+            key = (atom.value, atom.depth, atom.slot)
+            index = self.identifiers.setdefault(key, len(self.identifiers))
+            return index << TAG_BITS | IDENTIFIER_TAG
+        if isinstance(atom, Value):
+            # 1, 1.0 and True are equal keys, the type keeps them apart
+            key = (type(atom.value), atom.value)
+            index = self.constants.setdefault(key, len(self.constants))
+            return index << TAG_BITS | CONSTANT_TAG
+        raise TypeError("expected an identifier or a value but got: " + str(type(atom)))
+
+    def instruction(self, code: Bytecode):
+        if code.code == Mnemonics.NIL_CODE:
+            raise TypeError("cannot encode '" + type(code).__name__ + "', link the bytecode first")
+
+        self.code.append(code.code.value)
+        for (field, kind) in LAYOUTS[code.code]:
+            value = getattr(code, field)
+            if kind == OPERAND:
+                self.code.append(self.operand(value))
+            elif kind == OPERAND_LIST:
+                self.code.append(len(value))
+                self.code.extend(self.operand(atom) for atom in value)
+            elif kind == MNEMONIC:
+                self.code.append(value.value)
+            else:
+                if not isinstance(value, int):
+                    raise TypeError("expected '" + field + "' to be a number, link the bytecode first")
+                self.code.append(value)
+
+    def encode(self, bytecodes: List[Bytecode]) -> CompactBytecode:
+        for code in bytecodes:
+            self.instruction(code)
+        return CompactBytecode(self.code,
+                [value for (_, value) in self.constants],
+                list(self.identifiers),
+                len(bytecodes))
+
+def encode(bytecodes: List[Bytecode]) -> CompactBytecode:
+    return CompactEncoder().encode(bytecodes)
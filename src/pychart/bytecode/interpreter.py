@@ -1,29 +1,280 @@
-from re import I
-from typing import Callable, Dict, Any, Union, List, Optional
+import gc
+import operator
+from typing import Callable, Dict, Any, Iterator, Union, List, Optional
+from src.pychart._interpreter.helpers.array import PychartArray
 from src.pychart.bytecode.bytecodes import *
 
+# a lowered instruction, it gets its own address and returns the address to continue at
+Handler = Callable[[int], int]
+# returned by a handler to stop the dispatch loop
+HALT = -1
+
+JUMPS = (Mnemonics.JUMP, Mnemonics.JUMP_IF_TRUE, Mnemonics.JUMP_IF_FALSE,
+        Mnemonics.JUMP_IF_COMPARE, Mnemonics.JUMP_IF_NOT_COMPARE)
+
+class Scope:
+    """a runtime frame, every variable the generator placed in it has a preallocated slot
+    parent is the frame the code creating this one was lexically nested in"""
+    __slots__ = ("slots", "parent")
+    slots : List[Any]
+    parent: Optional["Scope"]
+
+    def __init__(self, size: int, parent: Optional["Scope"]):
+        self.slots  = [None] * size
+        self.parent = parent
+
+    @staticmethod
+    def called(function: "BytecodeInterpreterFunction", arguments: List[Any]) -> "Scope":
+        """the frame of a call, the arguments take the first slots and it is nested in the
+        scope the function closed over, not in the caller"""
+        scope = Scope.__new__(Scope)
+        arguments.extend([None] * (function.size - function.arity))
+        scope.slots  = arguments
+        scope.parent = function.closure
+        return scope
+
+    def ancestor(self, depth: int) -> "Scope":
+        scope = self
+        for _ in range(depth):
+            scope = scope.parent
+        return scope
+
+class CallFrame:
+    """the bookkeeping of a call in progress, what the VM needs to resume the caller
+    a return address of HALT hands the result back to whoever started the dispatch loop"""
+    __slots__ = ("function", "return_address", "caller", "write")
+    function      : "BytecodeInterpreterFunction"
+    return_address: int
+    caller        : Optional[Scope]
+    write         : Optional["Writer"]
+
+    def __init__(self, function: "BytecodeInterpreterFunction", return_address: int,
+            caller: Optional[Scope], write: Optional["Writer"]):
+        self.function       = function
+        self.return_address = return_address
+        self.caller         = caller
+        self.write          = write
+
+Reader = Callable[[Scope], Any]
+Writer = Callable[[Scope, Any], None]
+
+def reader(atom: Union[Identifier, Value]) -> Reader:
+    """builds a function reading the operand relative to the frame it is given"""
+    assert isinstance(atom, (Identifier, Value))
+    if isinstance(atom, Value):
+        value = atom.value
+        return lambda scope: value
+
+    slot = atom.slot
+    if atom.depth == 0:
+        return lambda scope: scope.slots[slot]
+    if atom.depth == 1:
+        return lambda scope: scope.parent.slots[slot]
+    if atom.depth == 2:
+        return lambda scope: scope.parent.parent.slots[slot]
+    depth = atom.depth
+    return lambda scope: scope.ancestor(depth).slots[slot]
+
+def writer(identifier: Identifier) -> Writer:
+    """builds a function writing to the identifier relative to the frame it is given"""
+    assert isinstance(identifier, Identifier)
+    slot  = identifier.slot
+    depth = identifier.depth
+    if depth == 0:
+        def write_local(scope, value):
+            scope.slots[slot] = value
+        return write_local
+    if depth == 1:
+        def write_parent(scope, value):
+            scope.parent.slots[slot] = value
+        return write_parent
+
+    def write_outer(scope, value):
+        scope.ancestor(depth).slots[slot] = value
+    return write_outer
+
+def next_instruction(pc: int) -> int:
+    return pc + 1
+
+# how many times in a row an instruction has to see the same operand types to be quickened
+QUICKEN_AFTER = 16
+# after being deoptimized this often an instruction stays generic
+DEOPTIMIZE_LIMIT = 4
+
+# the operand types a quickened instruction is specialised for
+FLOATS  = 1
+STRINGS = 2
+
+def operand_kind(lhs: Any, rhs: Any) -> Optional[int]:
+    if type(lhs) is float and type(rhs) is float:
+        return FLOATS
+    if type(lhs) is str and type(rhs) is str:
+        return STRINGS
+    return None
+
+def quickening(interpreter, left: "Reader", right: "Reader", generic: Handler,
+        specialised: Dict[int, Handler]):
+    """the adaptive form of an instruction and the function its specialised forms fall back on
+
+    the adaptive form runs the generic one while watching the operand types, once they stay
+    the same it replaces itself in the handler table with the form specialised for them,
+    a specialised form whose types stop matching deoptimizes back to the adaptive form"""
+    observed        = None
+    count           = 0
+    deoptimizations = 0
+
+    def adaptive(pc):
+        nonlocal observed, count
+        scope = interpreter.current_scope
+        kind = operand_kind(left(scope), right(scope))
+        if kind is not None and kind == observed:
+            count += 1
+            if count >= QUICKEN_AFTER:
+                interpreter.handlers[pc] = specialised[kind]
+                interpreter.quickened += 1
+        else:
+            observed = kind
+            count    = 1
+        return generic(pc)
+
+    def deoptimize(pc):
+        nonlocal observed, count, deoptimizations
+        observed = None
+        count    = 0
+        deoptimizations += 1
+        interpreter.deoptimized += 1
+        # an instruction that keeps changing types isn't worth watching any more
+        interpreter.handlers[pc] = adaptive if deoptimizations < DEOPTIMIZE_LIMIT else generic
+        return generic(pc)
+
+    return (adaptive, deoptimize)
+
 class BinaryEvaluator:
     evaluator: Callable[[Any, Any], Any]
     mnemonic: Mnemonics
-    def __init__(self, evaluator: Callable[[Any, Any], Any], mnemonic: Mnemonics):
+    # the same operation without coercion, used once the operand types are known
+    operation: Optional[Callable[[Any, Any], Any]]
+    def __init__(self, evaluator: Callable[[Any, Any], Any], mnemonic: Mnemonics,
+            operation: Optional[Callable[[Any, Any], Any]] = None):
         self.evaluator = evaluator
         self.mnemonic = mnemonic
-
-    def evaluate(self, interpreter, code):
-        assert code.code == self.mnemonic
-        result_symbol = None
-        if code.destination is not None:
-            result_symbol = interpreter.get_symbol_name_or_value(code.destination)
-        left  = interpreter.get(code.left )
-        right = interpreter.get(code.right)
-
-        if isinstance(left, str) and not isinstance(right, str):
-            right = str(right)
-        if isinstance(right, str) and not isinstance(left, str):
-            left = str(left)
-
-        if result_symbol is not None:
-            interpreter.set(result_symbol, self.evaluator(left, right))
+        self.operation = operation
+
+    def lower(self, interpreter, destination, left, right, coerce=True) -> Handler:
+        if destination is None:
+            return next_instruction
+
+        evaluator = self.evaluator
+        operation = self.operation
+        left  = reader(left )
+        right = reader(right)
+        write = writer(destination)
+
+        if not coerce:
+            # the operand types were proven to match when the program was compiled
+            operation = operation or evaluator
+            def evaluate_unchecked(pc):
+                scope = interpreter.current_scope
+                write(scope, operation(left(scope), right(scope)))
+                return pc + 1
+            return evaluate_unchecked
+
+        def evaluate(pc):
+            scope = interpreter.current_scope
+            lhs = left(scope)
+            rhs = right(scope)
+
+            if isinstance(lhs, str) and not isinstance(rhs, str):
+                rhs = str(rhs)
+            if isinstance(rhs, str) and not isinstance(lhs, str):
+                lhs = str(lhs)
+
+            write(scope, evaluator(lhs, rhs))
+            return pc + 1
+
+        if operation is None or not interpreter.quicken:
+            return evaluate
+
+        def evaluate_floats(pc):
+            scope = interpreter.current_scope
+            lhs = left(scope)
+            rhs = right(scope)
+            if type(lhs) is not float or type(rhs) is not float:
+                return deoptimize(pc)
+            write(scope, operation(lhs, rhs))
+            return pc + 1
+
+        def evaluate_strings(pc):
+            scope = interpreter.current_scope
+            lhs = left(scope)
+            rhs = right(scope)
+            if type(lhs) is not str or type(rhs) is not str:
+                return deoptimize(pc)
+            write(scope, operation(lhs, rhs))
+            return pc + 1
+
+        (adaptive, deoptimize) = quickening(interpreter, left, right, evaluate,
+                { FLOATS: evaluate_floats, STRINGS: evaluate_strings })
+        return adaptive
+
+    def lower_jump(self, interpreter, left, right, coerce, location, jump_when: bool) -> Handler:
+        """the comparison fused with the conditional jump reading its result"""
+        evaluator = self.evaluator
+        operation = self.operation
+        left  = reader(left )
+        right = reader(right)
+
+        if not coerce:
+            # comparisons of builtin types always give a bool
+            operation = operation or evaluator
+            def compare_unchecked_and_jump(pc):
+                scope = interpreter.current_scope
+                if operation(left(scope), right(scope)) is jump_when:
+                    return location
+                return pc + 1
+            return compare_unchecked_and_jump
+
+        def compare_and_jump(pc):
+            scope = interpreter.current_scope
+            lhs = left(scope)
+            rhs = right(scope)
+
+            if isinstance(lhs, str) and not isinstance(rhs, str):
+                rhs = str(rhs)
+            if isinstance(rhs, str) and not isinstance(lhs, str):
+                lhs = str(lhs)
+
+            if bool(evaluator(lhs, rhs)) == jump_when:
+                return location
+            return pc + 1
+
+        if operation is None or not interpreter.quicken:
+            return compare_and_jump
+
+        # comparing two floats or two strings always gives a bool
+        def compare_floats_and_jump(pc):
+            scope = interpreter.current_scope
+            lhs = left(scope)
+            rhs = right(scope)
+            if type(lhs) is not float or type(rhs) is not float:
+                return deoptimize(pc)
+            if operation(lhs, rhs) is jump_when:
+                return location
+            return pc + 1
+
+        def compare_strings_and_jump(pc):
+            scope = interpreter.current_scope
+            lhs = left(scope)
+            rhs = right(scope)
+            if type(lhs) is not str or type(rhs) is not str:
+                return deoptimize(pc)
+            if operation(lhs, rhs) is jump_when:
+                return location
+            return pc + 1
+
+        (adaptive, deoptimize) = quickening(interpreter, left, right, compare_and_jump,
+                { FLOATS: compare_floats_and_jump, STRINGS: compare_strings_and_jump })
+        return adaptive
 
 class UnaryEvaluator:
     evaluator: Callable[[Any], Any]
@@ -32,402 +283,453 @@ class UnaryEvaluator:
         self.evaluator = evaluator
         self.mnemonic = mnemonic
 
-    def evaluate(self, interpreter, code):
-        assert code.code == self.mnemonic
-        result_symbol = interpreter.get_symbol_name_or_value(code.destination)
-        value  = interpreter.get(code.value)
-        interpreter.current_table[result_symbol] = self.evaluator(value)
-
-class Scope:
-    identifier  : int
-    symbol_table: Dict[str, Any]
-
-    def __init__(self, id: int, symbol_table: Optional[Dict[str, Any]]):
-        if symbol_table is not None:
-            self.symbol_table = symbol_table
-        else:
-            self.symbol_table = {}
-        self.identifier = id
-
-    def set(self, name: str, value: Any):
-        self.symbol_table[name] = value
-
-    def get(self, name: str):
-        if name in self.symbol_table:
-            return self.symbol_table[name]
-        return NilFlag()
-
-    def contains(self, name: str):
-        return name in self.symbol_table
-
-
-class ScopeStack:
-    scopes: List[Scope] = []
-
-    def __init__(self, scopes: Optional[List[Scope]]):
-        if scopes is not None:
-            self.scopes = scopes
-        else:
-            self.scopes = []
-
-    def __iter__(self):
-        return iter(self.scopes)
-    
-    def find_scope(self, check: Scope):
-        for scope in self.scopes:
-            if scope.identifier == check.identifier:
-                return True
-        return False
-    
-    def contains(self, name: str):
-        for scope in reversed(self.scopes):
-            if scope.contains(name):
-                return True
-        return False
-
-    def find_missing_scopes(self, scopes: "ScopeStack"):
-        missing_scopes: List[Scope] = []
-        indices       : List[int] = []
-        for (i, scope) in enumerate(scopes):
-            if not self.find_scope(scope):
-                missing_scopes.append(scope)
-                indices.append(i)
-        return (missing_scopes, indices)
-
-    def get(self, name: str):
-        for scope in reversed(self.scopes):
-            result = scope.get(name)
-            if not isinstance(result, NilFlag):
-                return result
+    def lower(self, interpreter, destination, value) -> Handler:
+        evaluator = self.evaluator
+        value = reader(value)
+        write = writer(destination)
+
+        def evaluate(pc):
+            scope = interpreter.current_scope
+            write(scope, evaluator(value(scope)))
+            return pc + 1
+        return evaluate
+
+def normalise_index(elems, index):
+    """the list position an index refers to, negative indices count from the end,
+    None when it is out of bounds or not a whole number"""
+    try:
+        position = int(index)
+    except (TypeError, ValueError):
         return None
+    if position != index:
+        return None
+    if position < 0:
+        position += len(elems)
+    if position < 0 or position >= len(elems):
+        return None
+    return position
 
-    def set(self, name: str, value: Any):
-        for scope in reversed(self.scopes):
-            if scope.contains(name):
-                scope.set(name, value)
-                return True
-        return False
-
-    def push(self, scope: Scope):
-        self.scopes.append(scope)
+class BytecodeInterpreter:
+    """executes linked bytecode, either as a list of bytecode or in its compact encoding
 
-    def pop(self):
-        return self.scopes.pop()
+    the bytecode is lowered once when it is loaded: every instruction becomes its integer
+    opcode and a handler closure with its operands already bound, so the dispatch loop
+    only has to call the handler at the program counter"""
 
-class BytecodeInterpreter:
     # general
-    def execute_create(self, code):
-        assert code.code == Mnemonics.CREATE
-        symbol_name = self.get_symbol_name_or_value(code.name)
-        self.push(symbol_name, None)
-
-    def execute_push(self, code):
-        assert code.code in [Mnemonics.PUSH_IDENTIFIER, Mnemonics.PUSH_VALUE]
-        set_value = self.get_symbol_name_or_value(code.identifier)
-        get_value = self.get(code.value)
-        self.push(set_value, get_value)
+    def lower_create(self, name):
+        write = writer(name)
+        def create(pc):
+            write(self.current_scope, None)
+            return pc + 1
+        return create
+
+    def lower_push(self, identifier, value):
+        write = writer(identifier)
+        value = reader(value)
+        def push(pc):
+            scope = self.current_scope
+            write(scope, value(scope))
+            return pc + 1
+        return push
+
+    def lower_native(self, name):
+        if name.value not in self.natives:
+            raise RuntimeError("unknown native function '" + name.value + "'")
+        native = self.natives[name.value]
+        write  = writer(name)
+        def load_native(pc):
+            write(self.current_scope, native)
+            return pc + 1
+        return load_native
 
     # jumps
-    def execute_jump(self, code):
-        assert code.code == Mnemonics.JUMP
-        assert isinstance(code.location, int)
-        self.pc = code.location
-
-    def execute_jump_if_true(self, code):
-        assert code.code == Mnemonics.JUMP_IF_TRUE
-        assert isinstance(code.location, int)
-        value = self.get(code.condition)
-        if value:
-            self.pc = code.location
-
-    def execute_jump_if_false(self, code):
-        assert code.code == Mnemonics.JUMP_IF_FALSE
-        assert isinstance(code.location, int)
-        value = self.get(code.condition)
-        if not value:
-            self.pc = code.location
+    def lower_jump(self, location):
+        return lambda pc: location
+
+    def lower_jump_if_true(self, condition, location):
+        condition = reader(condition)
+        def jump_if_true(pc):
+            if condition(self.current_scope):
+                return location
+            return pc + 1
+        return jump_if_true
+
+    def lower_jump_if_false(self, condition, location):
+        condition = reader(condition)
+        def jump_if_false(pc):
+            if not condition(self.current_scope):
+                return location
+            return pc + 1
+        return jump_if_false
 
     # functions
-    def execute_function(self, code):
-        assert code.code == Mnemonics.FUNCTION
-        symbol_name = self.get_symbol_name_or_value(code.name)
-
-        new_stack = ScopeStack(None)
-        for scope in self.scope_stack:
-            new_stack.push(scope)
-        new_stack.push(self.current_scope)
-
-        fun = BytecodeInterpreterFunction(self.scope_id, self.pc, code.arguments, new_stack)
-        self.scope_id += 1
-        for arg in fun.arguments:
-            fun.scope.set(self.get_symbol_name_or_value(arg), None)
-
-        self.set(symbol_name, fun)
-        self.pc += code.num_instructions
-
-    def execute_call(self, code):
-        assert code.code == Mnemonics.CALL
-
-        addr = None
-        save_result = False
-        if code.destination is not None:
-            addr = self.get_symbol_name_or_value(code.destination)
-            save_result = True
-
-        fun = self.get(code.identifier)
-        if isinstance(fun, BytecodeInterpreterNativeFunction):
-            result = fun(self, code.arguments)
-            if save_result:
-                self.set(addr, result)
-            return None
-
-        assert isinstance(fun, BytecodeInterpreterFunction)
-        arguments = []
-
-        for arg in code.arguments:
-            arguments.append(self.get(arg))
-
-        (missing_scopes, indices) = self.scope_stack.find_missing_scopes(fun.scope_stack)
-        self.push_stack()
-        for scope in missing_scopes:
-            self.scope_stack.push(scope)
-
-        self.current_scope.symbol_table = fun.scope.symbol_table.copy()
-
-        for arg in fun.arguments:
-            symbol = self.get_symbol_name_or_value(arg)
-            self.set(symbol, arguments.pop(0))
-
-        result = self.execute_at(fun.address)
-
-        new_scopes = []
-        for i in reversed(indices):
-            new_scope = self.scope_stack.pop()
-            fun.scope_stack.scopes[i].symbol_table = dict(new_scope.symbol_table)
-        # fun.scope_stack.update(missing_scopes, new_scopes)
-        self.pop_stack()
-
-        if save_result:
-            self.set(addr, result)
-
-        return None
-
-    def execute_return(self, code):
-        assert code.code == Mnemonics.RETURN
-        if code.value is None:
-            return NilFlag()
-
-        value = self.get(code.value)
-        if value is None:
-            return NilFlag()
-        return value
-
-    def execute_frame(self, code):
-        assert code.code == Mnemonics.FRAME
-        self.scope_stack.push(self.current_scope)
-        self.current_scope = Scope(self.scope_id, None)
-        self.scope_id += 1
-
-    def execute_raze(self, code):
-        assert code.code == Mnemonics.RAZE
-        if len(self.scope_stack.scopes) > 0:
-            self.current_scope = self.scope_stack.pop()
+    def lower_function(self, name, arguments, num_instructions, size):
+        arity = len(arguments)
+        skip  = num_instructions + 1
+        write = writer(name)
+        def function(pc):
+            scope = self.current_scope
+            write(scope, BytecodeInterpreterFunction(pc, arity, size, scope))
+            return pc + skip
+        return function
+
+    def lower_call(self, destination, identifier, arguments):
+        name      = identifier.value
+        callee    = reader(identifier)
+        operands  = arguments
+        arguments = [reader(arg) for arg in arguments]
+        write     = None
+        if destination is not None:
+            write = writer(destination)
+
+        def call(pc):
+            scope = self.current_scope
+            fun = callee(scope)
+            if isinstance(fun, BytecodeInterpreterNativeFunction):
+                result = fun(self, operands)
+                if write is not None:
+                    write(scope, result)
+                return pc + 1
+
+            if not isinstance(fun, BytecodeInterpreterFunction):
+                raise RuntimeError("'" + name + "' is not a function")
+            if len(arguments) != fun.arity:
+                raise RuntimeError(f"wrong amount of args used to call {name}, "
+                        f"expected {fun.arity} got {len(arguments)}")
+
+            # the arguments are read in the caller's frame, nothing else is copied
+            # the dispatch loop carries on in the callee, RETURN resumes the caller
+            self.call_stack.append(CallFrame(fun, pc + 1, scope, write))
+            self.current_scope = Scope.called(fun, [arg(scope) for arg in arguments])
+            return fun.address + 1
+        return call
+
+    def lower_return(self, value):
+        if value is not None:
+            value = reader(value)
+        def ret(pc):
+            result = None
+            if value is not None:
+                result = value(self.current_scope)
+
+            if not self.call_stack:
+                # returning from the top level ends the program
+                self.result = result
+                return HALT
+
+            frame = self.call_stack.pop()
+            self.current_scope = frame.caller
+            if frame.write is not None:
+                frame.write(frame.caller, result)
+            self.result = result
+            return frame.return_address
+        return ret
+
+    def lower_frame(self, size):
+        def frame(pc):
+            self.current_scope = Scope(size, self.current_scope)
+            return pc + 1
+        return frame
+
+    def lower_raze(self):
+        def raze(pc):
+            if self.current_scope.parent is not None:
+                self.current_scope = self.current_scope.parent
+            return pc + 1
+        return raze
 
     # comparisons
-    equals_closure = BinaryEvaluator(lambda a, b: a == b, Mnemonics.EQUALS)
-    not_equals_closure = BinaryEvaluator(lambda a, b: a != b, Mnemonics.NOT_EQUALS)
-    less_than_closure = BinaryEvaluator(lambda a, b: a < b, Mnemonics.LESS_THAN)
-    less_than_equals_closure = BinaryEvaluator(lambda a, b: a <= b, Mnemonics.LESS_THAN_EQUALS)
-    greater_than_closure = BinaryEvaluator(lambda a, b: a > b, Mnemonics.GREATER_THAN)
+    equals_closure = BinaryEvaluator(lambda a, b: a == b, Mnemonics.EQUALS,
+            operator.eq)
+    not_equals_closure = BinaryEvaluator(lambda a, b: a != b, Mnemonics.NOT_EQUALS,
+            operator.ne)
+    less_than_closure = BinaryEvaluator(lambda a, b: a < b, Mnemonics.LESS_THAN,
+            operator.lt)
+    less_than_equals_closure = BinaryEvaluator(lambda a, b: a <= b,
+            Mnemonics.LESS_THAN_EQUALS, operator.le)
+    greater_than_closure = BinaryEvaluator(lambda a, b: a > b, Mnemonics.GREATER_THAN,
+            operator.gt)
     greater_than_equals_closure = BinaryEvaluator(lambda a, b: a >= b,
-            Mnemonics.GREATER_THAN_EQUALS)
+            Mnemonics.GREATER_THAN_EQUALS, operator.ge)
     logical_and_closure = BinaryEvaluator(lambda a, b: a and b, Mnemonics.LOGICAL_AND)
     logical_or_closure = BinaryEvaluator(lambda a, b: a or b, Mnemonics.LOGICAL_OR)
     logical_not_closure         = UnaryEvaluator(lambda v: not v, Mnemonics.LOGICAL_NOT)
 
     # arithmetic
-    addition_closure       = BinaryEvaluator(lambda a, b: a + b, Mnemonics.ADDITION)
-    subtraction_closure    = BinaryEvaluator(lambda a, b: a - b, Mnemonics.SUBTRACTION)
-    division_closure       = BinaryEvaluator(lambda a, b: a / b, Mnemonics.DIVISION)
-    multiplication_closure = BinaryEvaluator(lambda a, b: a * b, Mnemonics.MULTIPLICATION)
+    addition_closure       = BinaryEvaluator(lambda a, b: a + b, Mnemonics.ADDITION,
+            operator.add)
+    subtraction_closure    = BinaryEvaluator(lambda a, b: a - b, Mnemonics.SUBTRACTION,
+            operator.sub)
+    division_closure       = BinaryEvaluator(lambda a, b: a / b, Mnemonics.DIVISION,
+            operator.truediv)
+    multiplication_closure = BinaryEvaluator(lambda a, b: a * b, Mnemonics.MULTIPLICATION,
+            operator.mul)
     sign_closure           = UnaryEvaluator(lambda v: +v, Mnemonics.SIGN)
     negate_closure         = UnaryEvaluator(lambda v: -v, Mnemonics.NEGATE)
 
+    comparison_closures : Dict[Mnemonics, BinaryEvaluator] = {
+        Mnemonics.EQUALS              : equals_closure,
+        Mnemonics.NOT_EQUALS          : not_equals_closure,
+        Mnemonics.LESS_THAN           : less_than_closure,
+        Mnemonics.LESS_THAN_EQUALS    : less_than_equals_closure,
+        Mnemonics.GREATER_THAN        : greater_than_closure,
+        Mnemonics.GREATER_THAN_EQUALS : greater_than_equals_closure,
+    }
+
     # array
-    def execute_array(self, code):
-        values = {}
-        for (i, value) in enumerate(code.values):
-            values[i] = self.get(value)
-
-        if code.name is not None:
-            symbol_name = self.get_symbol_name_or_value(code.name)
-            self.set(symbol_name, values)
-
-    def execute_array_get_at_index(self, code):
-        arr = self.get(code.array)
-        index = self.get(code.index)
-
-        value = None
-        if isinstance(index, float):
-            if index > len(arr):
-                index = None
-            elif index < 0:
-                if index < -len(arr):
-                    index = None
-                else:
-                    index = len(arr) + index
-
-        if index is not None:
-            value = arr[index]
-
-        if code.result is not None:
-            symbol_name = self.get_symbol_name_or_value(code.result)
-            self.set(symbol_name, value)
-
-    def execute_array_set_at_index(self, code):
-        arr_name = self.get_symbol_name_or_value(code.array)
-        arr   = self.get(code.array)
-        index = self.get(code.index)
-        value = self.get(code.value)
-
-        if isinstance(index, float):
-            if index > len(arr):
-                index = None
-            elif index < 0:
-                if index < -len(arr):
-                    index = None
-                else:
-                    index = len(arr) + index
-
-        if index is not None:
-            arr[index] = value
-            self.set(arr_name, arr)
+    def lower_array(self, name, values):
+        if name is None:
+            return next_instruction
+        values = [reader(value) for value in values]
+        write  = writer(name)
+        def array(pc):
+            scope = self.current_scope
+            write(scope, PychartArray([value(scope) for value in values]))
+            return pc + 1
+        return array
+
+    def lower_array_get_at_index(self, result, array, index):
+        array = reader(array)
+        index = reader(index)
+        write = None
+        if result is not None:
+            write = writer(result)
+        def array_get_at_index(pc):
+            scope = self.current_scope
+            elems = array(scope).elems
+            position = normalise_index(elems, index(scope))
+
+            value = None
+            if position is not None:
+                value = elems[position]
+
+            if write is not None:
+                write(scope, value)
+            return pc + 1
+        return array_get_at_index
+
+    def lower_array_set_at_index(self, array, index, value):
+        array = reader(array)
+        index = reader(index)
+        value = reader(value)
+        def array_set_at_index(pc):
+            scope = self.current_scope
+            arr = array(scope)
+            position = normalise_index(arr.elems, index(scope))
+
+            if position is not None:
+                arr.store(position, value(scope))
+            return pc + 1
+        return array_set_at_index
+
+    # superinstructions
+    def lower_jump_if_compare(self, comparison, left, right, coerce, location):
+        return self.comparison_closures[comparison].lower_jump(self, left, right, coerce,
+                location, True)
+
+    def lower_jump_if_not_compare(self, comparison, left, right, coerce, location):
+        return self.comparison_closures[comparison].lower_jump(self, left, right, coerce,
+                location, False)
+
+    def lower_increment(self, identifier, amount):
+        slot   = identifier.slot
+        depth  = identifier.depth
+        amount = amount.value
+        # what adding the amount to a string appends, like an addition would
+        text   = str(amount)
+        def increment(pc):
+            scope = self.current_scope
+            if depth:
+                scope = scope.ancestor(depth)
+            slots = scope.slots
+            value = slots[slot]
+            slots[slot] = value + text if isinstance(value, str) else value + amount
+            return pc + 1
+        return increment
+
+    def lower_decrement(self, identifier, amount):
+        slot   = identifier.slot
+        depth  = identifier.depth
+        amount = amount.value
+        # subtracting from a string fails the same way a subtraction would
+        text   = str(amount)
+        def decrement(pc):
+            scope = self.current_scope
+            if depth:
+                scope = scope.ancestor(depth)
+            slots = scope.slots
+            value = slots[slot]
+            slots[slot] = value - text if isinstance(value, str) else value - amount
+            return pc + 1
+        return decrement
     # -----
 
-    execute_byte : dict[Mnemonics, Callable[[Any, Bytecode], Any] ] = {
-        Mnemonics.NIL_CODE        : lambda self, code: None,
+    # only used while loading, the dispatch loop never sees a mnemonic
+    # each function is given the instruction's operands in the order of its LAYOUTS entry
+    lower_byte : dict[Mnemonics, Callable[..., Handler] ] = {
+        Mnemonics.NIL_CODE        : lambda self: next_instruction,
         # general
-        Mnemonics.NOOP            : lambda self, code: None,
-        Mnemonics.CREATE          : execute_create,
-        Mnemonics.PUSH_IDENTIFIER : execute_push,
-        Mnemonics.PUSH_VALUE      : execute_push,
-        Mnemonics.FRAME           : execute_frame,
-        Mnemonics.RAZE            : execute_raze,
+        Mnemonics.NOOP            : lambda self: next_instruction,
+        Mnemonics.CREATE          : lower_create,
+        Mnemonics.PUSH_IDENTIFIER : lower_push,
+        Mnemonics.PUSH_VALUE      : lower_push,
+        Mnemonics.FRAME           : lower_frame,
+        Mnemonics.RAZE            : lower_raze,
+        Mnemonics.NATIVE          : lower_native,
 
         # jumps
-        Mnemonics.JUMP            : execute_jump,
-        Mnemonics.JUMP_IF_TRUE    : execute_jump_if_true,
-        Mnemonics.JUMP_IF_FALSE   : execute_jump_if_false,
+        Mnemonics.JUMP            : lower_jump,
+        Mnemonics.JUMP_IF_TRUE    : lower_jump_if_true,
+        Mnemonics.JUMP_IF_FALSE   : lower_jump_if_false,
 
         # function
-        Mnemonics.FUNCTION        : execute_function,
-        Mnemonics.CALL            : execute_call,
-        Mnemonics.RETURN          : execute_return,
+        Mnemonics.FUNCTION        : lower_function,
+        Mnemonics.CALL            : lower_call,
+        Mnemonics.RETURN          : lower_return,
 
         # comparisons
-        Mnemonics.EQUALS               : equals_closure.evaluate,
-        Mnemonics.NOT_EQUALS           : not_equals_closure.evaluate,
-        Mnemonics.LESS_THAN            : less_than_closure.evaluate,
-        Mnemonics.LESS_THAN_EQUALS     : less_than_equals_closure.evaluate,
-        Mnemonics.GREATER_THAN         : greater_than_closure.evaluate,
-        Mnemonics.GREATER_THAN_EQUALS  : greater_than_equals_closure.evaluate,
-        Mnemonics.LOGICAL_AND          : logical_and_closure.evaluate,
-        Mnemonics.LOGICAL_OR           : logical_or_closure.evaluate,
-        Mnemonics.LOGICAL_NOT          : logical_not_closure.evaluate,
+        Mnemonics.EQUALS               : equals_closure.lower,
+        Mnemonics.NOT_EQUALS           : not_equals_closure.lower,
+        Mnemonics.LESS_THAN            : less_than_closure.lower,
+        Mnemonics.LESS_THAN_EQUALS     : less_than_equals_closure.lower,
+        Mnemonics.GREATER_THAN         : greater_than_closure.lower,
+        Mnemonics.GREATER_THAN_EQUALS  : greater_than_equals_closure.lower,
+        Mnemonics.LOGICAL_AND          : logical_and_closure.lower,
+        Mnemonics.LOGICAL_OR           : logical_or_closure.lower,
+        Mnemonics.LOGICAL_NOT          : logical_not_closure.lower,
 
         # arithmetic
-        Mnemonics.ADDITION       : addition_closure.evaluate,
-        Mnemonics.SUBTRACTION    : subtraction_closure.evaluate,
-        Mnemonics.DIVISION       : division_closure.evaluate,
-        Mnemonics.MULTIPLICATION : multiplication_closure.evaluate,
-        Mnemonics.SIGN           : sign_closure.evaluate,
-        Mnemonics.NEGATE         : negate_closure.evaluate,
+        Mnemonics.ADDITION       : addition_closure.lower,
+        Mnemonics.SUBTRACTION    : subtraction_closure.lower,
+        Mnemonics.DIVISION       : division_closure.lower,
+        Mnemonics.MULTIPLICATION : multiplication_closure.lower,
+        Mnemonics.SIGN           : sign_closure.lower,
+        Mnemonics.NEGATE         : negate_closure.lower,
 
         # array
-        Mnemonics.ARRAY              : execute_array,
-        Mnemonics.ARRAY_GET_AT_INDEX : execute_array_get_at_index,
-        Mnemonics.ARRAY_SET_AT_INDEX : execute_array_set_at_index,
+        Mnemonics.ARRAY              : lower_array,
+        Mnemonics.ARRAY_GET_AT_INDEX : lower_array_get_at_index,
+        Mnemonics.ARRAY_SET_AT_INDEX : lower_array_set_at_index,
+
+        # superinstructions
+        Mnemonics.JUMP_IF_COMPARE     : lower_jump_if_compare,
+        Mnemonics.JUMP_IF_NOT_COMPARE : lower_jump_if_not_compare,
+        Mnemonics.INCREMENT           : lower_increment,
+        Mnemonics.DECREMENT           : lower_decrement,
     }
-    assert len(execute_byte.keys()) == len(Mnemonics)
-    stack = []
-    scope_stack   : ScopeStack = ScopeStack(None)
-    current_scope : Scope = Scope(0, None)
-    pc = 0
-    bytecodes: List[Bytecode] = None
-    scope_id  : int = 0
+    assert len(lower_byte.keys()) == len(Mnemonics)
+    current_scope : Optional[Scope]
+    call_stack    : List[CallFrame]
+    natives       : Dict[str, "BytecodeInterpreterNativeFunction"]
+    opcodes       : List[int]
+    handlers      : List[Handler]
+    result        : Any = None
+    # if instructions specialise themselves for the operand types they see
+    quicken       : bool = True
+    # how often instructions were specialised for their operand types, and had to back out
+    quickened     : int = 0
+    deoptimized   : int = 0
+    bytecodes: Union[List[Bytecode], CompactBytecode] = None
+
+    def __init__(self, quicken: bool = True):
+        self.quicken       = quicken
+        self.current_scope = None
+        self.call_stack    = []
+        self.quickened     = 0
+        self.deoptimized   = 0
+        self.natives       = {}
+        self.opcodes       = []
+        self.handlers      = []
 
     def push_native(self, name, callback):
-        self.current_scope.set(name, BytecodeInterpreterNativeFunction(callback))
-
-    def push(self, name, value):
-        if self.current_scope.contains(name):
-            self.current_scope.set(name, value)
-        elif self.scope_stack.contains(name):
-            self.scope_stack.set(name, value)
-        else:
-            self.current_scope.set(name, value)
-
-    def push_stack(self):
-        self.stack.append(self.pc)
-        self.scope_stack.push(self.current_scope)
-        self.current_scope = Scope(self.scope_id, None)
-        self.scope_id += 1
-
-    def pop_stack(self):
-        if len(self.stack) > 0:
-            self.pc = self.stack.pop()
-            self.current_scope = self.scope_stack.pop()
-
-    def get_symbol_name_or_value(self, atom: Union[Identifier, Value]):
-        return atom.value
+        self.natives[name] = BytecodeInterpreterNativeFunction(callback)
 
     def get(self, atom: Union[Identifier, Value]):
-        assert isinstance(atom, (Identifier, Value))
-        if isinstance(atom, Identifier):
-            if self.current_scope.contains(atom.value):
-                return self.current_scope.get(atom.value)
-
-            value = self.scope_stack.get(atom.value)
-            if isinstance(value, NilFlag):
-                raise RuntimeError("unknown symbol '" + atom.value + "'")
-            return value
-        return atom.value
-
-    def set(self, name: str, value: Any):
-        if self.current_scope.contains(name):
-            self.current_scope.set(name, value)
-            return
-        if not self.scope_stack.set(name, value):
-            self.push(name, value)
+        return reader(atom)(self.current_scope)
+
+    def set(self, identifier: Identifier, value: Any):
+        writer(identifier)(self.current_scope, value)
+
+    def halt(self, pc: int) -> int:
+        # running off the end of the program
+        self.result = None
+        return HALT
+
+    @staticmethod
+    def check(bytecodes: list[Bytecode]) -> Iterator[Instruction]:
+        for (i, code) in enumerate(bytecodes):
+            if not isinstance(code, Bytecode) or code.code not in LAYOUTS:
+                raise TypeError("expected bytecode at " + str(i) + " but got: " + str(code))
+            if isinstance(code, Label):
+                raise RuntimeError("cannot run unlinked label '" + code.identifier + "'")
+            if isinstance(code, JumpBytecode):
+                if not isinstance(code.location, int):
+                    raise RuntimeError("jump at " + str(i) + " was never linked")
+            yield (code.code, instruction_operands(code))
+
+    def load(self, program: Union[list[Bytecode], CompactBytecode]):
+        instructions = None
+        if isinstance(program, CompactBytecode):
+            instructions = program.instructions()
+        else:
+            instructions = self.check(program)
+
+        opcodes : List[int] = []
+        handlers: List[Handler] = []
+        # lowering allocates a few closures per instruction and nothing it makes is garbage,
+        # letting the collector run over and over while a large program loads is wasted work
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            for (i, (mnemonic, operands)) in enumerate(instructions):
+                # jumping to the end of the program runs the halt handler
+                if mnemonic in JUMPS and not 0 <= operands[-1] <= len(program):
+                    raise RuntimeError("jump at " + str(i) + " leaves the program")
+
+                opcodes.append(mnemonic.value)
+                handlers.append(self.lower_byte[mnemonic](self, *operands))
+            handlers.append(self.halt)
+        finally:
+            if collecting:
+                gc.enable()
+
+        self.bytecodes = program
+        self.opcodes   = opcodes
+        self.handlers  = handlers
+
+    def run(self, pc: int):
+        handlers = self.handlers
+        while pc >= 0:
+            pc = handlers[pc](pc)
+        return self.result
 
     def execute_at(self, address: int):
-        self.pc = address + 1
-        while self.pc < len(self.bytecodes):
-            bt = self.bytecodes[self.pc]
-            result = self.execute_byte[bt.code](self, bt)
-            if result is not None:
-                if isinstance(result, NilFlag):
-                    return None
-                return result
-            self.pc = self.pc + 1
-        return None
-
-    def execute(self, bytecodes: list[Bytecode]):
-        self.bytecodes = bytecodes
-        self.pc = 0
-        while self.pc < len(bytecodes):
-            bt = bytecodes[self.pc]
-            result = self.execute_byte[bt.code](self, bt)
-            if result is not None:
-                if isinstance(result, NilFlag):
-                    return None
-                return result
-            self.pc = self.pc + 1
-        return None
-
-class NilFlag:
-    def __init__(self):
-        return
+        return self.run(address + 1)
+
+    def call(self, function: "BytecodeInterpreterFunction", arguments: List[Any]):
+        """calls a pychart function from python, like a native given a callback
+        runs a dispatch loop of its own that stops when the function returns"""
+        if len(arguments) != function.arity:
+            raise RuntimeError(f"wrong amount of args used to call function, "
+                    f"expected {function.arity} got {len(arguments)}")
+
+        scope = self.current_scope
+        depth = len(self.call_stack)
+        self.call_stack.append(CallFrame(function, HALT, scope, None))
+        self.current_scope = Scope.called(function, list(arguments))
+        try:
+            return self.run(function.address + 1)
+        finally:
+            # an error can leave the frames of unfinished calls behind
+            del self.call_stack[depth:]
+            self.current_scope = scope
+
+    def execute(self, bytecodes: Union[list[Bytecode], CompactBytecode]):
+        self.load(bytecodes)
+        self.current_scope = None
+        self.call_stack    = []
+        return self.run(0)
 
 NativeCallback = Callable[[Any, BytecodeInterpreter, list[Union[Identifier, Value]]], Any]
 class BytecodeInterpreterNativeFunction:
@@ -439,12 +741,13 @@ class BytecodeInterpreterNativeFunction:
         return self.callback(interpreter, args)
 
 class BytecodeInterpreterFunction:
-    scope_stack : ScopeStack
-    scope       : Scope = Scope(0, None)
-    arguments: list[Identifier]
-    address  : int
-    def __init__(self, id, address, arguments, scope_stack: ScopeStack):
-        self.scope.identifier = id
-        self.arguments   = arguments
-        self.address     = address
-        self.scope_stack = scope_stack
+    address: int
+    arity  : int
+    size   : int
+    closure: Optional[Scope]
+    def __init__(self, address: int, arity: int, size: int, closure: Optional[Scope]):
+        self.address = address
+        self.arity   = arity
+        self.size    = size
+        # the frame the function was declared in, shared with everything else that captured it
+        self.closure = closure
@@ -0,0 +1,296 @@
+import copy
+from typing import Dict, List, Optional
+
+from src.pychart.bytecode.bytecode import COMPARISONS, Bytecode, Mnemonics
+from src.pychart.bytecode.bytecode_arithmetic import Decrement, Increment
+from src.pychart.bytecode.bytecode_function import remove_instructions, replace_instructions
+from src.pychart.bytecode.bytecode_jumps import (Jump, JumpBytecode, JumpIfCompare,
+                                                 JumpIfNotCompare, JumpIfNotTrue,
+                                                 JumpIfTrue)
+from src.pychart.bytecode.bytecode_util import (Create, Frame, Identifier, Label, Push,
+                                                Raze, Value, is_temporary)
+from src.pychart.bytecode.compact import LAYOUTS
+from src.pychart.bytecode.type_inference import infer_types
+
+# the operand each instruction stores its result in, every other operand is only read
+WRITES: Dict[Mnemonics, str] = {
+    Mnemonics.CREATE              : "name",
+    Mnemonics.NATIVE              : "name",
+    Mnemonics.FUNCTION            : "name",
+    Mnemonics.PUSH_IDENTIFIER     : "identifier",
+    Mnemonics.PUSH_VALUE          : "identifier",
+    Mnemonics.CALL                : "destination",
+    Mnemonics.ARRAY               : "name",
+    Mnemonics.ARRAY_GET_AT_INDEX  : "result",
+    Mnemonics.EQUALS              : "destination",
+    Mnemonics.NOT_EQUALS          : "destination",
+    Mnemonics.LESS_THAN           : "destination",
+    Mnemonics.LESS_THAN_EQUALS    : "destination",
+    Mnemonics.GREATER_THAN        : "destination",
+    Mnemonics.GREATER_THAN_EQUALS : "destination",
+    Mnemonics.LOGICAL_AND         : "destination",
+    Mnemonics.LOGICAL_OR          : "destination",
+    Mnemonics.LOGICAL_NOT         : "destination",
+    Mnemonics.ADDITION            : "destination",
+    Mnemonics.SUBTRACTION         : "destination",
+    Mnemonics.DIVISION            : "destination",
+    Mnemonics.MULTIPLICATION      : "destination",
+    Mnemonics.SIGN                : "destination",
+    Mnemonics.NEGATE              : "destination",
+}
+
+# instructions whose result can be stored straight into the variable a temporary is pushed to
+FORWARDABLE = { mnemonic for mnemonic in WRITES
+        if mnemonic not in (Mnemonics.CREATE, Mnemonics.NATIVE, Mnemonics.FUNCTION) }
+
+def is_number(atom) -> bool:
+    return isinstance(atom, Value) and isinstance(atom.value, (int, float)) \
+            and not isinstance(atom.value, bool)
+
+def same_identifier(a, b) -> bool:
+    return isinstance(a, Identifier) and isinstance(b, Identifier) \
+            and a.depth == b.depth and a.slot == b.slot
+
+def written(code: Bytecode) -> Optional[Identifier]:
+    if code.code not in WRITES:
+        return None
+    return getattr(code, WRITES[code.code])
+
+def reads(code: Bytecode, identifier: Identifier) -> bool:
+    write_field = WRITES.get(code.code)
+    for (field, _) in LAYOUTS[code.code]:
+        if field == write_field:
+            continue
+        value = getattr(code, field)
+        atoms = value if isinstance(value, list) else [value]
+        if any(same_identifier(atom, identifier) for atom in atoms):
+            return True
+    return False
+
+class PeepholeOptimizer:
+    """rewrites the unlinked bytecode from the generator into a shorter equivalent
+
+    it works on the bytecode before labels are solved so a jump's target is still its label,
+    every pass is repeated until none of them changes anything"""
+    block             : List[Bytecode]
+    superinstructions : bool
+    specialise        : bool
+
+    def __init__(self, bytecodes: List[Bytecode], superinstructions: bool = True,
+            specialise: bool = True):
+        self.block = list(bytecodes)
+        self.superinstructions = superinstructions
+        self.specialise = specialise
+
+    def optimize(self) -> List[Bytecode]:
+        self.simplify()
+        if self.superinstructions:
+            self.fuse_compare_and_jump()
+            self.fuse_increments()
+            self.rotate_loops()
+            self.simplify()
+        if self.specialise:
+            self.block = infer_types(self.block)
+        return self.block
+
+    def simplify(self):
+        changed = True
+        while changed:
+            changed = False
+            for optimization in (self.thread_jumps, self.invert_jumps_over_jumps,
+                    self.remove_dead_creates, self.forward_stores,
+                    self.remove_jumps_to_next, self.remove_empty_frames):
+                changed = optimization() or changed
+
+    def remove(self, keep: List[bool]) -> bool:
+        if all(keep):
+            return False
+        self.block = remove_instructions(self.block, keep)
+        return True
+
+    def labels(self) -> Dict[str, int]:
+        return { code.identifier: i
+                for (i, code) in enumerate(self.block) if isinstance(code, Label) }
+
+    def target(self, labels: Dict[str, int], label: Label) -> int:
+        """the first instruction run after jumping to the label"""
+        i = labels[label.identifier]
+        while i < len(self.block) and isinstance(self.block[i], Label):
+            i += 1
+        return i
+
+    def thread_jumps(self) -> bool:
+        """a jump landing on an unconditional jump goes straight to where that one goes"""
+        labels  = self.labels()
+        changed = False
+        for (i, code) in enumerate(self.block):
+            if not isinstance(code, JumpBytecode):
+                continue
+
+            location = code.location
+            visited  = { location.identifier }
+            while True:
+                target = self.target(labels, location)
+                if target >= len(self.block) or not isinstance(self.block[target], Jump):
+                    break
+                following = self.block[target].location
+                if following.identifier in visited:
+                    # a loop made only of jumps, leave it be
+                    break
+                visited.add(following.identifier)
+                location = following
+
+            if location is not code.location:
+                # the jump could be shared with bytecode that is printed or reused
+                code = copy.copy(code)
+                code.location = location
+                self.block[i] = code
+                changed = True
+        return changed
+
+    def invert_jumps_over_jumps(self) -> bool:
+        """a conditional jump over a jump becomes the opposite conditional jump
+
+        `jeqz c, .a; jump .b; .a:` is the same as `jnez c, .b; .a:`"""
+        keep = [True] * len(self.block)
+        for i in range(len(self.block) - 2):
+            code = self.block[i]
+            if not keep[i] or not isinstance(code, (JumpIfTrue, JumpIfNotTrue)):
+                continue
+            jump = self.block[i + 1]
+            if not isinstance(jump, Jump) or not self.lands_after(i + 1, code.location):
+                continue
+
+            opposite = JumpIfNotTrue if isinstance(code, JumpIfTrue) else JumpIfTrue
+            self.block[i] = opposite(code.condition, jump.location)
+            keep[i + 1] = False
+        return self.remove(keep)
+
+    def lands_after(self, i: int, label: Label) -> bool:
+        """if the label is one of the labels right after the instruction at i"""
+        j = i + 1
+        while j < len(self.block) and isinstance(self.block[j], Label):
+            if self.block[j].identifier == label.identifier:
+                return True
+            j += 1
+        return False
+
+    def remove_jumps_to_next(self) -> bool:
+        """a jump to the labels right after it does nothing, the condition has no side effects"""
+        keep = [True] * len(self.block)
+        for (i, code) in enumerate(self.block):
+            if isinstance(code, JumpBytecode) and self.lands_after(i, code.location):
+                keep[i] = False
+        return self.remove(keep)
+
+    def remove_dead_creates(self) -> bool:
+        """a create is overwritten when the next instruction stores to the same variable"""
+        keep = [True] * len(self.block)
+        for i in range(len(self.block) - 1):
+            code = self.block[i]
+            if not isinstance(code, Create):
+                continue
+            following = self.block[i + 1]
+            if same_identifier(written(following), code.name) \
+                    and not reads(following, code.name):
+                keep[i] = False
+        return self.remove(keep)
+
+    def forward_stores(self) -> bool:
+        """`add .tmp, a, b; push x, .tmp` is the same as `add x, a, b`"""
+        keep = [True] * len(self.block)
+        for i in range(len(self.block) - 1):
+            code = self.block[i]
+            push = self.block[i + 1]
+            if not keep[i] or code.code not in FORWARDABLE or not isinstance(push, Push):
+                continue
+            destination = written(code)
+            if not is_temporary(destination) or not same_identifier(push.value, destination):
+                continue
+
+            forwarded = copy.copy(code)
+            setattr(forwarded, WRITES[code.code], push.identifier)
+            self.block[i] = forwarded
+            keep[i + 1] = False
+        return self.remove(keep)
+
+    def remove_empty_frames(self) -> bool:
+        """a frame razed by the very next instruction was never used"""
+        keep = [True] * len(self.block)
+        i = 0
+        while i < len(self.block) - 1:
+            if isinstance(self.block[i], Frame) and isinstance(self.block[i + 1], Raze):
+                keep[i] = keep[i + 1] = False
+                i += 2
+            else:
+                i += 1
+        return self.remove(keep)
+
+
+    # superinstructions
+    def fuse_compare_and_jump(self) -> bool:
+        """`lt .tmp, a, b; jnez .tmp, .l` becomes `jnot_lt a, b, .l`"""
+        keep = [True] * len(self.block)
+        for i in range(len(self.block) - 1):
+            code = self.block[i]
+            jump = self.block[i + 1]
+            if code.code not in COMPARISONS or not isinstance(jump, (JumpIfTrue, JumpIfNotTrue)):
+                continue
+            if not is_temporary(code.destination) \
+                    or not same_identifier(jump.condition, code.destination):
+                continue
+
+            fused = JumpIfCompare if isinstance(jump, JumpIfTrue) else JumpIfNotCompare
+            self.block[i] = fused(code.code, code.left, code.right, jump.location,
+                    coerce=code.coerce)
+            keep[i + 1] = False
+        return self.remove(keep)
+
+    def fuse_increments(self) -> bool:
+        """`add x, x, 1` becomes `incr x, 1`, and `sub x, x, 1` becomes `decr x, 1`"""
+        changed = False
+        for (i, code) in enumerate(self.block):
+            if code.code not in (Mnemonics.ADDITION, Mnemonics.SUBTRACTION):
+                continue
+            if not same_identifier(code.destination, code.left) or not is_number(code.right):
+                continue
+
+            fused = Increment if code.code == Mnemonics.ADDITION else Decrement
+            self.block[i] = fused(code.destination, code.right)
+            changed = True
+        return changed
+
+    def rotate_loops(self) -> bool:
+        """a loop whose condition is a single jump tests it again at the bottom
+
+        `.start: jnot_lt i, n, .end; ...; jump .start; .end:` becomes
+        `.start: jnot_lt i, n, .end; .body: ...; jlt i, n, .body; .end:`
+        so every iteration but the first runs one jump instead of two"""
+        labels = self.labels()
+        replacements = [[code] for code in self.block]
+        changed = False
+        for (i, code) in enumerate(self.block):
+            if not isinstance(code, Jump):
+                continue
+            head = self.target(labels, code.location)
+            if head >= i or not isinstance(self.block[head], JumpIfCompare):
+                continue
+            condition = self.block[head]
+            if not self.lands_after(i, condition.location) or len(replacements[head]) != 1:
+                continue
+
+            body = Label(code.location.identifier + "_body")
+            repeat = JumpIfNotCompare if condition.code == Mnemonics.JUMP_IF_COMPARE \
+                    else JumpIfCompare
+            replacements[head].append(body)
+            replacements[i] = [repeat(condition.comparison, condition.left, condition.right, body,
+                    coerce=condition.coerce)]
+            changed = True
+
+        if changed:
+            self.block = replace_instructions(self.block, replacements)
+        return changed
+
+def optimize(bytecodes: List[Bytecode], superinstructions: bool = True,
+        specialise: bool = True) -> List[Bytecode]:
+    return PeepholeOptimizer(bytecodes, superinstructions, specialise).optimize()
@@ -59,6 +59,11 @@ class BytecodePrinter:
         out += demangle(code.name.value)
         print(out)
 
+    def frame_print(self, i, code):
+        out = self.common(i, code)
+        out += str(code.size)
+        print(out)
+
     def push_print(self, i, code):
         out = self.common(i, code, alternative_bytecode='push')
 
@@ -90,8 +95,19 @@ class BytecodePrinter:
         LogicalOr        : 'or',
     }
 
+    comparison_map : Dict[Mnemonics, Bytecode] = {
+        Mnemonics.EQUALS              : Equals,
+        Mnemonics.NOT_EQUALS          : NotEquals,
+        Mnemonics.LESS_THAN           : LessThan,
+        Mnemonics.LESS_THAN_EQUALS    : LessThanEquals,
+        Mnemonics.GREATER_THAN        : GreaterThan,
+        Mnemonics.GREATER_THAN_EQUALS : GreaterThanEquals,
+    }
+
     def binary_print(self, i, code):
         name = self.binary_name_map[type(code)]
+        if not code.coerce:
+            name += '.u'
         out = self.common(i, code, alternative_bytecode=name)
 
         if code.destination is not None:
@@ -109,6 +125,7 @@ class BytecodePrinter:
         name = None
         if isinstance(code, LogicalNot):
             name = 'not'
+        out = self.common(i, code, alternative_bytecode=name)
         if code.destination is not None:
             out += identifier_or_value_to_string(code.destination)
         else:
@@ -142,6 +159,32 @@ class BytecodePrinter:
             out += str(code.location)
         print(out)
 
+    def jump_compare_print(self, i, code):
+        name = self.binary_name_map[self.comparison_map[code.comparison]]
+        if isinstance(code, JumpIfNotCompare):
+            name = 'jnot_' + name
+        else:
+            name = 'j' + name
+        if not code.coerce:
+            name += '.u'
+        out = self.common(i, code, alternative_bytecode=name)
+
+        out += identifier_or_value_to_string(code.left) + ', '
+        out += identifier_or_value_to_string(code.right) + ',\t'
+        if isinstance(code.location, Label):
+            out += code.location.identifier
+        else:
+            out += str(code.location)
+        print(out)
+
+    def increment_print(self, i, code):
+        name = 'incr' if code.code == Mnemonics.INCREMENT else 'decr'
+        out = self.common(i, code, alternative_bytecode=name)
+
+        out += identifier_or_value_to_string(code.identifier) + ', '
+        out += identifier_or_value_to_string(code.amount)
+        print(out)
+
     def call_print(self, i, code):
         out = self.common(i, code)
 
@@ -210,8 +253,9 @@ class BytecodePrinter:
         Mnemonics.CREATE          : create_print,
         Mnemonics.PUSH_IDENTIFIER : push_print,
         Mnemonics.PUSH_VALUE      : push_print,
-        Mnemonics.FRAME           : generic_print,
+        Mnemonics.FRAME           : frame_print,
         Mnemonics.RAZE            : generic_print,
+        Mnemonics.NATIVE          : create_print,
 
         # jumps
         Mnemonics.JUMP            : jump_print,
@@ -246,6 +290,12 @@ class BytecodePrinter:
         Mnemonics.ARRAY              : array_print,
         Mnemonics.ARRAY_GET_AT_INDEX : array_get_print,
         Mnemonics.ARRAY_SET_AT_INDEX : array_set_print,
+
+        # superinstructions
+        Mnemonics.JUMP_IF_COMPARE     : jump_compare_print,
+        Mnemonics.JUMP_IF_NOT_COMPARE : jump_compare_print,
+        Mnemonics.INCREMENT           : increment_print,
+        Mnemonics.DECREMENT           : increment_print,
     }
     assert len(print_byte.keys()) == len(Mnemonics)
 
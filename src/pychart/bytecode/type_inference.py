@@ -0,0 +1,249 @@
+import copy
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.pychart.bytecode.bytecode import COMPARISONS, Bytecode, Mnemonics
+from src.pychart.bytecode.bytecode_binary import BinaryBytecode
+from src.pychart.bytecode.bytecode_function import Call, Function, Return
+from src.pychart.bytecode.bytecode_jumps import Jump, JumpBytecode, JumpIfCompare
+from src.pychart.bytecode.bytecode_util import (Frame, Identifier, Label, Native, Raze,
+                                                Value, is_temporary)
+
+# what is known about a value, binary operations only coerce when exactly one side is a string
+STRING     = "string"
+NOT_STRING = "not string"
+Kind = Optional[str]
+
+# always give a number or a bool (or fail) whatever their operands are
+NUMERIC_RESULTS = set(COMPARISONS) | {
+    Mnemonics.SUBTRACTION,
+    Mnemonics.DIVISION,
+    Mnemonics.MULTIPLICATION,
+}
+
+# binary operations that coerce their operands
+COERCING = set(COMPARISONS) | {
+    Mnemonics.ADDITION,
+    Mnemonics.SUBTRACTION,
+    Mnemonics.DIVISION,
+    Mnemonics.MULTIPLICATION,
+}
+
+# natives whose result is never a string, as long as their variable still holds them
+NOT_STRING_NATIVES = {"len", "sum", "dot", "fill", "range", "concat", "map", "filter"}
+
+# the operands an instruction stores into, a call's identifier is the function it reads
+WRITTEN_FIELDS = ("destination", "result", "name", "identifier")
+
+# a variable as seen from the current frame
+Location = Tuple[int, int]
+# the kind of every variable something is known about, and if that variable is a temporary
+Facts = Dict[Location, Tuple[str, bool]]
+
+def location(identifier: Identifier) -> Location:
+    return (identifier.depth, identifier.slot)
+
+def meet(a: Optional[Facts], b: Facts) -> Facts:
+    """what is still known where two paths join"""
+    if a is None:
+        return dict(b)
+    return { place: fact for (place, fact) in a.items() if b.get(place) == fact }
+
+class TypeInference:
+    """proves which binary operations can never mix a string with a non string operand,
+    they are marked so the interpreter runs them without the coercion checks
+
+    facts flow forward through the unlinked bytecode until they stop changing, where paths
+    join only what holds on all of them is kept, a call forgets every variable that
+    isn't a temporary since the function can change anything it can see
+
+    a call's result is known only when it calls a native through the global it was
+    declared in and nothing in the program ever stores into that global"""
+    block : List[Bytecode]
+    labels: Dict[str, int]
+    # how many frames each instruction is nested in, counting the frame of a call
+    nestings: List[Optional[int]]
+    # the calls of natives that never give back a string
+    not_string_calls: Set[int]
+    specialised: int
+
+    def __init__(self, bytecodes: List[Bytecode]):
+        self.block  = list(bytecodes)
+        self.labels = { code.identifier: i
+                for (i, code) in enumerate(self.block) if isinstance(code, Label) }
+        self.nestings = self.nest()
+        self.not_string_calls = self.native_calls()
+        self.specialised = 0
+
+    def nest(self) -> List[Optional[int]]:
+        """how many frames each instruction runs in, None where it is never reached. it
+        follows the jumps since a break razes the frames it leaves before jumping out, and
+        a function's body runs one frame deeper than where it is declared"""
+        nestings: List[Optional[int]] = [None] * len(self.block)
+        pending = [(0, 0)]
+        while pending:
+            (i, nesting) = pending.pop()
+            if i >= len(self.block) or nestings[i] is not None:
+                continue
+            nestings[i] = nesting
+            code = self.block[i]
+            if isinstance(code, Function):
+                pending.append((i + 1 + code.num_instructions, nesting))
+                pending.append((i + 1, nesting + 1))
+                continue
+            if isinstance(code, Frame):
+                nesting += 1
+            elif isinstance(code, Raze):
+                nesting -= 1
+            pending.extend((j, nesting) for (j, _) in self.successors(i, {}))
+        return nestings
+
+    def native_calls(self) -> Set[int]:
+        """the instructions calling a native that never gives back a string"""
+        natives: Dict[Location, str] = {}
+        written: Set[Location] = set()
+        for (i, code) in enumerate(self.block):
+            nesting = self.nestings[i]
+            if nesting is None:
+                # never runs, so it stores into nothing
+                continue
+            if isinstance(code, Native):
+                natives[(nesting - code.name.depth, code.name.slot)] = code.name.value
+                continue
+            if isinstance(code, Function):
+                # the parameters are stored into when the function is called
+                written.update((nesting + 1 - param.depth, param.slot)
+                        for param in code.arguments)
+            for field in WRITTEN_FIELDS:
+                if field == "identifier" and isinstance(code, Call):
+                    continue
+                target = getattr(code, field, None)
+                if isinstance(target, Identifier):
+                    written.add((nesting - target.depth, target.slot))
+
+        calls: Set[int] = set()
+        for (i, code) in enumerate(self.block):
+            if not isinstance(code, Call) or self.nestings[i] is None:
+                continue
+            callee = (self.nestings[i] - code.identifier.depth, code.identifier.slot)
+            if callee not in written and natives.get(callee) in NOT_STRING_NATIVES:
+                calls.add(i)
+        return calls
+
+    @staticmethod
+    def kind(facts: Facts, atom) -> Kind:
+        if isinstance(atom, Value):
+            return STRING if isinstance(atom.value, str) else NOT_STRING
+        if isinstance(atom, Identifier) and location(atom) in facts:
+            return facts[location(atom)][0]
+        return None
+
+    @staticmethod
+    def store(facts: Facts, identifier: Optional[Identifier], kind: Kind):
+        if identifier is None:
+            return
+        if kind is None:
+            facts.pop(location(identifier), None)
+        else:
+            facts[location(identifier)] = (kind, is_temporary(identifier))
+
+    def successors(self, i: int, facts: Facts) -> List[Tuple[int, Facts]]:
+        code = self.block[i]
+        if isinstance(code, Jump):
+            return [(self.labels[code.location.identifier], facts)]
+        if isinstance(code, JumpBytecode):
+            return [(i + 1, facts), (self.labels[code.location.identifier], facts)]
+        if isinstance(code, Return):
+            return []
+        if isinstance(code, Function):
+            # the body runs later, from a call, nothing about its variables is known there
+            return [(i + 1, {}), (i + 1 + code.num_instructions, facts)]
+        return [(i + 1, facts)]
+
+    def transfer(self, i: int, facts: Facts) -> Facts:
+        code = self.block[i]
+        facts = dict(facts)
+        mnemonic = code.code
+        if isinstance(code, BinaryBytecode):
+            left  = self.kind(facts, code.left)
+            right = self.kind(facts, code.right)
+            result = None
+            if mnemonic in NUMERIC_RESULTS:
+                result = NOT_STRING
+            elif mnemonic == Mnemonics.ADDITION:
+                if STRING in (left, right):
+                    result = STRING
+                elif left == right == NOT_STRING:
+                    result = NOT_STRING
+            elif left == right:
+                # logical and/or give back one of their operands
+                result = left
+            self.store(facts, code.destination, result)
+
+        elif mnemonic in (Mnemonics.PUSH_IDENTIFIER, Mnemonics.PUSH_VALUE):
+            self.store(facts, code.identifier, self.kind(facts, code.value))
+
+        elif mnemonic in (Mnemonics.CREATE, Mnemonics.NATIVE, Mnemonics.FUNCTION,
+                Mnemonics.ARRAY):
+            # None, functions and arrays
+            self.store(facts, code.name, NOT_STRING)
+
+        elif mnemonic in (Mnemonics.LOGICAL_NOT, Mnemonics.SIGN, Mnemonics.NEGATE):
+            self.store(facts, code.destination, NOT_STRING)
+
+        elif mnemonic == Mnemonics.ARRAY_GET_AT_INDEX:
+            self.store(facts, code.result, None)
+
+        elif isinstance(code, Call):
+            facts = { place: fact for (place, fact) in facts.items() if fact[1] }
+            kind = NOT_STRING if i in self.not_string_calls else None
+            self.store(facts, code.destination, kind)
+
+        elif isinstance(code, Frame):
+            # everything known is one frame further away
+            facts = { (depth + 1, slot): fact for ((depth, slot), fact) in facts.items() }
+
+        elif isinstance(code, Raze):
+            facts = { (depth - 1, slot): fact for ((depth, slot), fact) in facts.items()
+                    if depth > 0 }
+
+        # increments keep the kind of their variable, jumps and array stores change nothing
+        return facts
+
+    def analyse(self) -> List[Optional[Facts]]:
+        """the facts that hold before every instruction, None where it is never reached"""
+        before: List[Optional[Facts]] = [None] * (len(self.block) + 1)
+        before[0] = {}
+        pending = [0]
+        while pending:
+            i = pending.pop()
+            if i >= len(self.block):
+                continue
+            after = self.transfer(i, before[i])
+            for (j, facts) in self.successors(i, after):
+                joined = meet(before[j], facts)
+                if joined != before[j]:
+                    before[j] = joined
+                    pending.append(j)
+        return before
+
+    def specialise(self, code, facts: Facts):
+        left  = self.kind(facts, code.left)
+        right = self.kind(facts, code.right)
+        if left is None or left != right or not code.coerce:
+            return code
+        self.specialised += 1
+        code = copy.copy(code)
+        code.coerce = False
+        return code
+
+    def infer(self) -> List[Bytecode]:
+        before = self.analyse()
+        for (i, code) in enumerate(self.block):
+            if before[i] is None:
+                continue
+            if code.code in COERCING or isinstance(code, JumpIfCompare):
+                self.block[i] = self.specialise(code, before[i])
+        return self.block
+
+def infer_types(bytecodes: List[Bytecode]) -> List[Bytecode]:
+    return TypeInference(bytecodes).infer()
@@ -1,18 +1,27 @@
-from typing import Any, Dict
+import argparse
+from typing import Any, Dict, Optional, TextIO
 from src.pychart._interpreter.helpers.callable import (
     InputFunc,
     PrintFunc,
     PychartCallable,
 )
-from src.pychart._interpreter.native_callable.arrays import ArrayMethods
-from src.pychart._interpreter.visitors.interpreter import Interpreter
+from src.pychart._interpreter.native_callable.arrays import (
+    ArrayMethods,
+    filter_elements,
+    map_elements,
+)
+from src.pychart._interpreter.visitors.interpreter import Completion, Interpreter
+from src.pychart._interpreter.visitors.closure_compiler import ClosureCompiler
 from src.pychart._interpreter.visitors.resolver import Resolver
+from src.pychart._interpreter.visitors.transpiler import Transpiler
 from src.pychart._interpreter.scanner import Scanner
 from src.pychart._interpreter.visitors.bytecode_generator import *
 from src.pychart._interpreter.pyparser import Parser
 from src.pychart.bytecode.bytecodes import *
 from src.pychart.bytecode.interpreter import *
 from src.pychart.bytecode.printer import *
+from src.pychart.bytecode import cache as bytecode_cache
+from src.pychart.bytecode.compact import CompactBytecode
 
 native_functions: Dict[str, PychartCallable] = {
     "input": InputFunc(),
@@ -20,29 +29,55 @@ native_functions: Dict[str, PychartCallable] = {
     "push": ArrayMethods.Push(),
     "pop": ArrayMethods.Pop(),
     "len": ArrayMethods.Length(),
+    "sum": ArrayMethods.Sum(),
+    "min": ArrayMethods.Extreme("min", min),
+    "max": ArrayMethods.Extreme("max", max),
+    "dot": ArrayMethods.Dot(),
+    "fill": ArrayMethods.Fill(),
+    "range": ArrayMethods.Range(),
+    "concat": ArrayMethods.Concat(),
+    "map": ArrayMethods.Map(),
+    "filter": ArrayMethods.Filter(),
 }
 
+# bulk natives that take no callback work the same in both interpreters
+BULK_NATIVES = ["sum", "min", "max", "dot", "fill", "range", "concat"]
+
 class BytecodeArrayNatives:
     def push(self, interpreter: Any, params: List[Any]):
-        arr_name = interpreter.get_symbol_name_or_value(params[0])
         arr   = interpreter.get(params[0])
         value = interpreter.get(params[1])
 
-        arr[len(arr)] = value
-        interpreter.set(arr_name, arr)
+        # arrays are shared, so there is nothing to write back
+        arr.push(value)
+        return arr
 
     def pop(self, interpreter: Any, params: List[Any]):
-        arr_name = interpreter.get_symbol_name_or_value(params[0])
         arr   = interpreter.get(params[0])
-
-        arr.pop(len(arr) - 1, None)
-        interpreter.set(arr_name, arr)
+        return arr.pop()
 
     def length(self, interpreter: Any, params: List[Any]):
         arr   = interpreter.get(params[0])
         return len(arr)
 
-def run_as_bytecode(source: str, should_print: bool):
+    @staticmethod
+    def callback(interpreter: Any, function: Any, name: str):
+        if not isinstance(function, BytecodeInterpreterFunction):
+            raise RuntimeError(f"{name}'s second argument must be a function")
+        return lambda elem: interpreter.call(function, [elem])
+
+    def map(self, interpreter: Any, params: List[Any]):
+        arr      = interpreter.get(params[0])
+        function = interpreter.get(params[1])
+        return map_elements(arr, self.callback(interpreter, function, "map"))
+
+    def filter(self, interpreter: Any, params: List[Any]):
+        arr      = interpreter.get(params[0])
+        function = interpreter.get(params[1])
+        return filter_elements(arr, self.callback(interpreter, function, "filter"))
+
+def compile_to_bytecode(source: str, should_print: bool,
+        should_optimize: bool = True) -> Optional[CompactBytecode]:
     tokens = Scanner(source).get_tokens()
     statements = Parser(tokens).parse()
 
@@ -50,16 +85,34 @@ def run_as_bytecode(source: str, should_print: bool):
         return None
 
     generator = BytecodeGenerator(statements, list(native_functions.keys()))
-    bytecodes = generator.generate(keep_labels=should_print)
+    bytecodes = generator.generate(keep_labels=True)
 
     if bytecodes is None:
         return None
 
     if should_print:
+        print(f"; {generator.temporaries_requested} temporaries "
+              f"in {generator.temporary_slots} slots")
+        print("; before optimization" if should_optimize else "; unoptimized")
         BytecodePrinter().print(bytecodes)
         print()
-        bytecodes = solve_block(bytecodes)
 
+    if should_optimize:
+        bytecodes = optimize(bytecodes)
+        if should_print:
+            print("; after optimization")
+            BytecodePrinter().print(bytecodes)
+            print()
+
+    return solve_block(bytecodes, compact=True)
+
+def run_as_bytecode(source: str, should_print: bool, should_optimize: bool = True):
+    program = compile_to_bytecode(source, should_print, should_optimize)
+    if program is None:
+        return None
+    return make_bytecode_interpreter().execute(program)
+
+def make_bytecode_interpreter() -> BytecodeInterpreter:
     interp = BytecodeInterpreter()
 
     interp.push_native("input", InputFunc().bytecode_execute)
@@ -69,33 +122,72 @@ def run_as_bytecode(source: str, should_print: bool):
     interp.push_native("push", array_natives.push)
     interp.push_native("pop", array_natives.pop)
     interp.push_native("len", array_natives.length)
+    interp.push_native("map", array_natives.map)
+    interp.push_native("filter", array_natives.filter)
+
+    for name in BULK_NATIVES:
+        interp.push_native(name, native_functions[name].bytecode_execute)
 
-    return interp.execute(bytecodes)
+    return interp
 
-def run_file_as_bytecode(filename: str, should_print: bool):
+def run_file_as_bytecode(filename: str, should_print: bool, should_optimize: bool = True,
+        cached: bool = True):
+    """runs the file on the VM, the compiled program is kept next to it and used again
+    while the source stays the same, printing the bytecode needs the front end to run"""
     source = None
     with open(filename, "r", encoding="utf-8") as contents:
         source = contents.read()
-    run_as_bytecode(source, should_print)
 
-def run(source: str):
+    if not cached or should_print:
+        run_as_bytecode(source, should_print, should_optimize)
+        return
+
+    natives = list(native_functions.keys())
+    program = bytecode_cache.load(filename, source, should_optimize, natives)
+    if program is None:
+        program = compile_to_bytecode(source, False, should_optimize)
+        if program is None:
+            return
+        bytecode_cache.store(filename, source, should_optimize, natives, program)
+    make_bytecode_interpreter().execute(program)
+
+def run(
+    source: str, compiled: bool = False, transpiled: bool = False, tiered: bool = True
+):
+    """runs the source on the tree walking interpreter, compiled to closures first or
+    transpiled to python. the tree walker compiles hot functions and loops when tiered"""
     tokens = Scanner(source).get_tokens()
     statements = Parser(tokens).parse()
 
     if statements is None:
         return None
 
-    bindings = Resolver.variable_bindings(statements, list(native_functions.keys()))
-    interpreter = Interpreter(bindings)
+    natives = list(native_functions.keys())
+    globals_size = Resolver.resolve_slots(statements, natives)
+
+    if transpiled:
+        return run_transpiled(statements, natives)
+
+    interpreter = Interpreter(globals_size, tiered)
+
+    # the natives take the first global slots
+    for (slot, (name, callablefn)) in enumerate(native_functions.items()):
+        interpreter.environment.reverve(slot, name, callablefn)
 
-    for (name, callablefn) in native_functions.items():
-        interpreter.environment.reverve(name, callablefn)
+    # compiled statements are given the scope they run in instead of the interpreter
+    program: List[Any] = statements
+    state: Any = interpreter
+    if compiled:
+        program = ClosureCompiler().compile(statements)
+        state = interpreter.environment
 
     last_value: Any = None
 
     try:
-        for statement in statements:
-            last_value = statement(interpreter)
+        for statement in program:
+            last_value = statement(state)
+            if isinstance(last_value, Completion):
+                raise RuntimeError(last_value.misplaced)
     except Exception as err:
         print(f"Error: {err}")
         print("Exiting...")
@@ -103,7 +195,53 @@ def run(source: str):
     return last_value
 
 
-def run_prompt():
+def run_transpiled(statements: List[Any], natives: List[str]):
+    """the program becomes one python function, the natives are passed in slot order"""
+    program = Transpiler(natives).compile(statements)
+
+    try:
+        return program(*native_functions.values())
+    except Exception as err:
+        print(f"Error: {err}")
+        print("Exiting...")
+
+    return None
+
+
+def run_stream(reader: TextIO, compiled: bool = False, tiered: bool = True):
+    """runs the source as it is read, each top level statement is resolved and run once
+    it is parsed so only one statement's tokens and tree are held at a time. statements
+    before a parse error have already run"""
+    resolver = Resolver.with_natives(list(native_functions.keys()))
+    interpreter = Interpreter(resolver.globals_size(), tiered)
+
+    # the natives take the first global slots
+    for (slot, (name, callablefn)) in enumerate(native_functions.items()):
+        interpreter.environment.reverve(slot, name, callablefn)
+
+    compiler = ClosureCompiler()
+    last_value: Any = None
+
+    try:
+        for statement in Parser(Scanner.stream(reader)).statements():
+            resolver.resolve(statement)
+            interpreter.environment.grow(resolver.globals_size())
+
+            if compiled:
+                last_value = statement(compiler)(interpreter.environment)
+            else:
+                last_value = statement(interpreter)
+
+            if isinstance(last_value, Completion):
+                raise RuntimeError(last_value.misplaced)
+    except Exception as err:
+        print(f"Error: {err}")
+        print("Exiting...")
+
+    return last_value
+
+
+def run_prompt(compiled: bool = False, transpiled: bool = False):
     try:
         while True:
             line = input("$ : ")
@@ -111,7 +249,7 @@ def run_prompt():
             if line == ".exit":
                 break
 
-            result = run(line)
+            result = run(line, compiled, transpiled)
             if result:
                 print(result)
 
@@ -120,6 +258,52 @@ def run_prompt():
         exit()
 
 
-def run_file(filename: str):
+def run_file(
+    filename: str,
+    compiled: bool = False,
+    transpiled: bool = False,
+    streamed: bool = False,
+):
+    """streamed files are run as they are read, except when transpiled which needs the
+    whole program"""
     with open(filename, "r", encoding="utf-8") as contents:
-        run(contents.read())
+        if streamed and not transpiled:
+            run_stream(contents, compiled)
+        else:
+            run(contents.read(), compiled, transpiled)
+
+
+def argument_parser() -> argparse.ArgumentParser:
+    """the command line of both main.py and the installed pychart command"""
+    parser = argparse.ArgumentParser(prog="pychart")
+    parser.add_argument("file", nargs="?", help="run a pychart file")
+    parser.add_argument("--version", "-V", action="store_true")
+    parser.add_argument("--bytecode", "-b", action="store_true")
+    parser.add_argument("--print_bytecode", "-print", action="store_true")
+    parser.add_argument("--no_optimize", action="store_true")
+    parser.add_argument(
+        "--no_cache",
+        action="store_true",
+        help="compile the file again instead of using its cached bytecode",
+    )
+    parser.add_argument(
+        "--compile",
+        "-c",
+        action="store_true",
+        help="compile to closures instead of walking the tree",
+    )
+    parser.add_argument(
+        "--transpile",
+        "-t",
+        action="store_true",
+        help="transpile to python instead of walking the tree",
+    )
+    parser.add_argument(
+        "--stream",
+        "-s",
+        action="store_true",
+        help="run each statement of the file as soon as it is read",
+    )
+    parser.add_argument("-run", nargs="?", help="run pychart source")
+
+    return parser
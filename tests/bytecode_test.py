@@ -0,0 +1,399 @@
+import os
+
+import pytest
+
+import src.pychart.bytecode.bytecodes as bt
+from src.pychart.bytecode.interpreter import BytecodeInterpreter
+from src.pychart._interpreter.pyparser import Parser
+from src.pychart._interpreter.scanner import Scanner
+from src.pychart._interpreter.visitors.bytecode_generator import BytecodeGenerator
+import src.pychart.runner as runner
+import src.pychart.bytecode.cache as bytecode_cache
+from src.pychart.bytecode.cache import cache_path
+from src.pychart.runner import make_bytecode_interpreter, native_functions, run, run_as_bytecode
+
+
+def run_bytecode(source, capsys):
+    run_as_bytecode(source, False)
+    return capsys.readouterr().out.split()
+
+
+def test_bytecode_recursion(capsys):
+    source = """
+    func fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+    print(fib(10));
+    """
+    assert run_bytecode(source, capsys) == ["55.0"]
+
+
+def test_bytecode_recursion_keeps_locals(capsys):
+    source = """
+    func f(n) { let x = n; if (n > 0) { f(n - 1); } return x; }
+    print(f(3));
+    """
+    assert run_bytecode(source, capsys) == ["3.0"]
+
+
+def test_bytecode_closures(capsys):
+    source = """
+    func makeCounter() {
+        let counter = 0;
+        func count() { return counter = counter + 1; }
+        return count;
+    }
+    let a = makeCounter();
+    let b = makeCounter();
+    a(); a();
+    print(a());
+    print(b());
+    """
+    assert run_bytecode(source, capsys) == ["3.0", "1.0"]
+
+
+def test_bytecode_calls_share_the_scopes_they_closed_over(capsys):
+    source = """
+    let total = 0;
+    func pair() {
+        let shared = 0;
+        func add(a, b) { shared = shared + a - b; total = total + 1; return shared; }
+        func get() { return shared; }
+        add(5, 1);
+        return [add, get];
+    }
+    let p = pair();
+    let add = p[0];
+    let get = p[1];
+    { { { let deep = 10; print(add(deep, 2), get(), total); } } }
+    print(get(), total);
+    """
+    statements = Parser(Scanner(source).get_tokens()).parse()
+    bytecodes = BytecodeGenerator(statements, list(native_functions.keys())).generate()
+    interp = make_bytecode_interpreter()
+    interp.execute(bytecodes)
+
+    # writes through one closure are seen by the other and by the globals, with no
+    # frames left behind once the calls return
+    assert capsys.readouterr().out.split() == ["12.0", "12.0", "2.0", "12.0", "2.0"]
+    assert interp.call_stack == []
+
+def test_bytecode_break_from_nested_block(capsys):
+    source = """
+    let i = 0;
+    while (i < 2 * 5) {
+        { if (i == 4) { break; } }
+        i = i + 1;
+    }
+    print(i);
+    """
+    assert run_bytecode(source, capsys) == ["4.0"]
+
+
+def test_bytecode_load_rejects_unlinked_labels():
+    interp = BytecodeInterpreter()
+    label = bt.Label(".end")
+    with pytest.raises(RuntimeError):
+        interp.load([bt.Frame(0), bt.Jump(label), label])
+
+
+def test_compact_encoding_round_trips():
+    source = """
+    func f(a, b) { let c = [a, b, "x"]; c[0] = a * 2; return c[0] + b; }
+    let i = 0;
+    while (i < 3) { i = i + f(i, 1); }
+    """
+    statements = Parser(Scanner(source).get_tokens()).parse()
+    bytecodes = BytecodeGenerator(statements, list(native_functions.keys())).generate()
+    compact = bt.solve_block(bytecodes, compact=True)
+
+    assert compact.code.typecode == "i"
+    assert len(compact) == len(bytecodes)
+    decoded = list(compact.instructions())
+    for (code, (mnemonic, operands)) in zip(bytecodes, decoded):
+        assert code.code == mnemonic
+        expected = bt.instruction_operands(code)
+        assert [describe(operand) for operand in operands] == \
+            [describe(operand) for operand in expected]
+
+
+def describe(operand):
+    if isinstance(operand, list):
+        return [describe(item) for item in operand]
+    if isinstance(operand, bt.Identifier):
+        return ("identifier", operand.value, operand.depth, operand.slot)
+    if isinstance(operand, bt.Value):
+        return ("value", type(operand.value), operand.value)
+    return operand
+
+
+def test_bytecode_recursion_is_not_limited_by_python(capsys):
+    source = """
+    func depth(n) { if (n == 0) return 0; return 1 + depth(n - 1); }
+    print(depth(20000));
+    """
+    assert run_bytecode(source, capsys) == ["20000.0"]
+
+
+def test_bytecode_call_from_python():
+    statements = Parser(Scanner("func add(a, b) { return a + b; }").get_tokens()).parse()
+    bytecodes = BytecodeGenerator(statements, list(native_functions.keys())).generate()
+    interp = BytecodeInterpreter()
+    for name in native_functions:
+        interp.push_native(name, lambda interp, args: None)
+    interp.execute(bytecodes)
+
+    add = interp.get(bt.Identifier("add", 0, len(native_functions)))
+    assert interp.call(add, [1.0, 2.0]) == 3.0
+    assert interp.call_stack == []
+
+
+def test_optimizer_keeps_behaviour(capsys):
+    source = """
+    func f(n) { let s = 0; while (true) { if (n == 0) { break; } s = s + n; n = n - 1; } return s; }
+    let i = 0;
+    while (i < 3) { if (i == 1) { print(f(4)); } else { {} } i = i + 1; }
+    """
+    run_as_bytecode(source, False, should_optimize=False)
+    unoptimized = capsys.readouterr().out
+    run_as_bytecode(source, False)
+    assert capsys.readouterr().out == unoptimized == "10.0\n"
+
+
+def test_optimizer_threads_jumps_and_shortens_functions():
+    first  = bt.Label(".first")
+    second = bt.Label(".second")
+    temp   = bt.Identifier(".tmp", 0, 1)
+    body = [
+        bt.Create(temp),
+        bt.Push(temp, bt.Value(1.0)),
+        bt.Frame(0),
+        bt.Raze(),
+        bt.Return(temp),
+    ]
+    program = [
+        bt.Frame(2),
+        bt.Jump(first),
+        bt.Function(bt.Identifier("f", 0, 0), [], len(body), 2),
+        *body,
+        first,
+        bt.Jump(second),
+        second,
+    ]
+
+    optimized = bt.optimize(program)
+    assert [type(code) for code in optimized] == \
+        [bt.Frame, bt.Jump, bt.Function, bt.Push, bt.Return, bt.Label, bt.Label]
+    assert optimized[1].location is second
+    assert optimized[2].num_instructions == 2
+    # the jump that was rewritten is a copy, the input is left alone
+    assert program[1].location is first
+
+
+def test_generator_reuses_dead_temporaries(capsys):
+    source = """
+    let a = 1; let b = 2; let c = 3; let d = 4;
+    let i = 0;
+    while (i < 2) {
+        print((a + b) * (c + d) - (a - b));
+        print(a * b + c * d);
+        print(-(a + d));
+        i = i + 1;
+    }
+    """
+    statements = Parser(Scanner(source).get_tokens()).parse()
+    generator = BytecodeGenerator(statements, list(native_functions.keys()))
+    generator.generate()
+    assert generator.temporaries_requested == 12
+    # an operand's slot is free once the instruction reading it is made, so the sums in
+    # the first print share slots with each other, not only with the next statement
+    assert generator.temporary_slots == 4
+
+    assert run_bytecode(source, capsys) == ["22.0", "14.0", "-5.0"] * 2
+
+
+def test_superinstructions_keep_behaviour(capsys):
+    source = """
+    let s = "n";
+    let i = 3;
+    while (i > 0) { s = s + 1; i = i - 1; if (i == 1) { print(i); } }
+    let j = 0;
+    while (2 >= j) { j = j + 0.5; }
+    print(s);
+    print(j);
+    """
+    assert run_bytecode(source, capsys) == ["1.0", "n1.01.01.0", "2.5"]
+
+
+def test_superinstructions_halve_counting_loops():
+    source = "let i = 0; while (i < 10) { i = i + 1; }"
+    statements = Parser(Scanner(source).get_tokens()).parse()
+    bytecodes = BytecodeGenerator(statements, list(native_functions.keys())).generate(
+            keep_labels=True)
+    plain = bt.optimize(bytecodes, superinstructions=False)
+    fused = bt.optimize(bytecodes)
+
+    loop = [code.code for code in fused if not isinstance(code, bt.Label)][-4:-1]
+    assert loop == [bt.Mnemonics.JUMP_IF_NOT_COMPARE, bt.Mnemonics.INCREMENT,
+            bt.Mnemonics.JUMP_IF_COMPARE]
+    instructions = lambda block: [code for code in block if not isinstance(code, bt.Label)]
+    assert len(instructions(fused)) < len(instructions(plain))
+
+    # the comparison survives the compact encoding
+    compact = bt.solve_block(fused, compact=True)
+    (mnemonic, operands) = [instruction for instruction in compact.instructions()][-4]
+    assert mnemonic == bt.Mnemonics.JUMP_IF_NOT_COMPARE
+    assert operands[0] == bt.Mnemonics.LESS_THAN
+
+
+def test_quickened_instructions_deoptimize_when_types_change(capsys):
+    source = """
+    let i = 0; let x = 0; let out = 0;
+    while (i < 40) { if (i == 20) { x = "s"; } out = x + 1; i = i + 1; }
+    print(out);
+    """
+    statements = Parser(Scanner(source).get_tokens()).parse()
+    bytecodes = BytecodeGenerator(statements, list(native_functions.keys())).generate(
+            keep_labels=True)
+    interp = make_bytecode_interpreter()
+    interp.execute(bt.solve_block(bt.optimize(bytecodes)))
+
+    assert capsys.readouterr().out.split() == ["s1.0"]
+    assert interp.quickened > 0
+    assert interp.deoptimized == 1
+
+
+def test_type_inference_only_specialises_proven_operations(capsys):
+    source = """
+    let i = 0; let n = 0; let s = 0;
+    while (i < 4) {
+        n = n + i * 2;
+        if (i == 2) { s = "s"; }
+        s = s + i;
+        i = i + 1;
+    }
+    print(n); print(s);
+    """
+    statements = Parser(Scanner(source).get_tokens()).parse()
+    bytecodes = BytecodeGenerator(statements, list(native_functions.keys())).generate(
+            keep_labels=True)
+    optimized = bt.optimize(bytecodes)
+
+    additions = [code for code in optimized if code.code == bt.Mnemonics.ADDITION]
+    # n only ever holds numbers, s holds a number or a string depending on the path taken
+    assert [code.coerce for code in additions] == [False, True]
+
+    make_bytecode_interpreter().execute(bt.solve_block(optimized, compact=True))
+    assert capsys.readouterr().out.split() == ["12.0", "s2.03.0"]
+
+
+def test_type_inference_only_trusts_natives_their_globals_still_hold(capsys):
+    # a parameter named like a native, and a native's global assigned another function
+    shadowed = 'func f(x) { return "s"; } func g(sum) { return sum(1) + 1; } print(g(f));'
+    assert run_bytecode(shadowed, capsys) == ["s1.0"]
+    reassigned = 'func f(x) { return "s"; } len = f; let y = len(1) + 1; print(y);'
+    assert run_bytecode(reassigned, capsys) == ["s1.0"]
+    # the store comes after a break, which razes its frames before jumping out
+    after_break = """
+    func f(x) { return "s"; }
+    let y = 0; let i = 0;
+    while (i < 2) {
+        i = i + 1; y = len([1]) + 1; print(y);
+        { let q = 1; if (i == 5) { break; } len = f; }
+    }
+    """
+    assert run_bytecode(after_break, capsys) == ["2.0", "s1.0"]
+
+
+def test_bytecode_arrays_are_shared_with_natives(capsys):
+    source = """
+    let a = [1, 2, "x"];
+    push(a, 4);
+    a[0] = 9;
+    print(a[-1], a[1], len(a));
+    print(pop(a), a[10]);
+    print(a);
+    """
+    assert run_bytecode(source, capsys) == ["4.0", "2.0", "4", "4.0", "None",
+                                            "[9.0,", "2.0,", "x,", "]"]
+
+
+def test_bytecode_packed_arrays_fall_back_on_other_values(capsys):
+    source = """
+    let a = [];
+    let i = 0;
+    while (i < 20) { push(a, i); i = i + 1; }
+    a[3] = a[2] * 10;
+    let before = a[3];
+    a[5] = "five";
+    print(before, a[5], a[19], len(a));
+    """
+    assert run_bytecode(source, capsys) == ["20.0", "five", "19.0", "20"]
+
+
+def test_bulk_array_natives_agree_between_interpreters(capsys):
+    source = """
+    func square(x) { return x * x; }
+    func big(x) { return x > 2; }
+    let a = range(1, 6);
+    print(sum(a), min(a), max(a), dot(a, a));
+    print(sum(map(a, square)), len(filter(a, big)), len(concat(a, range(3))));
+    print(sum(fill(range(40), 2)));
+    """
+    run(source)
+    walked = capsys.readouterr().out.split()
+    assert run_bytecode(source, capsys) == ["15.0", "1.0", "5.0", "55.0", "55.0", "3", "8",
+                                            "80.0"]
+    assert walked == ["15", "1", "5", "55", "55", "3", "8", "80"]
+
+
+def test_compiled_files_are_cached_until_their_source_changes(tmp_path, monkeypatch, capsys):
+    script = tmp_path / "script.pych"
+    script.write_text('func f(n) { if (n < 2) return n; return f(n - 1) + f(n - 2); }\n'
+                      'print("fib", f(10));\n')
+    runner.run_file_as_bytecode(str(script), False)
+    assert capsys.readouterr().out.split() == ["fib", "55.0"]
+    assert (tmp_path / "__pychart_cache__").is_dir()
+
+    # the cached program runs without the front end
+    def no_front_end(*_):
+        raise AssertionError("compiled again")
+    compile_to_bytecode = runner.compile_to_bytecode
+    monkeypatch.setattr(runner, "compile_to_bytecode", no_front_end)
+    runner.run_file_as_bytecode(str(script), False)
+    assert capsys.readouterr().out.split() == ["fib", "55.0"]
+
+    # an edited source or an unreadable cache compiles again
+    monkeypatch.setattr(runner, "compile_to_bytecode", compile_to_bytecode)
+    script.write_text('print("edited");\n')
+    runner.run_file_as_bytecode(str(script), False)
+    assert capsys.readouterr().out.split() == ["edited"]
+
+    with open(cache_path(str(script), True), "wb") as cached:
+        cached.write(b"\x00 not bytecode")
+    runner.run_file_as_bytecode(str(script), False)
+    assert capsys.readouterr().out.split() == ["edited"]
+    runner.run_file_as_bytecode(str(script), False, should_optimize=False)
+    assert capsys.readouterr().out.split() == ["edited"]
+
+    # a newer compiler writes over what an older one left
+    cache = tmp_path / "__pychart_cache__"
+    before = sorted(path.name for path in cache.iterdir())
+    monkeypatch.setattr(bytecode_cache, "COMPILER_VERSION", bytecode_cache.COMPILER_VERSION + 1)
+    assert bytecode_cache.load(str(script), script.read_text(), True, list(native_functions)) is None
+    assert not os.path.exists(cache_path(str(script), True))
+    runner.run_file_as_bytecode(str(script), False)
+    assert capsys.readouterr().out.split() == ["edited"]
+    assert sorted(path.name for path in cache.iterdir()) == before
+
+
+def test_globals_named_like_natives_hide_them(capsys):
+    source = """
+    let before = sum([1, 2]) + sum([]);
+    func map(a, fn) { return "mine"; }
+    let sum = 10;
+    func total() { return sum + len([1]); }
+    print(before, map([1], before), total());
+    """
+    assert run_bytecode(source, capsys) == ["3.0", "mine", "11.0"]
+    for (compiled, transpiled) in ((False, False), (True, False), (False, True)):
+        run(source, compiled, transpiled)
+        assert capsys.readouterr().out.split() == ["3.0", "mine", "11"]
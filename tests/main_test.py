@@ -1,5 +1,21 @@
+import io
+
+import pytest
+
+from src.pychart._interpreter.helpers.array import PACK_AT, PychartArray
+from src.pychart._interpreter.helpers.callable import PrintFunc
+from src.pychart._interpreter.incremental import IncrementalFrontEnd
+from src.pychart._interpreter.pyparser import Parser
 from src.pychart._interpreter.scanner import Scanner
+from src.pychart._interpreter.visitors.interpreter import (
+    HOT_CALLS,
+    HOT_ITERATIONS,
+    Interpreter,
+    pass_by_value,
+)
+from src.pychart._interpreter.visitors.resolver import Resolver
 from src.pychart._interpreter.token_type import TokenType
+from src.pychart.runner import run, run_stream
 
 
 def test_scanner_int():
@@ -14,3 +30,227 @@ def test_scanner_float():
     tokens = scanner.get_tokens()
     assert tokens[0].token_type == TokenType.NUMBER
     assert tokens[1].token_type == TokenType.EOF
+
+
+def test_scanner_tracks_lines_and_keywords():
+    source = 'let x = 1.5; // comment "\nif (x >= 2) { print("a\\nb\nc", x_1); }'
+    tokens = Scanner(source).get_tokens()
+    assert [(t.token_type, t.lexeme, t.line) for t in tokens[:4]] == [
+        (TokenType.LET, "let", 1),
+        (TokenType.IDENTIFIER, "x", 1),
+        (TokenType.EQUAL, "=", 1),
+        (TokenType.NUMBER, "1.5", 1),
+    ]
+    assert [t.token_type for t in tokens[5:9]] == [
+        TokenType.IF,
+        TokenType.LEFT_PEREN,
+        TokenType.IDENTIFIER,
+        TokenType.GREATER_EQUAL,
+    ]
+    string = tokens[14]
+    assert (string.token_type, string.literal, string.line) == (TokenType.STRING, "a\nb\nc", 3)
+    assert (tokens[16].lexeme, tokens[16].line) == ("x_1", 3)
+    assert (tokens[-1].token_type, tokens[-1].line) == (TokenType.EOF, 3)
+
+
+def test_tokens_and_nodes_have_no_dict():
+    tokens = Scanner("func f(a) { while (a) { a = [a][0]; } }").get_tokens()
+    statements = Parser(tokens).parse()
+    function = statements[0]
+    loop = function.body[0]
+    for item in [tokens[0], function, loop, loop.while_body, loop.while_body.statements[0]]:
+        assert not hasattr(item, "__dict__")
+
+
+def test_streamed_tokens_match_the_scanned_ones():
+    source = 'let s = "over\ntwo lines";\n// comment\nprint(s, 12.5 >= 3);\n'
+    scanned = [(t.token_type, t.lexeme, t.literal, t.line) for t in Scanner(source).get_tokens()]
+    for chunk_size in (1, 4, 64):
+        streamed = Scanner.stream(io.StringIO(source), chunk_size)
+        assert [(t.token_type, t.lexeme, t.literal, t.line) for t in streamed] == scanned
+
+
+def test_streamed_statements_run_before_the_rest_is_parsed(capsys):
+    source = """
+    func twice(x) { return x * 2; }
+    let a = twice(4);
+    print(a);
+    let b = ;
+    print(a + 1);
+    """
+    run_stream(io.StringIO(source))
+    captured = capsys.readouterr()
+    assert captured.out == "8\n"
+    assert captured.err == "Error occurred: Line 5: Could not match to an expression\n"
+
+
+def test_operators_bind_by_precedence_and_group_left(capsys):
+    run("""
+    let a = [4, 5];
+    let b = 0;
+    print(10 - 4 - 3, 2 + 3 * 4 - 8 / 2, -a[1] * 2, !b == true, 1 + 1 < 3 == 2 > 1);
+    b = a[0] = 7;
+    print(b, a, 1 - -(2 - 3));
+    """)
+    assert capsys.readouterr().out.splitlines() == [
+        "3 10.0 -10 True True",
+        "7 [7, 5, ] 0",
+    ]
+
+
+def test_numeric_arrays_are_packed_until_something_else_is_stored():
+    ints = PychartArray(list(range(PACK_AT)))
+    assert ints.packed and ints.get(3) == 3 and isinstance(ints.get(3), int)
+    ints.set(3, 3.5)
+    assert not ints.packed and ints.get(3) == 3.5 and ints.get(4) == 4
+
+    pushed = PychartArray([])
+    for i in range(PACK_AT):
+        pushed.push(float(i))
+    assert pushed.packed
+    pushed.push(True)
+    assert not pushed.packed and pushed.pop() is True and len(pushed) == PACK_AT
+
+
+def test_arrays_passed_to_functions_are_copied_on_write(capsys):
+    source = """
+    let a = [1, [2, 3], 4];
+    func peek(x) { return x[1][0]; }
+    func poke(x) { x[0] = 10; x[1][0] = 20; push(x, 5); return x; }
+    print(peek(a), poke(a), a);
+    """
+    run(source)
+    assert capsys.readouterr().out.split() == ["2", "[10,", "[20,", "3,", "],", "4,", "5,", "]",
+                                               "[1,", "[2,", "3,", "],", "4,", "]"]
+
+    array = PychartArray(list(range(PACK_AT)))
+    copy = pass_by_value(array)
+    assert copy.elems is array.elems
+    copy.set(0, 100)
+    assert copy.elems is not array.elems and array.get(0) == 0 and copy.get(0) == 100
+
+
+def test_return_and_break_leave_nested_statements(capsys):
+    source = """
+    func find(n) { let i = 0; while (true) { { if (i == n) { return i; } } i = i + 1; } }
+    let j = 0;
+    while (true) { { let x = j; if (x == 3) break; } j = j + 1; }
+    print(find(5), j);
+    func escape() { break; }
+    while (true) { escape(); }
+    """
+    run(source)
+    assert capsys.readouterr().out.splitlines() == [
+        "5 3",
+        "Error: Cannot invoke 'break;' outside of a while loop",
+        "Exiting...",
+    ]
+
+
+def test_resolver_stores_depth_and_slot_on_nodes():
+    source = "let a = 1; let b = 2; { let c = b; c = a; }"
+    statements = Parser(Scanner(source).get_tokens()).parse()
+    assert Resolver.resolve_slots(statements, ["print"]) == 3
+
+    block = statements[2]
+    (let_c, assign) = block.statements
+    assert block.size == 1 and let_c.slot == 0
+    assert (let_c.initializer.depth, let_c.initializer.slot) == (1, 2)
+    assert (assign.expr.depth, assign.expr.slot) == (0, 0)
+    assert (assign.expr.initializer.depth, assign.expr.initializer.slot) == (1, 1)
+
+
+@pytest.mark.parametrize(
+    "compiled,transpiled,tiered",
+    [(False, False, False), (True, False, False), (False, True, False), (False, False, True)],
+)
+def test_closure_compiler_matches_the_interpreter(capsys, compiled, transpiled, tiered):
+    source = """
+    func makeCounter() { let count = 0; func next() { count = count + 1; return count; } return next; }
+    let counter = makeCounter();
+    counter();
+    func fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+    let a = [1, 2, 3];
+    func double(x) { x[0] = x[0] * 2; return x; }
+    let i = 0;
+    while (true) { { i = i + 1; if (i >= 3) break; } }
+    print(counter(), fib(10), double(a), a, "n" + 1, -i, !i, 7 / 2);
+    let x = 0;
+    func bump() { x = x + 1; return x; }
+    func apply(h) { return h(); }
+    print(apply(bump), x);
+    print(a[10]);
+    """
+    run(source, compiled, transpiled, tiered)
+    assert capsys.readouterr().out.splitlines() == [
+        "2 55 [2, 2, 3, ] [1, 2, 3, ] n1 -3 False 3.5",
+        # a function passed by value takes a copy of what it closed over
+        "1 0",
+        'Error: Array index "10" is out of bounds',
+        "Exiting...",
+    ]
+
+
+def test_transpiled_closures_keep_the_variable_they_were_declared_with(capsys):
+    source = """
+    let fs = [];
+    let i = 0;
+    while (i < 3) { let x = i; func f() { x = x + 10; return x; } push(fs, f); i = i + 1; }
+    let first = fs[0];
+    let last = fs[2];
+    first();
+    print(first(), last());
+    let i = 0;
+    """
+    run(source, transpiled=True)
+    assert capsys.readouterr().out.splitlines() == [
+        "20 12",
+        "Error: Variable i is already defined",
+        "Exiting...",
+    ]
+
+
+def test_hot_functions_and_loops_are_compiled(capsys):
+    source = f"""
+    func add(a, b) {{ return a + b; }}
+    let total = 0;
+    let i = 0;
+    while (i < {HOT_ITERATIONS + 5}) {{ total = add(total, i); i = i + 1; }}
+    print(total, i);
+    """
+    statements = Parser(Scanner(source).get_tokens()).parse()
+    interpreter = Interpreter(Resolver.resolve_slots(statements, ["print"]), tiered=True)
+    interpreter.environment.reverve(0, "print", PrintFunc())
+    for statement in statements:
+        statement(interpreter)
+
+    (add, _, _, loop, _) = statements
+    assert add.calls == HOT_CALLS and add.compiled is not None
+    assert loop.iterations == HOT_ITERATIONS and loop.compiled is not None
+    n = HOT_ITERATIONS + 5
+    assert capsys.readouterr().out == f"{n * (n - 1) // 2} {n}\n"
+
+
+def test_incremental_edits_reparse_only_the_statements_they_touch(capsys):
+    source = "let a = 1;\nfunc f() { return a + 1; }\n// the end\nprint(f());\n"
+    front_end = IncrementalFrontEnd(source, ["print"])
+    (let, function, call) = front_end.statements()
+
+    position = source.index("1; }")
+    (new_let, new_function, new_call) = front_end.edit(position, position + 1, "41")
+    assert (new_let, new_call) == (let, call) and new_function is not function
+
+    interpreter = Interpreter(front_end.globals_size())
+    interpreter.environment.reverve(0, "print", PrintFunc())
+    for statement in front_end.statements():
+        statement(interpreter)
+    assert capsys.readouterr().out == "42\n"
+
+    # a comment takes in the rest of its line
+    position = front_end.source.index("print")
+    assert front_end.edit(position, position, "//") == [new_let, new_function]
+    assert len(front_end.edit(position, position + 2, "")) == 3
+
+    with pytest.raises(Exception, match="Variable"):
+        front_end.edit(0, len("let a = 1;"), "")
+    assert front_end.statements() is None